@@ -22,8 +22,7 @@ from authentication.thirdpartydrivers import (
     LensDriver,
     TwitterDriver,
 )
-from core.models import NetworkTypes
-from core.thirdpartyapp import Subgraph
+from core.models import NetworkTypes, UnitapPass
 
 
 class ProfileManager(models.Manager):
@@ -120,17 +119,12 @@ class UserProfile(models.Model):
         return self.wallets.filter(address=wallet_address).exists()
 
     def has_unitap_pass(self):
-        sub = Subgraph()
-        addresses = Wallet.objects.filter(user_profile__pk=self.pk).values_list(
-            "address", flat=True
-        )
-        if not addresses:
-            return False, list()
-        owners = sub.get_unitap_pass_holders(addresses=addresses)
-        return (
-            bool(owners),
-            [token_id for _, token_ids in owners.items() for token_id in token_ids],
+        token_ids = UnitapPass.get_token_ids(
+            self.wallets.annotate(lower_address=Lower("address")).values(
+                "lower_address"
+            )
         )
+        return bool(token_ids), token_ids
 
     def __str__(self) -> str:
         return self.username if self.username else f"User{self.pk}"
@@ -2,6 +2,7 @@ import os
 
 from celery import Celery
 from celery.schedules import crontab
+from django.conf import settings
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brightIDfaucet.settings")
@@ -14,14 +15,16 @@ app = Celery("unitap")
 #   should have a `CELERY_` prefix.
 app.config_from_object("django.conf:settings", namespace="CELERY")
 
+CLAIM_POLL_INTERVAL = settings.CLAIM_POLL_INTERVAL
+
 app.conf.beat_schedule = {
     "process-pending-claims": {
         "task": "faucet.tasks.process_pending_claims",
-        "schedule": 3,
+        "schedule": CLAIM_POLL_INTERVAL,
     },
     "process-pending-batches": {
         "task": "faucet.tasks.process_pending_batches",
-        "schedule": 3,
+        "schedule": CLAIM_POLL_INTERVAL,
     },
     "update-processed-batches": {
         "task": "faucet.tasks.update_pending_batches_with_tx_hash_status",
@@ -81,6 +84,14 @@ app.conf.beat_schedule = {
         "task": "faucet.tasks.update_all_faucets_claims",
         "schedule": 600,
     },
+    "sync-unitap-passes": {
+        "task": "core.tasks.sync_unitap_passes",
+        "schedule": 300,
+    },
+    "sync-token-transfers": {
+        "task": "core.tasks.sync_token_transfers",
+        "schedule": 120,
+    },
     "update_prizetap_winning_chance_number_every_week": {
         "task": "prizetap.tasks.update_prizetap_winning_chance_number",
         "schedule": crontab(minute="0", hour="0", day_of_week="1"),
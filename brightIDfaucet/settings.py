@@ -87,6 +87,49 @@ CLOUDFLARE_IMAGES_ACCOUNT_ID = os.environ.get("CLOUDFLARE_ACCOUNT_ID")
 CLOUDFLARE_IMAGES_API_TOKEN = os.environ.get("CLOUDFLARE_API_TOKEN")
 CLOUDFLARE_IMAGES_ACCOUNT_HASH = os.environ.get("CLOUDFLARE_ACCOUNT_HASH")
 
+WEB3_PROVIDER_POOL_SIZE = int(os.environ.get("WEB3_PROVIDER_POOL_SIZE", 20))
+WEB3_PROVIDER_TIMEOUT = int(os.environ.get("WEB3_PROVIDER_TIMEOUT", 10))
+# third party APIs, connections are pooled and limited per host
+HTTP_CLIENT_POOL_SIZE = int(os.environ.get("HTTP_CLIENT_POOL_SIZE", 20))
+HTTP_CLIENT_MAX_RETRIES = int(os.environ.get("HTTP_CLIENT_MAX_RETRIES", 2))
+# seconds, doubled on every retry and jittered
+HTTP_CLIENT_BACKOFF = float(os.environ.get("HTTP_CLIENT_BACKOFF", 0.2))
+# consecutive failures that open the circuit of a host, and seconds it stays open
+HTTP_CIRCUIT_FAILURE_THRESHOLD = int(
+    os.environ.get("HTTP_CIRCUIT_FAILURE_THRESHOLD", 5)
+)
+HTTP_CIRCUIT_RESET_TIMEOUT = int(os.environ.get("HTTP_CIRCUIT_RESET_TIMEOUT", 30))
+FAUCET_MAINTENANCE_CHAIN_TIMEOUT = int(
+    os.environ.get("FAUCET_MAINTENANCE_CHAIN_TIMEOUT", 30)
+)
+CHAIN_STATE_SNAPSHOT_MAX_AGE = int(os.environ.get("CHAIN_STATE_SNAPSHOT_MAX_AGE", 300))
+GAS_FEE_ORACLE_TTL = int(os.environ.get("GAS_FEE_ORACLE_TTL", 15))
+CONSTRAINT_CHECK_MAX_WORKERS = int(os.environ.get("CONSTRAINT_CHECK_MAX_WORKERS", 8))
+# seconds, for one constraint and for all the constraints of a request
+CONSTRAINT_CHECK_TIMEOUT = float(os.environ.get("CONSTRAINT_CHECK_TIMEOUT", 10))
+CONSTRAINT_CHECK_DEADLINE = float(os.environ.get("CONSTRAINT_CHECK_DEADLINE", 20))
+CONSTRAINT_REVALIDATE_LOCK_TTL = int(
+    os.environ.get("CONSTRAINT_REVALIDATE_LOCK_TTL", 60)
+)
+# blocks, Transfer logs are read in ranges of at most TOKEN_TRANSFER_LOG_RANGE
+# blocks, up to TOKEN_TRANSFER_MAX_BLOCKS_PER_SYNC blocks a run
+TOKEN_TRANSFER_LOG_RANGE = int(os.environ.get("TOKEN_TRANSFER_LOG_RANGE", 5000))
+TOKEN_TRANSFER_MAX_BLOCKS_PER_SYNC = int(
+    os.environ.get("TOKEN_TRANSFER_MAX_BLOCKS_PER_SYNC", 500000)
+)
+TOKEN_TRANSFER_CONFIRMATIONS = int(os.environ.get("TOKEN_TRANSFER_CONFIRMATIONS", 12))
+
+# "poll" or "event", in event mode new claims wake up the faucet batcher
+CLAIM_DISPATCH_MODE = os.environ.get("CLAIM_DISPATCH_MODE", "poll")
+CLAIM_QUEUE_BACKEND = os.environ.get(
+    "CLAIM_QUEUE_BACKEND", "redis" if REDIS_URL else "local"
+)
+CLAIM_BATCH_LINGER = float(os.environ.get("CLAIM_BATCH_LINGER", 0.5))
+CLAIM_BATCH_MAX_SIZE = int(os.environ.get("CLAIM_BATCH_MAX_SIZE", 32))
+# can be raised when CLAIM_DISPATCH_MODE is "event",
+# the polling is only a safety net then
+CLAIM_POLL_INTERVAL = int(os.environ.get("CLAIM_POLL_INTERVAL", 3))
+
 CLOUDFLARE_TURNSTILE_SECRET_KEY = os.environ.get("CLOUDFLARE_TURNSTILE_SECRET_KEY")
 H_CAPTCHA_SECRET = os.environ.get("H_CAPTCHA_SECRET")
 
@@ -1,6 +1,15 @@
 from django.contrib import admin
 
-from .models import Chain, Sponsor, TokenPrice, WalletAccount
+from .models import (
+    AllowList,
+    Chain,
+    ChainStateSnapshot,
+    Sponsor,
+    TokenPrice,
+    TokenTransferIndex,
+    UnitapPass,
+    WalletAccount,
+)
 
 
 class UserConstraintBaseAdmin(admin.ModelAdmin):
@@ -26,6 +35,34 @@ class ChainAdmin(admin.ModelAdmin):
     list_display = ["pk", "chain_name", "chain_id", "symbol", "chain_type"]
 
 
+class ChainStateSnapshotAdmin(admin.ModelAdmin):
+    list_display = ["pk", "chain", "version", "block_number", "fetched_at"]
+
+
+class AllowListAdmin(admin.ModelAdmin):
+    list_display = ["pk", "file_path", "size", "created_at"]
+    search_fields = ["file_path"]
+
+
+class UnitapPassAdmin(admin.ModelAdmin):
+    list_display = ["token_id", "owner", "synced_block"]
+    search_fields = ["owner"]
+
+
+class TokenTransferIndexAdmin(admin.ModelAdmin):
+    list_display = [
+        "pk",
+        "chain",
+        "token_address",
+        "start_block",
+        "indexed_block",
+        "is_backfilled",
+        "synced_at",
+        "last_error",
+    ]
+    search_fields = ["token_address"]
+
+
 class TokenPriceAdmin(admin.ModelAdmin):
     list_display = ["symbol", "usd_price", "price_url", "datetime", "last_updated"]
     list_filter = ["symbol"]
@@ -38,5 +75,9 @@ class SponsorAdmin(admin.ModelAdmin):
 
 admin.site.register(WalletAccount, WalletAccountAdmin)
 admin.site.register(Chain, ChainAdmin)
+admin.site.register(ChainStateSnapshot, ChainStateSnapshotAdmin)
+admin.site.register(AllowList, AllowListAdmin)
 admin.site.register(TokenPrice, TokenPriceAdmin)
+admin.site.register(UnitapPass, UnitapPassAdmin)
+admin.site.register(TokenTransferIndex, TokenTransferIndexAdmin)
 admin.site.register(Sponsor, SponsorAdmin)
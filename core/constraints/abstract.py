@@ -2,6 +2,8 @@ import copy
 from abc import ABC, abstractmethod
 from enum import Enum
 
+from core.constraints.facts import UserFacts
+
 
 class ConstraintApp(Enum):
     GENERAL = "general"
@@ -57,21 +59,70 @@ class ConstraintVerification(ABC):
     app_name = ConstraintApp.GENERAL.value
     __response_text = ""
     is_cachable = True
+    # the result depends on the distribution or raffle it is checked for, so
+    # it is not shared with the others
+    is_object_dependent = False
     invalid_cache_until = 60
     valid_cache_until = 60 * 60
-
-    def __init__(self, user_profile, *, obj=None) -> None:
+    # seconds past valid_cache_until a verified result is still served while
+    # it is refreshed in the background, 0 disables it. The refresh runs
+    # without the request, so constraints that need it must not opt in
+    stale_while_revalidate = 0
+    # hard limit on the stale window, for security sensitive constraints
+    max_staleness = None
+
+    def __init__(self, user_profile, *, obj=None, facts: UserFacts = None) -> None:
         self.user_profile = user_profile
         self._param_values = {}
         self.obj = obj
+        self._facts = facts
+        self._info = {}
+        self._evaluations = {}
+
+    @property
+    def facts(self) -> UserFacts:
+        if self._facts is None:
+            self._facts = UserFacts(self.user_profile)
+        return self._facts
+
+    @facts.setter
+    def facts(self, facts: UserFacts):
+        self._facts = facts
+
+    @staticmethod
+    def get_memo_key(*args, **kwargs) -> str:
+        from core.utils import to_task_kwargs
+
+        kwargs.pop("context", None)
+        return repr((args, sorted(to_task_kwargs(kwargs).items())))
+
+    def fetch_info(self, *args, **kwargs):
+        """override it to return the data the constraint is checked against,
+        is_observed can derive its verdict from get_info without fetching it
+        again"""
+        return None
 
     def get_info(self, *args, **kwargs):
-        pass
+        key = self.get_memo_key(*args, **kwargs)
+        if key not in self._info:
+            self._info[key] = self.fetch_info(*args, **kwargs)
+        return self._info[key]
 
     @abstractmethod
     def is_observed(self, *args, **kwargs) -> bool:
         pass
 
+    def evaluate(self, *args, **kwargs) -> tuple[bool, object]:
+        """checks the constraint once for the arguments, the result is kept
+        for the lifetime of the instance
+        :return: (is_observed, info)
+        """
+        key = self.get_memo_key(*args, **kwargs)
+        if key not in self._evaluations:
+            info = self.get_info(*args, **kwargs)
+            self._evaluations[key] = (self.is_observed(*args, **kwargs), info)
+        return self._evaluations[key]
+
     @classmethod
     def param_keys(cls) -> list:
         return cls._param_keys
@@ -84,6 +135,8 @@ class ConstraintVerification(ABC):
     def param_values(self, values: dict):
         self.is_valid_param_keys(values.keys())
         self._param_values = copy.deepcopy(values)
+        self._info = {}
+        self._evaluations = {}
 
     @classmethod
     def is_valid_param_keys(cls, keys):
@@ -110,9 +163,4 @@ class ConstraintVerification(ABC):
 
     @property
     def user_addresses(self):
-        from core.models import NetworkTypes
-
-        user_addresses = self.user_profile.wallets.filter(
-            wallet_type=NetworkTypes.EVM
-        ).values_list("address", flat=True)
-        return user_addresses
+        return self.facts.evm_addresses
@@ -1,7 +1,5 @@
 import logging
 
-from django.db.models.functions import Lower
-
 from core.constraints.abstract import (
     ConstraintApp,
     ConstraintParam,
@@ -13,6 +11,8 @@ from core.utils import InvalidAddressException, TokenClient
 
 class BridgeEthToArb(ConstraintVerification):
     app_name = ConstraintApp.ARBITRUM.value
+    # bridged after from_time, the start of the raffle
+    is_object_dependent = True
 
     def is_observed(self, *args, **kwargs) -> bool:
         try:
@@ -26,9 +26,7 @@ class BridgeEthToArb(ConstraintVerification):
     def has_bridged(self, from_time=None):
         subgraph = Subgraph()
 
-        user_wallets = self.user_profile.wallets.values_list(
-            Lower("address"), flat=True
-        )
+        user_wallets = self.facts.lower_wallet_addresses
 
         if from_time:
             query = """
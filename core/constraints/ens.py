@@ -4,12 +4,13 @@ from core.constraints.abstract import ConstraintApp, ConstraintVerification
 class HasENSVerification(ConstraintVerification):
     _param_keys = []
     app_name = ConstraintApp.ENS.value
+    stale_while_revalidate = 30 * 60
 
     def is_observed(self, *args, **kwargs) -> bool:
         from authentication.models import ENSConnection
 
         try:
-            ens = ENSConnection.get_connection(self.user_profile)
+            ens = self.facts.get_connection(ENSConnection)
         except ENSConnection.DoesNotExist:
             return False
         return ens.is_connected()
@@ -0,0 +1,101 @@
+import logging
+import math
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from brightIDfaucet.settings import (
+    CONSTRAINT_CHECK_DEADLINE,
+    CONSTRAINT_CHECK_MAX_WORKERS,
+    CONSTRAINT_CHECK_TIMEOUT,
+)
+
+
+class ConstraintTimeout(Exception):
+    pass
+
+
+class ConstraintExecutor:
+    """Checks independent constraints concurrently.
+
+    Most constraints wait on a third party API or an RPC, so they run side by
+    side in a bounded thread pool. A check that runs longer than timeout
+    seconds, or has not finished by the overall deadline, is reported as a
+    ConstraintTimeout instead of holding up the response.
+
+    Every thread queries through a connection of its own, closed once its
+    check is done, so a check left running after its timeout doesn't touch
+    the connection of the caller. Inside a transaction the checks run
+    serially on the calling thread instead, since other connections can't see
+    its writes, callers check the constraints before they open one.
+    """
+
+    def __init__(
+        self,
+        max_workers=CONSTRAINT_CHECK_MAX_WORKERS,
+        timeout=CONSTRAINT_CHECK_TIMEOUT,
+        deadline=CONSTRAINT_CHECK_DEADLINE,
+    ):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.deadline = deadline
+
+    @staticmethod
+    def _run(func, item, started_at):
+        started_at[item] = time.monotonic()
+        try:
+            return func(item)
+        finally:
+            connections[DEFAULT_DB_ALIAS].close()
+
+    def map(self, func, items) -> dict:
+        """
+        :param func: the check of one item
+        :return: {item: result}, a ConstraintTimeout instance as the result of
+            the items that timed out
+        :raise: the first exception raised by a check
+        """
+        items = list(items)
+        if (
+            len(items) <= 1
+            or self.max_workers <= 1
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return {item: func(item) for item in items}
+
+        max_workers = min(self.max_workers, len(items))
+        rounds = math.ceil(len(items) / max_workers)
+        deadline = time.monotonic() + min(self.deadline, self.timeout * rounds)
+        started_at = {}
+
+        results = {}
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        futures = {
+            executor.submit(self._run, func, item, started_at): item for item in items
+        }
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = wait(
+                    pending,
+                    timeout=min(0.1, self.timeout),
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    results[futures[future]] = future.result()
+
+                now = time.monotonic()
+                for future in list(pending):
+                    item = futures[future]
+                    if now > deadline or (
+                        item in started_at and now - started_at[item] > self.timeout
+                    ):
+                        pending.remove(future)
+                        logging.warning(f"Checking {item} timed out")
+                        results[item] = ConstraintTimeout(str(item))
+        finally:
+            # timed out checks are left to finish on their own, their results
+            # are dropped and they close their own connections
+            executor.shutdown(wait=False, cancel_futures=True)
+        return results
@@ -0,0 +1,144 @@
+import threading
+
+
+class UserFacts:
+    """Facts about a user shared by all the constraints of one validation
+    pass: wallets, third party connections, Farcaster and Lens profiles,
+    Twitter identity, passport score and token balances.
+
+    Each fact is looked up at most once per pass. The constraints of a pass
+    may run concurrently, so a constraint asking for a fact that is being
+    looked up waits for it instead of repeating the lookup.
+    """
+
+    _missing = object()
+
+    def __init__(self, user_profile):
+        self.user_profile = user_profile
+        self._facts = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        """
+        :param key: hashable name of the fact
+        :param compute: called without arguments the first time the fact is
+            needed, exceptions are not memoized
+        """
+        value = self._facts.get(key, self._missing)
+        if value is not self._missing:
+            return value
+        with self._lock:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+        with key_lock:
+            value = self._facts.get(key, self._missing)
+            if value is self._missing:
+                value = self._facts[key] = compute()
+        return value
+
+    def get_wallet_addresses(self, wallet_type=None) -> list[str]:
+        def compute():
+            wallets = self.user_profile.wallets.all()
+            if wallet_type is not None:
+                wallets = wallets.filter(wallet_type=wallet_type)
+            return list(wallets.values_list("address", flat=True))
+
+        return self.get(("wallet_addresses", wallet_type), compute)
+
+    @property
+    def evm_addresses(self) -> list[str]:
+        from core.models import NetworkTypes
+
+        return self.get_wallet_addresses(NetworkTypes.EVM)
+
+    @property
+    def lower_wallet_addresses(self) -> list[str]:
+        return self.get(
+            "lower_wallet_addresses",
+            lambda: [address.lower() for address in self.get_wallet_addresses()],
+        )
+
+    def get_connection(self, connection_cls):
+        """
+        :raise: connection_cls.DoesNotExist
+        """
+
+        def compute():
+            try:
+                return connection_cls.get_connection(self.user_profile)
+            except connection_cls.DoesNotExist:
+                return None
+
+        connection = self.get(("connection", connection_cls.__name__), compute)
+        if connection is None:
+            raise connection_cls.DoesNotExist
+        return connection
+
+    @property
+    def farcaster_util(self):
+        from core.thirdpartyapp import FarcasterUtil
+
+        return self.get("farcaster_util", FarcasterUtil)
+
+    @property
+    def lens_util(self):
+        from core.thirdpartyapp import LensUtil
+
+        return self.get("lens_util", LensUtil)
+
+    @property
+    def twitter_username(self) -> str:
+        from authentication.models import TwitterConnection
+
+        return self.get(
+            "twitter_username",
+            lambda: self.get_connection(TwitterConnection).username,
+        )
+
+    @property
+    def twitter_utils(self):
+        from authentication.models import TwitterConnection
+        from core.thirdpartyapp import TwitterUtils
+
+        def compute():
+            twitter = self.get_connection(TwitterConnection)
+            return TwitterUtils(twitter.access_token, twitter.access_token_secret)
+
+        return self.get("twitter_utils", compute)
+
+    @property
+    def passport_score(self):
+        from authentication.models import GitcoinPassportConnection
+
+        return self.get(
+            "passport_score",
+            lambda: self.get_connection(GitcoinPassportConnection).score,
+        )
+
+    def get_token_amounts(
+        self, kind, chain_pk, token_address, user_addresses, compute
+    ) -> dict:
+        """
+        :param kind: what is read, e.g. the balance or the transferred amount
+        :param compute: called with the addresses whose amount is not known
+            yet, returns {address: amount}
+        :return: {address: amount}
+        """
+
+        def get_key(address):
+            return ("token_amount", kind, chain_pk, token_address, address.lower())
+
+        with self._lock:
+            group_lock = self._locks.setdefault(
+                ("token_amounts", kind, chain_pk, token_address), threading.Lock()
+            )
+        with group_lock:
+            missing = [
+                address
+                for address in user_addresses
+                if get_key(address) not in self._facts
+            ]
+            if missing:
+                for address, amount in compute(missing).items():
+                    self._facts[get_key(address)] = amount
+        return {address: self._facts[get_key(address)] for address in user_addresses}
@@ -5,18 +5,18 @@ from core.constraints.abstract import (
     ConstraintParam,
     ConstraintVerification,
 )
-from core.thirdpartyapp import FarcasterUtil
 
 
 class HasFarcasterProfile(ConstraintVerification):
     _param_keys = []
     app_name = ConstraintApp.FARCASTER.value
+    stale_while_revalidate = 30 * 60
 
     def is_observed(self, *args, **kwargs) -> bool:
         from authentication.models import FarcasterConnection
 
         try:
-            fa_connection = FarcasterConnection.get_connection(self.user_profile)
+            fa_connection = self.facts.get_connection(FarcasterConnection)
         except FarcasterConnection.DoesNotExist:
             logging("Farcaster connection not found.")
             return False
@@ -26,14 +26,15 @@ class HasFarcasterProfile(ConstraintVerification):
 class IsFollowingFarcasterUser(ConstraintVerification):
     _param_keys = [ConstraintParam.FARCASTER_FID]
     app_name = ConstraintApp.FARCASTER.value
+    stale_while_revalidate = 30 * 60
 
     def is_observed(self, *args, **kwargs) -> bool:
         from authentication.models import FarcasterConnection
 
         farcaster_fid = self.param_values[ConstraintParam.FARCASTER_FID.name]
-        farcaster_util = FarcasterUtil()
+        farcaster_util = self.facts.farcaster_util
         try:
-            fa_connection = FarcasterConnection.get_connection(self.user_profile)
+            fa_connection = self.facts.get_connection(FarcasterConnection)
         except FarcasterConnection.DoesNotExist:
             logging.error("Farcaster connection not found.")
             return False
@@ -45,6 +46,7 @@ class IsFollowingFarcasterUser(ConstraintVerification):
 class BeFollowedByFarcasterUser(ConstraintVerification):
     _param_keys = [ConstraintParam.FARCASTER_FID]
     app_name = ConstraintApp.FARCASTER.value
+    stale_while_revalidate = 30 * 60
 
     def __init__(self, user_profile) -> None:
         super().__init__(user_profile)
@@ -53,9 +55,9 @@ class BeFollowedByFarcasterUser(ConstraintVerification):
         from authentication.models import FarcasterConnection
 
         farcaster_fid = self.param_values[ConstraintParam.FARCASTER_FID.name]
-        farcaster_util = FarcasterUtil()
+        farcaster_util = self.facts.farcaster_util
         try:
-            fa_connection = FarcasterConnection.get_connection(self.user_profile)
+            fa_connection = self.facts.get_connection(FarcasterConnection)
         except FarcasterConnection.DoesNotExist:
             logging.error("Farcaster connection not found.")
             return False
@@ -67,13 +69,14 @@ class BeFollowedByFarcasterUser(ConstraintVerification):
 class DidLikedFarcasterCast(ConstraintVerification):
     _param_keys = [ConstraintParam.FARCASTER_CAST_HASH]
     app_name = ConstraintApp.FARCASTER.value
+    stale_while_revalidate = 30 * 60
 
     def is_observed(self, *args, **kwargs) -> bool:
         from authentication.models import FarcasterConnection
 
-        farcaster_util = FarcasterUtil()
+        farcaster_util = self.facts.farcaster_util
         try:
-            fa_connection = FarcasterConnection.get_connection(self.user_profile)
+            fa_connection = self.facts.get_connection(FarcasterConnection)
         except FarcasterConnection.DoesNotExist:
             logging.error("Farcaster connection not found.")
             return False
@@ -88,13 +91,14 @@ class DidLikedFarcasterCast(ConstraintVerification):
 class DidRecastFarcasterCast(ConstraintVerification):
     _param_keys = [ConstraintParam.FARCASTER_CAST_HASH]
     app_name = ConstraintApp.FARCASTER.value
+    stale_while_revalidate = 30 * 60
 
     def is_observed(self, *args, **kwargs) -> bool:
         from authentication.models import FarcasterConnection
 
-        farcaster_util = FarcasterUtil()
+        farcaster_util = self.facts.farcaster_util
         try:
-            fa_connection = FarcasterConnection.get_connection(self.user_profile)
+            fa_connection = self.facts.get_connection(FarcasterConnection)
         except FarcasterConnection.DoesNotExist:
             logging.error("Farcaster connection not found.")
             return False
@@ -109,13 +113,14 @@ class DidRecastFarcasterCast(ConstraintVerification):
 class HasMinimumFarcasterFollower(ConstraintVerification):
     _param_keys = [ConstraintParam.MINIMUM]
     app_name = ConstraintApp.FARCASTER.value
+    stale_while_revalidate = 30 * 60
 
     def is_observed(self, *args, **kwargs) -> bool:
         from authentication.models import FarcasterConnection
 
-        farcaster_util = FarcasterUtil()
+        farcaster_util = self.facts.farcaster_util
         try:
-            fa_connection = FarcasterConnection.get_connection(self.user_profile)
+            fa_connection = self.facts.get_connection(FarcasterConnection)
         except FarcasterConnection.DoesNotExist:
             logging("Farcaster connection not found.")
             return False
@@ -132,13 +137,14 @@ class HasMinimumFarcasterFollower(ConstraintVerification):
 class IsFollowingFarcasterChannel(ConstraintVerification):
     _param_keys = [ConstraintParam.FARCASTER_CHANNEL_ID]
     app_name = ConstraintApp.FARCASTER.value
+    stale_while_revalidate = 30 * 60
 
     def is_observed(self, *args, **kwargs) -> bool:
         from authentication.models import FarcasterConnection
 
-        farcaster_util = FarcasterUtil()
+        farcaster_util = self.facts.farcaster_util
         try:
-            fa_connection = FarcasterConnection.get_connection(self.user_profile)
+            fa_connection = self.facts.get_connection(FarcasterConnection)
         except FarcasterConnection.DoesNotExist:
             logging.error("Farcaster connection not found.")
             return False
@@ -154,13 +160,14 @@ class IsFollowingFarcasterChannel(ConstraintVerification):
 class IsFollowingFarcasterBatch(ConstraintVerification):
     _param_keys = [ConstraintParam.FARCASTER_FIDS]
     app_name = ConstraintApp.FARCASTER.value
+    stale_while_revalidate = 30 * 60
 
-    def get_info(self, *args, **kwargs) -> dict:
+    def fetch_info(self, *args, **kwargs) -> dict:
         from authentication.models import FarcasterConnection
 
-        farcaster_util = FarcasterUtil()
+        farcaster_util = self.facts.farcaster_util
         try:
-            fa_connection = FarcasterConnection.get_connection(self.user_profile)
+            fa_connection = self.facts.get_connection(FarcasterConnection)
         except FarcasterConnection.DoesNotExist:
             logging.error("Farcaster connection not found.")
             return None
@@ -1,8 +1,6 @@
-import csv
 from abc import ABC, abstractmethod
 
 import rest_framework.exceptions
-from django.db.models.functions import Lower
 
 from core.constraints.abstract import ConstraintParam, ConstraintVerification
 from core.utils import InvalidAddressException, NFTClient, TokenClient
@@ -14,6 +12,9 @@ class HasNFTVerification(ConstraintVerification):
         ConstraintParam.ADDRESS,
         ConstraintParam.MINIMUM,
     ]
+    stale_while_revalidate = 10 * 60
+    # an NFT can be passed on to another account to check it again
+    max_staleness = 60
 
     def is_observed(self, *args, **kwargs):
         from core.models import Chain
@@ -25,14 +26,18 @@ class HasNFTVerification(ConstraintVerification):
         chain = Chain.objects.get(pk=chain_pk)
         nft_client = NFTClient(chain=chain, contract=collection_address)
 
-        user_wallets = self.user_profile.wallets.filter(wallet_type=chain.chain_type)
+        user_wallets = self.facts.get_wallet_addresses(chain.chain_type)
 
-        token_count = 0
         try:
-            for wallet in user_wallets:
-                token_count += nft_client.get_number_of_tokens(
-                    nft_client.to_checksum_address(wallet.address)
-                )
+            token_count = sum(
+                self.facts.get_token_amounts(
+                    "nft_balance",
+                    chain.pk,
+                    collection_address,
+                    user_wallets,
+                    nft_client.get_numbers_of_tokens,
+                ).values()
+            )
         except InvalidAddressException as e:
             raise rest_framework.exceptions.ValidationError(e)
 
@@ -45,6 +50,7 @@ class ABCTokenVerification(ConstraintVerification, ABC):
         ConstraintParam.ADDRESS,
         ConstraintParam.MINIMUM,
     ]
+    stale_while_revalidate = 10 * 60
 
     @abstractmethod
     def get_amount(
@@ -52,6 +58,17 @@ class ABCTokenVerification(ConstraintVerification, ABC):
     ) -> int:
         raise NotImplementedError("you must implement this function")
 
+    def get_amounts(
+        self, user_addresses: list[str], token_address: str, token_client: TokenClient
+    ) -> dict[str, int]:
+        """
+        :return: {user_address: amount}, override to read them all at once
+        """
+        return {
+            user_address: self.get_amount(user_address, token_address, token_client)
+            for user_address in user_addresses
+        }
+
     def is_observed(self, *args, **kwargs):
         from core.models import Chain
 
@@ -64,17 +81,22 @@ class ABCTokenVerification(ConstraintVerification, ABC):
 
         chain = Chain.objects.get(pk=chain_pk)
 
-        user_wallets = self.user_profile.wallets.filter(wallet_type=chain.chain_type)
+        user_wallets = self.facts.get_wallet_addresses(chain.chain_type)
 
         token_client = TokenClient(chain=chain, contract=token_address)
 
-        token_count = 0
-
         try:
-            for wallet in user_wallets:
-                token_count += self.get_amount(
-                    wallet.address, token_address, token_client
-                )
+            token_count = sum(
+                self.facts.get_token_amounts(
+                    type(self).__name__,
+                    chain.pk,
+                    token_address,
+                    user_wallets,
+                    lambda addresses: self.get_amounts(
+                        addresses, token_address, token_client
+                    ),
+                ).values()
+            )
         except InvalidAddressException as e:
             raise rest_framework.exceptions.ValidationError(e)
 
@@ -82,6 +104,9 @@ class ABCTokenVerification(ConstraintVerification, ABC):
 
 
 class HasTokenVerification(ABCTokenVerification):
+    # a balance can be moved to another account to check it again
+    max_staleness = 60
+
     def get_amount(
         self, user_address: str, token_address: None | str, token_client: TokenClient
     ) -> int:
@@ -89,6 +114,16 @@ class HasTokenVerification(ABCTokenVerification):
             return token_client.get_native_token_balance(user_address)
         return token_client.get_non_native_token_balance(user_address)
 
+    def get_amounts(
+        self,
+        user_addresses: list[str],
+        token_address: None | str,
+        token_client: TokenClient,
+    ) -> dict[str, int]:
+        if token_address is None:
+            return token_client.get_native_token_balances(user_addresses)
+        return token_client.get_non_native_token_balances(user_addresses)
+
 
 class HasTokenTransferVerification(ABCTokenVerification):
     _param_keys = [
@@ -104,21 +139,35 @@ class HasTokenTransferVerification(ABCTokenVerification):
             return 0
         return token_client.get_non_native_token_transfer_amount(user_address)
 
+    def get_amounts(
+        self,
+        user_addresses: list[str],
+        token_address: None | str,
+        token_client: TokenClient,
+    ) -> dict[str, int]:
+        """the transfers are read from the local index once it has caught up
+        with the chain, and from the logs of the blocks it has not indexed
+        yet. The contract is registered to be indexed otherwise
+        """
+        from core.models import TokenTransferIndex
+
+        if token_address is None:
+            return {user_address: 0 for user_address in user_addresses}
+        index = TokenTransferIndex.register(
+            self.param_values[ConstraintParam.CHAIN.name], token_address
+        )
+        if index.is_backfilled:
+            return index.get_transferred_amounts(user_addresses, token_client)
+        return super().get_amounts(user_addresses, token_address, token_client)
+
 
 class AllowListVerification(ConstraintVerification):
     _param_keys = [ConstraintParam.CSV_FILE]
 
     def is_observed(self, *args, **kwargs):
+        from core.models import AllowList
+
         file_path = self.param_values[ConstraintParam.CSV_FILE.name]
-        self.allow_list = []
-        with open(file_path, newline="") as f:
-            reader = csv.reader(f)
-            data = list(reader)
-            self.allow_list = [a[0].lower() for a in data]
-            user_wallets = self.user_profile.wallets.values_list(
-                Lower("address"), flat=True
-            )
-            for wallet in user_wallets:
-                if wallet in self.allow_list:
-                    return True
-            return False
+        return AllowList.get_indexed(file_path).contains_any(
+            self.facts.lower_wallet_addresses
+        )
@@ -1,7 +1,5 @@
 from enum import Enum
 
-from django.db.models.functions import Lower
-
 from core.constraints.abstract import (
     ConstraintApp,
     ConstraintParam,
@@ -14,15 +12,13 @@ from ..thirdpartyapp.gitcoin_graph import GitcoinGraph
 class HasGitcoinPassportProfile(ConstraintVerification):
     _param_keys = []
     app_name = ConstraintApp.GITCOIN_PASSPORT.value
+    stale_while_revalidate = 30 * 60
 
     def is_observed(self, *args, **kwargs) -> bool:
         from authentication.models import GitcoinPassportConnection
 
-        user_profile = self.user_profile
         try:
-            gitcoint_passport = GitcoinPassportConnection.objects.get(
-                user_profile=user_profile
-            )
+            gitcoint_passport = self.facts.get_connection(GitcoinPassportConnection)
         except GitcoinPassportConnection.DoesNotExist:
             return False
         if gitcoint_passport:
@@ -33,18 +29,16 @@ class HasGitcoinPassportProfile(ConstraintVerification):
 class HasMinimumHumanityScore(ConstraintVerification):
     _param_keys = [ConstraintParam.MINIMUM]
     app_name = ConstraintApp.GITCOIN_PASSPORT.value
+    stale_while_revalidate = 30 * 60
 
     def is_observed(self, *args, **kwargs) -> bool:
         from authentication.models import GitcoinPassportConnection
 
-        user_profile = self.user_profile
         try:
-            gitcoint_passport = GitcoinPassportConnection.objects.get(
-                user_profile=user_profile
-            )
+            passport_score = self.facts.passport_score
         except GitcoinPassportConnection.DoesNotExist:
             return False
-        if float(gitcoint_passport.score) >= float(
+        if float(passport_score) >= float(
             self.param_values[ConstraintParam.MINIMUM.name]
         ):
             return True
@@ -64,6 +58,7 @@ class HasDonatedOnGitcoin(ConstraintVerification):
         HasDonatedParam.ROUND,
     ]
     app_name = ConstraintApp.GITCOIN_PASSPORT.value
+    stale_while_revalidate = 30 * 60
     _graph_url = "https://grants-stack-indexer-v2.gitcoin.co"
 
     def is_observed(self, *args, **kwargs) -> bool:
@@ -80,9 +75,7 @@ class HasDonatedOnGitcoin(ConstraintVerification):
     def has_donated(self, min, num_of_projects, round):
         graph = GitcoinGraph()
 
-        user_wallets = self.user_profile.wallets.values_list(
-            Lower("address"), flat=True
-        )
+        user_wallets = self.facts.lower_wallet_addresses
 
         query = """
             query getDonationsByDonorAddress($address: [String!]!, $round: String!) {
@@ -5,19 +5,19 @@ from core.constraints.abstract import (
     ConstraintParam,
     ConstraintVerification,
 )
-from core.thirdpartyapp import LensUtil
 
 
 class HasLensProfile(ConstraintVerification):
     _param_keys = []
     app_name = ConstraintApp.LENS.value
+    stale_while_revalidate = 30 * 60
 
     def is_observed(self, *args, **kwargs) -> bool:
         from authentication.models import LensConnection
 
-        lens_util = LensUtil()
+        lens_util = self.facts.lens_util
         try:
-            le_connection = LensConnection.get_connection(self.user_profile)
+            le_connection = self.facts.get_connection(LensConnection)
         except LensConnection.DoesNotExist:
             logging("Lens connection not found.")
             return False
@@ -27,14 +27,15 @@ class HasLensProfile(ConstraintVerification):
 class IsFollowingLensUser(ConstraintVerification):
     _param_keys = [ConstraintParam.LENS_PROFILE_ID]
     app_name = ConstraintApp.LENS.value
+    stale_while_revalidate = 30 * 60
 
     def is_observed(self, *args, **kwargs) -> bool:
         from authentication.models import LensConnection
 
-        lens_util = LensUtil()
+        lens_util = self.facts.lens_util
         prfoile_id = self.param_values[ConstraintParam.LENS_PROFILE_ID.name]
         try:
-            le_connection = LensConnection.get_connection(self.user_profile)
+            le_connection = self.facts.get_connection(LensConnection)
         except LensConnection.DoesNotExist:
             logging("Lens connection not found.")
             return False
@@ -44,14 +45,15 @@ class IsFollowingLensUser(ConstraintVerification):
 class BeFollowedByLensUser(ConstraintVerification):
     _param_keys = [ConstraintParam.LENS_PROFILE_ID]
     app_name = ConstraintApp.LENS.value
+    stale_while_revalidate = 30 * 60
 
     def is_observed(self, *args, **kwargs) -> bool:
         from authentication.models import LensConnection
 
-        lens_util = LensUtil()
+        lens_util = self.facts.lens_util
         profile_id = self.param_values[ConstraintParam.LENS_PROFILE_ID.name]
         try:
-            le_connection = LensConnection.get_connection(self.user_profile)
+            le_connection = self.facts.get_connection(LensConnection)
         except LensConnection.DoesNotExist:
             logging("Lens connection not found.")
             return False
@@ -63,14 +65,15 @@ class BeFollowedByLensUser(ConstraintVerification):
 class DidMirrorOnLensPublication(ConstraintVerification):
     _param_keys = [ConstraintParam.LENS_PUBLICATION_ID]
     app_name = ConstraintApp.LENS.value
+    stale_while_revalidate = 30 * 60
 
     def is_observed(self, *args, **kwargs) -> bool:
         from authentication.models import LensConnection
 
-        lens_util = LensUtil()
+        lens_util = self.facts.lens_util
         publication_id = self.param_values[ConstraintParam.LENS_PUBLICATION_ID.name]
         try:
-            le_connection = LensConnection.get_connection(self.user_profile)
+            le_connection = self.facts.get_connection(LensConnection)
         except LensConnection.DoesNotExist:
             logging("Lens connection not found.")
             return False
@@ -84,14 +87,15 @@ class DidMirrorOnLensPublication(ConstraintVerification):
 class DidCollectLensPublication(ConstraintVerification):
     _param_keys = [ConstraintParam.LENS_PUBLICATION_ID]
     app_name = ConstraintApp.LENS.value
+    stale_while_revalidate = 30 * 60
 
     def is_observed(self, *args, **kwargs) -> bool:
         from authentication.models import LensConnection
 
-        lens_util = LensUtil()
+        lens_util = self.facts.lens_util
         publication_id = self.param_values[ConstraintParam.LENS_PUBLICATION_ID.name]
         try:
-            le_connection = LensConnection.get_connection(self.user_profile)
+            le_connection = self.facts.get_connection(LensConnection)
         except LensConnection.DoesNotExist:
             logging("Lens connection not found.")
             return False
@@ -106,14 +110,15 @@ class DidCollectLensPublication(ConstraintVerification):
 class HasMinimumLensFollower(ConstraintVerification):
     _param_keys = [ConstraintParam.MINIMUM]
     app_name = ConstraintApp.LENS.value
+    stale_while_revalidate = 30 * 60
 
     def is_observed(self, *args, **kwargs) -> bool:
         from authentication.models import LensConnection
 
-        lens_util = LensUtil()
+        lens_util = self.facts.lens_util
         minimum = int(self.param_values[ConstraintParam.MINIMUM.name])
         try:
-            le_connection = LensConnection.get_connection(self.user_profile)
+            le_connection = self.facts.get_connection(LensConnection)
         except LensConnection.DoesNotExist:
             logging("Lens connection not found.")
             return False
@@ -129,14 +134,15 @@ class HasMinimumLensFollower(ConstraintVerification):
 class HasMinimumLensPost(ConstraintVerification):
     _param_keys = [ConstraintParam.MINIMUM]
     app_name = ConstraintApp.LENS.value
+    stale_while_revalidate = 30 * 60
 
     def is_observed(self, *args, **kwargs) -> bool:
         from authentication.models import LensConnection
 
-        lens_util = LensUtil()
+        lens_util = self.facts.lens_util
         minimum = int(self.param_values[ConstraintParam.MINIMUM.name])
         try:
-            le_connection = LensConnection.get_connection(self.user_profile)
+            le_connection = self.facts.get_connection(LensConnection)
         except LensConnection.DoesNotExist:
             logging("Lens connection not found.")
             return False
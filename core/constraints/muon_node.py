@@ -1,5 +1,3 @@
-from django.db.models.functions import Lower
-
 from core.constraints.abstract import ConstraintApp, ConstraintVerification
 from core.utils import Web3Utils
 
@@ -67,9 +65,7 @@ class HasMuonNode(ConstraintVerification):
         return False
 
     def has_node(self):
-        user_wallets = self.user_profile.wallets.values_list(
-            Lower("address"), flat=True
-        )
+        user_wallets = self.facts.lower_wallet_addresses
 
         for wallet in user_wallets:
             func = self.web3_utils.contract.functions.stakerAddressInfo(
@@ -17,7 +17,7 @@ class HasTelegramConnection(ConstraintVerification):
         from telegram.models import TelegramConnection
 
         try:
-            twitter = TelegramConnection.get_connection(self.user_profile)
+            twitter = self.facts.get_connection(TelegramConnection)
         except TelegramConnection.DoesNotExist:
             return False
         return twitter.is_connected()
@@ -5,12 +5,13 @@ from core.constraints.abstract import (
     ConstraintParam,
     ConstraintVerification,
 )
-from core.thirdpartyapp import RapidTwitter, TwitterUtils
+from core.thirdpartyapp import RapidTwitter
 
 
 class HasTwitter(ConstraintVerification):
     _param_keys = []
     app_name = ConstraintApp.TWITTER.value
+    stale_while_revalidate = 30 * 60
 
     def __init__(self, user_profile) -> None:
         super().__init__(user_profile)
@@ -19,7 +20,7 @@ class HasTwitter(ConstraintVerification):
         from authentication.models import TwitterConnection
 
         try:
-            twitter = TwitterConnection.get_connection(self.user_profile)
+            twitter = self.facts.get_connection(TwitterConnection)
         except TwitterConnection.DoesNotExist:
             return False
         return twitter.is_connected()
@@ -28,6 +29,7 @@ class HasTwitter(ConstraintVerification):
 class HasMinimumTwitterFollowerCount(ConstraintVerification):
     _param_keys = [ConstraintParam.MINIMUM]
     app_name = ConstraintApp.TWITTER.value
+    stale_while_revalidate = 30 * 60
 
     def __init__(self, user_profile) -> None:
         super().__init__(user_profile)
@@ -36,7 +38,7 @@ class HasMinimumTwitterFollowerCount(ConstraintVerification):
         from authentication.models import TwitterConnection
 
         try:
-            twitter = TwitterConnection.get_connection(self.user_profile)
+            twitter = self.facts.get_connection(TwitterConnection)
         except TwitterConnection.DoesNotExist:
             return False
 
@@ -50,6 +52,7 @@ class HasMinimumTwitterFollowerCount(ConstraintVerification):
 class HasMinimumTweetCount(ConstraintVerification):
     _param_keys = [ConstraintParam.MINIMUM]
     app_name = ConstraintApp.TWITTER.value
+    stale_while_revalidate = 30 * 60
 
     def __init__(self, user_profile) -> None:
         super().__init__(user_profile)
@@ -58,7 +61,7 @@ class HasMinimumTweetCount(ConstraintVerification):
         from authentication.models import TwitterConnection
 
         try:
-            twitter = TwitterConnection.get_connection(self.user_profile)
+            twitter = self.facts.get_connection(TwitterConnection)
         except TwitterConnection.DoesNotExist:
             return False
 
@@ -70,6 +73,7 @@ class HasMinimumTweetCount(ConstraintVerification):
 class HasVoteOnATweet(ConstraintVerification):
     _param_keys = [ConstraintParam.TARGET_TWEET_ID]
     app_name = ConstraintApp.TWITTER.value
+    stale_while_revalidate = 30 * 60
 
     def __init__(self, user_profile) -> None:
         super().__init__(user_profile)
@@ -78,7 +82,7 @@ class HasVoteOnATweet(ConstraintVerification):
         from authentication.models import TwitterConnection
 
         try:
-            twitter = TwitterConnection.get_connection(self.user_profile)
+            twitter = self.facts.get_connection(TwitterConnection)
         except TwitterConnection.DoesNotExist:
             return False
 
@@ -92,6 +96,7 @@ class HasVoteOnATweet(ConstraintVerification):
 class HasCommentOnATweet(ConstraintVerification):
     _param_keys = [ConstraintParam.TARGET_TWEET_ID]
     app_name = ConstraintApp.TWITTER.value
+    stale_while_revalidate = 30 * 60
 
     def __init__(self, user_profile) -> None:
         super().__init__(user_profile)
@@ -100,7 +105,7 @@ class HasCommentOnATweet(ConstraintVerification):
         from authentication.models import TwitterConnection
 
         try:
-            twitter = TwitterConnection.get_connection(self.user_profile)
+            twitter = self.facts.get_connection(TwitterConnection)
         except TwitterConnection.DoesNotExist:
             return False
 
@@ -119,16 +124,17 @@ class HasCommentOnATweet(ConstraintVerification):
 class IsFollowingTwitterUser(ConstraintVerification):
     _param_keys = [ConstraintParam.TWITTER_USERNAME]
     app_name = ConstraintApp.TWITTER.value
+    stale_while_revalidate = 30 * 60
 
     def is_observed(self, *args, **kwargs) -> bool:
         from authentication.models import TwitterConnection
 
         try:
-            twitter = TwitterConnection.get_connection(self.user_profile)
+            self.facts.get_connection(TwitterConnection)
         except TwitterConnection.DoesNotExist:
             return False
 
-        twitter_username = twitter.username
+        twitter_username = self.facts.twitter_username
         rapid_twitter = RapidTwitter()
         try:
             return rapid_twitter.is_following(
@@ -142,16 +148,17 @@ class IsFollowingTwitterUser(ConstraintVerification):
 class BeFollowedByTwitterUser(ConstraintVerification):
     _param_keys = [ConstraintParam.TWITTER_USERNAME]
     app_name = ConstraintApp.TWITTER.value
+    stale_while_revalidate = 30 * 60
 
     def is_observed(self, *args, **kwargs) -> bool:
         from authentication.models import TwitterConnection
 
         try:
-            twitter = TwitterConnection.get_connection(self.user_profile)
+            self.facts.get_connection(TwitterConnection)
         except TwitterConnection.DoesNotExist:
             return False
 
-        twitter_username = twitter.username
+        twitter_username = self.facts.twitter_username
         rapid_twitter = RapidTwitter()
         try:
             return rapid_twitter.is_following(
@@ -167,16 +174,17 @@ class BeFollowedByTwitterUser(ConstraintVerification):
 class DidRetweetTweet(ConstraintVerification):
     _param_keys = [ConstraintParam.TWEET_ID]
     app_name = ConstraintApp.TWITTER.value
+    stale_while_revalidate = 30 * 60
 
     def is_observed(self, *args, **kwargs) -> bool:
         from authentication.models import TwitterConnection
 
         try:
-            twitter = TwitterConnection.get_connection(self.user_profile)
+            self.facts.get_connection(TwitterConnection)
         except TwitterConnection.DoesNotExist:
             return False
         tweet_id = self.param_values[ConstraintParam.TWEET_ID.name]
-        twitter_util = TwitterUtils(twitter.access_token, twitter.access_token_secret)
+        twitter_util = self.facts.twitter_utils
         try:
             return twitter_util.did_retweet_tweet(tweet_id=tweet_id)
         except Exception as e:
@@ -186,16 +194,17 @@ class DidRetweetTweet(ConstraintVerification):
 class DidQuoteTweet(ConstraintVerification):
     _param_keys = [ConstraintParam.TWEET_ID]
     app_name = ConstraintApp.TWITTER.value
+    stale_while_revalidate = 30 * 60
 
     def is_observed(self, *args, **kwargs) -> bool:
         from authentication.models import TwitterConnection
 
         try:
-            twitter = TwitterConnection.get_connection(self.user_profile)
+            self.facts.get_connection(TwitterConnection)
         except TwitterConnection.DoesNotExist:
             return False
         tweet_id = self.param_values[ConstraintParam.TWEET_ID.name]
-        twitter_util = TwitterUtils(twitter.access_token, twitter.access_token_secret)
+        twitter_util = self.facts.twitter_utils
         try:
             return twitter_util.did_quote_tweet(tweet_id=tweet_id)
         except Exception as e:
@@ -204,18 +213,21 @@ class DidQuoteTweet(ConstraintVerification):
 
 class IsFollowingTwitterBatch(ConstraintVerification):
     app_name = ConstraintApp.TWITTER.value
+    stale_while_revalidate = 30 * 60
     _param_keys = [ConstraintParam.TWITTER_IDS]
 
-    def get_info(self, *args, **kwargs) -> None | dict:
+    def fetch_info(self, *args, **kwargs) -> None | dict:
         from authentication.models import TwitterConnection
 
         try:
-            twitter = TwitterConnection.get_connection(self.user_profile)
+            self.facts.get_connection(TwitterConnection)
         except TwitterConnection.DoesNotExist:
             return None
 
-        twitter_username = twitter.username
-        target_ids_list = list(map(str, self.param_values[ConstraintParam.TWITTER_IDS.name]))
+        twitter_username = self.facts.twitter_username
+        target_ids_list = list(
+            map(str, self.param_values[ConstraintParam.TWITTER_IDS.name])
+        )
 
         rapid_twitter = RapidTwitter()
         res = rapid_twitter.is_following_batch_with_cache(
@@ -11,6 +11,8 @@ from core.thirdpartyapp import ZoraUtil
 class DidMintZoraNFT(ConstraintVerification):
     app_name = ConstraintApp.ZORA.value
     _param_keys = [ConstraintParam.ADDRESS]
+    # minted after the start of the raffle
+    is_object_dependent = True
 
     def __init__(self, user_profile, *, obj=None) -> None:
         super().__init__(user_profile, obj=obj)
@@ -1,7 +1,9 @@
 import time
 from contextlib import contextmanager
+
 from django.core.cache import cache
 
+
 @contextmanager
 def memcache_lock(lock_id, oid, lock_expire=60):
     timeout_at = time.monotonic() + lock_expire
@@ -17,4 +19,14 @@ def memcache_lock(lock_id, oid, lock_expire=60):
             # to lessen the chance of releasing an expired lock
             # owned by someone else
             # also don't release the lock if we didn't acquire it
-            cache.delete(lock_id)
\ No newline at end of file
+            cache.delete(lock_id)
+
+
+def is_cache_reachable() -> bool:
+    """A key that can't be added is either there or the cache is down, the
+    sentinel is only missing in the second case."""
+    sentinel_key = "cache-sentinel"
+    if cache.get(sentinel_key) is not None:
+        return True
+    cache.set(sentinel_key, 1, None)
+    return cache.get(sentinel_key) is not None
@@ -0,0 +1,61 @@
+import logging
+
+from django.core.cache import cache
+
+
+class Metrics:
+    """Counters and observations kept in the cache, so they are shared by all
+    web and celery workers.
+
+    Metrics are best effort: a cache failure is logged and never breaks the
+    caller.
+    """
+
+    prefix = "metrics"
+
+    @classmethod
+    def get_key(cls, name):
+        return f"{cls.prefix}:{name}"
+
+    @classmethod
+    def incr(cls, name, value=1):
+        key = cls.get_key(name)
+        try:
+            try:
+                return cache.incr(key, value)
+            except ValueError:
+                # the key does not exist yet
+                if cache.add(key, value, None):
+                    return value
+                return cache.incr(key, value)
+        except Exception as e:
+            logging.warning(f"Could not update metric {name}: {e}")
+            return None
+
+    @classmethod
+    def observe(cls, name, value):
+        """Records one sample, e.g. the size of a batch."""
+        cls.incr(f"{name}.count")
+        cls.incr(f"{name}.sum", int(value))
+        try:
+            cache.set(cls.get_key(f"{name}.last"), value, None)
+        except Exception as e:
+            logging.warning(f"Could not update metric {name}: {e}")
+
+    @classmethod
+    def get(cls, name):
+        return cache.get(cls.get_key(name))
+
+    @classmethod
+    def get_summary(cls, name):
+        """
+        :return: {"count", "sum", "avg", "last"} of an observed metric
+        """
+        count = cls.get(f"{name}.count") or 0
+        total = cls.get(f"{name}.sum") or 0
+        return {
+            "count": count,
+            "sum": total,
+            "avg": total / count if count else None,
+            "last": cls.get(f"{name}.last"),
+        }
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.2 on 2026-10-18 17:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_alter_chain_chain_type_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChainStateSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('block_number', models.BigIntegerField(blank=True, null=True)),
+                ('gas_price', models.BigIntegerField(blank=True, null=True)),
+                ('balances', models.JSONField(blank=True, default=dict)),
+                ('fetched_at', models.DateTimeField()),
+                ('chain', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='state_snapshot', to='core.chain')),
+            ],
+        ),
+    ]
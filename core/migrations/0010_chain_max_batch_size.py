@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-18 17:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_chainstatesnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chain',
+            name='max_batch_size',
+            field=models.PositiveIntegerField(default=32),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-18 17:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_chain_max_batch_size'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chain',
+            name='is_eip1559',
+            field=models.BooleanField(default=False),
+        ),
+    ]
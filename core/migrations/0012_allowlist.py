@@ -0,0 +1,34 @@
+# Generated by Django 5.1.2 on 2026-10-18 18:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_chain_is_eip1559'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AllowList',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_path', models.CharField(max_length=512, unique=True)),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AllowListAddress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('address', models.CharField(max_length=255)),
+                ('allow_list', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='addresses', to='core.allowlist')),
+            ],
+            options={
+                'unique_together': {('allow_list', 'address')},
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.2 on 2026-10-18 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_allowlist'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnitapPass',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token_id', models.BigIntegerField(unique=True)),
+                ('owner', models.CharField(db_index=True, max_length=255)),
+                ('synced_block', models.BigIntegerField(db_index=True, default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.2 on 2026-10-18 18:24
+
+import core.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_unitappass'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TokenTransferIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token_address', models.CharField(max_length=255)),
+                ('indexed_block', models.BigIntegerField(blank=True, null=True)),
+                ('is_backfilled', models.BooleanField(default=False)),
+                ('synced_at', models.DateTimeField(blank=True, null=True)),
+                ('chain', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='token_transfer_indexes', to='core.chain')),
+            ],
+            options={
+                'unique_together': {('chain', 'token_address')},
+            },
+        ),
+        migrations.CreateModel(
+            name='TokenTransfer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sender', models.CharField(max_length=255)),
+                ('amount', core.models.BigNumField(max_length=200)),
+                ('block_number', models.BigIntegerField()),
+                ('tx_hash', models.CharField(max_length=255)),
+                ('log_index', models.PositiveIntegerField()),
+                ('index', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transfers', to='core.tokentransferindex')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['index', 'sender'], name='core_tokent_index_i_01f387_idx')],
+                'unique_together': {('index', 'tx_hash', 'log_index')},
+            },
+        ),
+    ]
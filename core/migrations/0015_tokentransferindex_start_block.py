@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2026-10-18 18:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_tokentransfer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tokentransferindex',
+            name='last_error',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tokentransferindex',
+            name='start_block',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
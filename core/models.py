@@ -1,16 +1,28 @@
 import binascii
+import csv
 import inspect
 import logging
+from collections import defaultdict
+from datetime import timedelta
 
 from bip_utils import Bip44, Bip44Coins
 from django.contrib.postgres.fields import ArrayField
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import F, Max, Sum
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from encrypted_model_fields.fields import EncryptedCharField
 from rest_framework.exceptions import ValidationError
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey
 
+from brightIDfaucet.settings import (
+    CHAIN_STATE_SNAPSHOT_MAX_AGE,
+    TOKEN_TRANSFER_CONFIRMATIONS,
+    TOKEN_TRANSFER_LOG_RANGE,
+    TOKEN_TRANSFER_MAX_BLOCKS_PER_SYNC,
+)
 from core.constraints.captcha import HasVerifiedCloudflareCaptcha, HasVerifiedHCaptcha
 
 from .constraints import (
@@ -56,7 +68,7 @@ from .constraints import (
     IsFollowingTwitterUser,
     HasTelegramConnection,
 )
-from .utils import SolanaWeb3Utils, Web3Utils
+from .utils import GasFeeOracle, SolanaWeb3Utils, Web3Utils
 
 
 class NetworkTypes:
@@ -267,7 +279,11 @@ class Chain(models.Model):
 
     max_gas_price = models.BigIntegerField(default=250000000000)
     gas_multiplier = models.FloatField(default=1)
+    # send type-2 transactions priced from eth_feeHistory
+    is_eip1559 = models.BooleanField(default=False)
     enough_fee_multiplier = models.BigIntegerField(default=200000)
+    # upper bound of the claims sent in one multiWithdrawEth
+    max_batch_size = models.PositiveIntegerField(default=32)
 
     is_testnet = models.BooleanField(default=False)
     chain_type = models.CharField(
@@ -279,8 +295,16 @@ class Chain(models.Model):
     def __str__(self):
         return f"{self.chain_name} - {self.pk} - {self.symbol}:{self.chain_id}"
 
+    def get_state_snapshot(self):
+        return ChainStateSnapshot.get_fresh(self.pk)
+
     @property
     def wallet_balance(self):
+        snapshot = self.get_state_snapshot()
+        if snapshot is not None:
+            wallet_balance = snapshot.get_balance(self.wallet.address)
+            if wallet_balance is not None:
+                return wallet_balance
         return self.get_wallet_balance()
 
     def get_wallet_balance(self):
@@ -307,23 +331,391 @@ class Chain(models.Model):
 
     @property
     def has_enough_fees(self):
-        if self.get_wallet_balance() > self.gas_price * self.enough_fee_multiplier:
+        if self.is_fee_enough(self.wallet_balance, self.gas_price):
             return True
         logging.warning(f"Chain {self.chain_name} has insufficient fees in wallet")
         return False
 
+    def is_fee_enough(self, wallet_balance, gas_price):
+        return wallet_balance > gas_price * self.enough_fee_multiplier
+
     @property
     def gas_price(self):
+        snapshot = self.get_state_snapshot()
+        if snapshot is not None and snapshot.gas_price is not None:
+            return snapshot.gas_price
+        return self.get_gas_price()
+
+    def get_gas_price(self):
         if not self.is_active or not self.rpc_url_private:
             return self.max_gas_price + 1
 
         try:
-            return Web3Utils(self.rpc_url_private, self.poa).get_gas_price()
+            return GasFeeOracle(self).get_gas_price()
         except:  # noqa: E722
             logging.exception(f"Error getting gas price for {self.chain_name}")
             return self.max_gas_price + 1
 
 
+class ChainStateSnapshot(models.Model):
+    """Last on-chain state read by the periodic funding task.
+
+    Request handlers read balances and gas price from here instead of calling
+    the RPC, as long as the snapshot is younger than
+    CHAIN_STATE_SNAPSHOT_MAX_AGE seconds.
+    """
+
+    chain = models.OneToOneField(
+        Chain, related_name="state_snapshot", on_delete=models.CASCADE
+    )
+    version = models.PositiveIntegerField(default=0)
+    block_number = models.BigIntegerField(null=True, blank=True)
+    gas_price = models.BigIntegerField(null=True, blank=True)
+    # lower case address -> balance, for the chain wallet and fund managers
+    balances = models.JSONField(default=dict, blank=True)
+    fetched_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.chain.chain_name} - v{self.version} - {self.fetched_at}"
+
+    @staticmethod
+    def get_cache_key(chain_pk):
+        return f"chain_state_snapshot_{chain_pk}"
+
+    @property
+    def age(self):
+        return timezone.now() - self.fetched_at
+
+    @property
+    def is_fresh(self):
+        return self.age <= timedelta(seconds=CHAIN_STATE_SNAPSHOT_MAX_AGE)
+
+    def get_balance(self, address):
+        if not address:
+            return None
+        return self.balances.get(address.lower())
+
+    @classmethod
+    def get_fresh(cls, chain_pk):
+        snapshot = cache.get(cls.get_cache_key(chain_pk))
+        if snapshot is None:
+            snapshot = cls.objects.filter(chain_id=chain_pk).first()
+            if snapshot is not None and snapshot.is_fresh:
+                cache.set(
+                    cls.get_cache_key(chain_pk),
+                    snapshot,
+                    CHAIN_STATE_SNAPSHOT_MAX_AGE,
+                )
+        if snapshot is None or not snapshot.is_fresh:
+            return None
+        return snapshot
+
+    @classmethod
+    def record(cls, chain, gas_price, block_number, balances):
+        fetched_at = timezone.now()
+        snapshot, _ = cls.objects.get_or_create(
+            chain=chain, defaults={"fetched_at": fetched_at}
+        )
+        cls.objects.filter(pk=snapshot.pk).update(
+            version=F("version") + 1,
+            gas_price=gas_price,
+            block_number=block_number,
+            balances={
+                address.lower(): balance
+                for address, balance in balances.items()
+                if address and balance is not None
+            },
+            fetched_at=fetched_at,
+        )
+        snapshot.refresh_from_db()
+        cache.set(cls.get_cache_key(chain.pk), snapshot, CHAIN_STATE_SNAPSHOT_MAX_AGE)
+        return snapshot
+
+
+class AllowList(models.Model):
+    """Addresses of an uploaded allow list file, parsed once and indexed so
+    AllowListVerification doesn't read the file on every check."""
+
+    file_path = models.CharField(max_length=512, unique=True)
+    size = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.file_path} - {self.size}"
+
+    @staticmethod
+    def parse(file_path) -> set[str]:
+        """
+        :return: the lower case addresses of the first column of the csv file
+        """
+        with open(file_path, newline="") as f:
+            return {row[0].strip().lower() for row in csv.reader(f) if row and row[0]}
+
+    @classmethod
+    def index(cls, file_path):
+        with transaction.atomic():
+            allow_list, created = cls.objects.get_or_create(file_path=file_path)
+            if not created:
+                return allow_list
+            addresses = cls.parse(file_path)
+            AllowListAddress.objects.bulk_create(
+                [
+                    AllowListAddress(allow_list=allow_list, address=address)
+                    for address in addresses
+                ],
+                batch_size=5000,
+            )
+            allow_list.size = len(addresses)
+            allow_list.save(update_fields=["size"])
+        return allow_list
+
+    @classmethod
+    def get_indexed(cls, file_path):
+        """
+        Lists uploaded before they were indexed on upload are indexed on their
+        first check.
+        """
+        allow_list = cls.objects.filter(file_path=file_path).first()
+        if allow_list is None:
+            allow_list = cls.index(file_path)
+        return allow_list
+
+    def contains_any(self, addresses) -> bool:
+        return self.addresses.filter(
+            address__in=[address.lower() for address in addresses]
+        ).exists()
+
+
+class AllowListAddress(models.Model):
+    allow_list = models.ForeignKey(
+        AllowList, related_name="addresses", on_delete=models.CASCADE
+    )
+    address = models.CharField(max_length=255)
+
+    class Meta:
+        unique_together = ("allow_list", "address")
+
+
+class UnitapPass(models.Model):
+    """Owners of the Unitap Pass NFTs, synced from the subgraph so pass checks
+    are a database query."""
+
+    token_id = models.BigIntegerField(unique=True)
+    # lower case
+    owner = models.CharField(max_length=255, db_index=True)
+    # the subgraph block the owner was read at
+    synced_block = models.BigIntegerField(default=0, db_index=True)
+
+    def __str__(self):
+        return f"{self.token_id} - {self.owner}"
+
+    @classmethod
+    def get_token_ids(cls, addresses) -> list[int]:
+        return list(
+            cls.objects.filter(owner__in=addresses)
+            .order_by("token_id")
+            .values_list("token_id", flat=True)
+        )
+
+    @classmethod
+    def get_holders(cls) -> dict[str, set[int]]:
+        """
+        :return: {owner: {token_id}}
+        """
+        holders = defaultdict(set)
+        for token_id, owner in cls.objects.values_list("token_id", "owner"):
+            holders[owner].add(token_id)
+        return holders
+
+    @classmethod
+    def sync(cls, subgraph=None):
+        """Upserts the passes that changed since the last sync, nothing is
+        saved if the subgraph could not be read to the end.
+        :return: number of the passes that changed
+        """
+        from core.thirdpartyapp import Subgraph
+
+        subgraph = subgraph or Subgraph()
+        from_block = cls.objects.aggregate(block=Max("synced_block"))["block"] or 0
+        changes = subgraph.get_unitap_pass_changes(from_block)
+        if changes is None:
+            return 0
+        block, nfts = changes
+        cls.objects.bulk_create(
+            [
+                cls(
+                    token_id=int(nft["tokenId"]),
+                    owner=nft["owner"].lower(),
+                    synced_block=block,
+                )
+                for nft in nfts
+            ],
+            update_conflicts=True,
+            unique_fields=["token_id"],
+            update_fields=["owner", "synced_block"],
+            batch_size=1000,
+        )
+        return len(nfts)
+
+
+class TokenTransferIndex(models.Model):
+    """Cursor of the ERC-20 Transfer logs of a contract that are indexed into
+    TokenTransfer, so HasTokenTransferVerification sums them with a query
+    instead of reading the logs of every sender from the chain."""
+
+    chain = models.ForeignKey(
+        Chain, related_name="token_transfer_indexes", on_delete=models.CASCADE
+    )
+    # lower case
+    token_address = models.CharField(max_length=255)
+    # the first block that is indexed, the deployment block of the contract
+    # unless it is set before the first sync. It has to be set when the node
+    # of the chain is not an archive node
+    start_block = models.BigIntegerField(null=True, blank=True)
+    # the last block whose logs are indexed, None before the first sync
+    indexed_block = models.BigIntegerField(null=True, blank=True)
+    # the logs are indexed up to the chain head at least once
+    is_backfilled = models.BooleanField(default=False)
+    synced_at = models.DateTimeField(null=True, blank=True)
+    # why the last sync stopped, None once a sync succeeds
+    last_error = models.TextField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ("chain", "token_address")
+
+    def __str__(self):
+        return f"{self.chain} - {self.token_address} - {self.indexed_block}"
+
+    @classmethod
+    def register(cls, chain_pk, token_address):
+        index, _ = cls.objects.get_or_create(
+            chain_id=chain_pk, token_address=token_address.lower()
+        )
+        return index
+
+    def get_start_block(self, token_client, head: int) -> int:
+        """
+        :raise: the error of the deployment block search, after it is recorded
+            in last_error, as a late start block would undercount the transfers
+        """
+        if self.start_block is None:
+            try:
+                self.start_block = token_client.get_deployment_block(head)
+            except Exception as e:
+                self.last_error = (
+                    f"Set the start block, deployment block not found: {e}"
+                )
+                self.save(update_fields=["last_error"])
+                raise
+            self.save(update_fields=["start_block"])
+        return self.start_block
+
+    def sync(self, token_client=None, max_blocks=TOKEN_TRANSFER_MAX_BLOCKS_PER_SYNC):
+        """Indexes the logs of the blocks after the cursor, the range of a call
+        is halved while the node rejects it. The cursor is saved with the
+        logs of every range, so a failed run continues where it stopped.
+        :return: number of the indexed transfers
+        :raise: the error of the node if it rejects a single block, after it
+            is recorded in last_error
+        """
+        from core.utils import TokenClient
+
+        token_client = token_client or TokenClient(
+            self.chain, contract=self.token_address
+        )
+        head = token_client.web3_utils.get_current_block()
+        head -= TOKEN_TRANSFER_CONFIRMATIONS
+        if self.indexed_block is None:
+            from_block = self.get_start_block(token_client, head)
+        else:
+            from_block = self.indexed_block + 1
+        last_block = min(head, from_block + max_blocks - 1)
+        log_range = TOKEN_TRANSFER_LOG_RANGE
+        count = 0
+        while from_block <= last_block:
+            to_block = min(from_block + log_range - 1, last_block)
+            try:
+                events = token_client.get_transfer_logs(from_block, to_block)
+            except Exception as e:
+                if log_range == 1:
+                    self.last_error = f"Block {from_block}: {e}"
+                    self.save(update_fields=["last_error"])
+                    raise
+                log_range = max(log_range // 2, 1)
+                continue
+            with transaction.atomic():
+                TokenTransfer.objects.bulk_create(
+                    [
+                        TokenTransfer(
+                            index=self,
+                            sender=event.args["from"].lower(),
+                            amount=event.args["value"],
+                            block_number=event.blockNumber,
+                            tx_hash=event.transactionHash.hex(),
+                            log_index=event.logIndex,
+                        )
+                        for event in events
+                    ],
+                    ignore_conflicts=True,
+                    batch_size=1000,
+                )
+                self.indexed_block = to_block
+                self.is_backfilled = self.is_backfilled or to_block >= head
+                self.synced_at = timezone.now()
+                self.last_error = None
+                self.save(
+                    update_fields=[
+                        "indexed_block",
+                        "is_backfilled",
+                        "synced_at",
+                        "last_error",
+                    ]
+                )
+            count += len(events)
+            from_block = to_block + 1
+        return count
+
+    def get_transferred_amounts(self, addresses, token_client=None) -> dict[str, int]:
+        """
+        :param token_client: reads the transfers of the blocks after the cursor
+            from the chain, which the index lags behind
+        :return: {address: total amount transferred from the address}
+        """
+        totals = defaultdict(int)
+        for sender, total in (
+            self.transfers.filter(
+                sender__in=[address.lower() for address in addresses],
+                block_number__lte=self.indexed_block,
+            )
+            .values("sender")
+            .annotate(total=Sum("amount"))
+            .values_list("sender", "total")
+        ):
+            totals[sender] += int(total)
+        if token_client is not None:
+            for event in token_client.get_transfer_logs(
+                self.indexed_block + 1, "latest", senders=addresses
+            ):
+                totals[event.args["from"].lower()] += event.args["value"]
+        return {address: totals[address.lower()] for address in addresses}
+
+
+class TokenTransfer(models.Model):
+    index = models.ForeignKey(
+        TokenTransferIndex, related_name="transfers", on_delete=models.CASCADE
+    )
+    # lower case
+    sender = models.CharField(max_length=255)
+    amount = BigNumField()
+    block_number = models.BigIntegerField()
+    tx_hash = models.CharField(max_length=255)
+    log_index = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = ("index", "tx_hash", "log_index")
+        indexes = [models.Index(fields=["index", "sender"])]
+
+
 class AbstractGlobalSettings(models.Model):
     class Meta:
         abstract = True
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+
+from core.helpers import is_cache_reachable
+from core.metrics import Metrics
+from core.request_helper import RequestException
+
+
+class RateLimitExceeded(RequestException):
+    pass
+
+
+class LocalBucketStore:
+    """Keeps the buckets in the memory of the process, the stand-in of
+    CacheBucketStore in tests and while the cache is unreachable."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._states = {}
+
+    def update(self, key: str, func):
+        """
+        :param func: (state or None) -> (new state, result), applied atomically
+        :return: result of func
+        """
+        with self._lock:
+            state, result = func(self._states.get(key))
+            self._states[key] = state
+            return result
+
+
+class CacheBucketStore:
+    """Keeps the buckets in the shared cache so every web and celery worker
+    draws from the same bucket of a provider. Updates are serialized with a
+    short cache.add lock, which expires on its own if its holder dies."""
+
+    lock_timeout = 1
+
+    def __init__(self) -> None:
+        self.fallback = LocalBucketStore()
+
+    def update(self, key: str, func):
+        lock_key = f"{key}-lock"
+        token = uuid.uuid4().hex
+        while not cache.add(lock_key, token, self.lock_timeout):
+            if not is_cache_reachable():
+                logging.warning(f"Cache is unreachable, {key} is limited locally")
+                return self.fallback.update(key, func)
+            time.sleep(0.005)
+        try:
+            state, result = func(cache.get(key))
+            cache.set(key, state, None)
+            return result
+        finally:
+            # the lock may have expired and been taken by another worker
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+
+
+class TokenBucket:
+    """Allows `calls` calls every `period` seconds to a provider, in bursts of
+    up to `calls`. A call waits for its token up to `max_wait` seconds and
+    fails with RateLimitExceeded after that.
+
+    Throttled calls are counted in the ratelimit.<name> metrics.
+    """
+
+    def __init__(
+        self, name: str, calls: int, period: float, *, max_wait: float, store=None
+    ) -> None:
+        self.name = name
+        self.capacity = calls
+        self.rate = calls / period
+        self.max_wait = max_wait
+        self.store = store or CacheBucketStore()
+
+    @property
+    def key(self) -> str:
+        return f"ratelimit-{self.name}"
+
+    def take(self) -> float:
+        """Takes a token if there is one.
+        :return: 0 if a token was taken, else seconds until the next one
+        """
+
+        def func(state):
+            now = time.time()
+            tokens, updated_at = state or (self.capacity, now)
+            tokens = min(self.capacity, tokens + (now - updated_at) * self.rate)
+            if tokens >= 1:
+                return (tokens - 1, now), 0
+            return (tokens, now), (1 - tokens) / self.rate
+
+        return self.store.update(self.key, func)
+
+    def _get_wait(self, waited: float) -> float:
+        wait = self.take()
+        if wait and waited + wait > self.max_wait:
+            Metrics.incr(f"ratelimit.{self.name}.rejected")
+            raise RateLimitExceeded(f"Rate limit of {self.name} exceeded")
+        return wait
+
+    def _record(self, waited: float):
+        if waited:
+            Metrics.incr(f"ratelimit.{self.name}.throttled")
+            Metrics.observe(f"ratelimit.{self.name}.wait_ms", waited * 1000)
+
+    def acquire(self):
+        waited = 0
+        while wait := self._get_wait(waited):
+            time.sleep(wait)
+            waited += wait
+        self._record(waited)
+
+    async def aacquire(self):
+        waited = 0
+        while wait := self._get_wait(waited):
+            await asyncio.sleep(wait)
+            waited += wait
+        self._record(waited)
@@ -1,21 +1,270 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+from urllib.parse import urlsplit
+
+import httpx
 import requests
 
+from brightIDfaucet.settings import (
+    HTTP_CIRCUIT_FAILURE_THRESHOLD,
+    HTTP_CIRCUIT_RESET_TIMEOUT,
+    HTTP_CLIENT_BACKOFF,
+    HTTP_CLIENT_MAX_RETRIES,
+    HTTP_CLIENT_POOL_SIZE,
+)
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+RETRY_STATUS_CODES = {429, 502, 503, 504}
+
 
 class RequestException(requests.HTTPError):
     pass
 
 
+class CircuitOpenException(RequestException):
+    pass
+
+
+class CircuitBreaker:
+    """Fails the requests to a host fast after it failed `threshold` times in a
+    row. Once `reset_timeout` seconds passed, one request is let through and
+    its result closes the circuit or opens it again.
+    """
+
+    def __init__(self, threshold: int, reset_timeout: int) -> None:
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            # half open, the next failure opens it for another reset_timeout
+            self.opened_at = time.monotonic()
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class HTTPClientRegistry:
+    """Process-wide httpx clients keyed by host, so every integration calling
+    the same API shares one bounded connection pool. Async clients are bound
+    to their event loop and are kept per loop.
+
+    Like Web3ProviderRegistry, the registry is dropped after a fork.
+    """
+
+    _lock = threading.Lock()
+    _clients: dict[str, httpx.Client] = {}
+    _async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+    _breakers: dict[str, CircuitBreaker] = {}
+    _pid = os.getpid()
+
+    @staticmethod
+    def get_host(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    @staticmethod
+    def get_limits() -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=HTTP_CLIENT_POOL_SIZE,
+            max_keepalive_connections=HTTP_CLIENT_POOL_SIZE,
+        )
+
+    @classmethod
+    def _check_pid(cls):
+        if cls._pid != os.getpid():
+            cls._clients = {}
+            cls._async_clients = weakref.WeakKeyDictionary()
+            cls._breakers = {}
+            cls._pid = os.getpid()
+
+    @classmethod
+    def get(cls, host: str) -> httpx.Client:
+        with cls._lock:
+            cls._check_pid()
+            client = cls._clients.get(host)
+            if client is None:
+                client = httpx.Client(limits=cls.get_limits(), http2=HTTP2)
+                cls._clients[host] = client
+            return client
+
+    @classmethod
+    def get_async(cls, host: str) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with cls._lock:
+            cls._check_pid()
+            clients = cls._async_clients.setdefault(loop, {})
+            client = clients.get(host)
+            if client is None:
+                client = httpx.AsyncClient(limits=cls.get_limits(), http2=HTTP2)
+                clients[host] = client
+            return client
+
+    @classmethod
+    def get_breaker(cls, host: str) -> CircuitBreaker:
+        with cls._lock:
+            cls._check_pid()
+            breaker = cls._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    HTTP_CIRCUIT_FAILURE_THRESHOLD, HTTP_CIRCUIT_RESET_TIMEOUT
+                )
+                cls._breakers[host] = breaker
+            return breaker
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            for client in cls._clients.values():
+                client.close()
+            cls._clients = {}
+            cls._async_clients = weakref.WeakKeyDictionary()
+            cls._breakers = {}
+
+
 class RequestHelper:
-    _sessions = {}
+    """Sends the requests of a third party integration through the shared
+    pool of its host. Failed requests are retried with a jittered backoff,
+    and a host that keeps failing is not called until its circuit resets.
+
+    get and post are the sync facade of aget and apost, every one of them
+    raises RequestException.
+
+    :param rate_limiter: core.rate_limit.TokenBucket of the provider, every
+        attempt waits for its token
+    """
 
-    def __init__(self, base_url: None | str = None):
+    def __init__(
+        self,
+        base_url: None | str = None,
+        *,
+        retries: int = HTTP_CLIENT_MAX_RETRIES,
+        rate_limiter=None,
+    ):
         self.base_url = base_url
+        self.retries = retries
+        self.rate_limiter = rate_limiter
 
     def _get_url(self, path: None | str) -> str:
         if not path:
             return self.base_url
         return f"{self.base_url}/{path}" if self.base_url else path
 
+    @staticmethod
+    def get_backoff(attempt: int) -> float:
+        return HTTP_CLIENT_BACKOFF * 2**attempt * random.uniform(0.5, 1.5)
+
+    @staticmethod
+    def _get_request_kwargs(params, headers, timeout, data, json) -> dict:
+        kwargs = {"params": params, "headers": headers, "timeout": timeout}
+        if isinstance(data, (str, bytes)):
+            kwargs["content"] = data
+        else:
+            kwargs["data"] = data
+        kwargs["json"] = json
+        return kwargs
+
+    def _is_retryable(self, attempt: int, response: None | httpx.Response) -> bool:
+        if attempt >= self.retries:
+            return False
+        return response is None or response.status_code in RETRY_STATUS_CODES
+
+    @staticmethod
+    def _get_result(breaker: CircuitBreaker, response, error) -> httpx.Response:
+        if error is not None or response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        if error is not None:
+            raise RequestException(error)
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            raise RequestException(e, response=response)
+        return response
+
+    def request(self, method: str, path: None | str, **kwargs) -> httpx.Response:
+        url = self._get_url(path)
+        host = HTTPClientRegistry.get_host(url)
+        breaker = HTTPClientRegistry.get_breaker(host)
+        if not breaker.allow():
+            raise CircuitOpenException(f"Circuit of {host} is open")
+        client = HTTPClientRegistry.get(host)
+        attempt = 0
+        while True:
+            response, error = None, None
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            try:
+                response = client.request(method, url, **kwargs)
+            except httpx.HTTPError as e:
+                error = e
+            if not self._is_retryable(attempt, response):
+                return self._get_result(breaker, response, error)
+            logging.warning(f"Retrying {method} {url}: {error or response}")
+            time.sleep(self.get_backoff(attempt))
+            attempt += 1
+
+    async def arequest(self, method: str, path: None | str, **kwargs) -> httpx.Response:
+        url = self._get_url(path)
+        host = HTTPClientRegistry.get_host(url)
+        breaker = HTTPClientRegistry.get_breaker(host)
+        if not breaker.allow():
+            raise CircuitOpenException(f"Circuit of {host} is open")
+        client = HTTPClientRegistry.get_async(host)
+        attempt = 0
+        while True:
+            response, error = None, None
+            if self.rate_limiter:
+                await self.rate_limiter.aacquire()
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.HTTPError as e:
+                error = e
+            if not self._is_retryable(attempt, response):
+                return self._get_result(breaker, response, error)
+            logging.warning(f"Retrying {method} {url}: {error or response}")
+            await asyncio.sleep(self.get_backoff(attempt))
+            attempt += 1
+
+    @staticmethod
+    def _get_json(response: httpx.Response) -> dict:
+        try:
+            return response.json()
+        except ValueError as e:
+            raise RequestException(e)
+
     def get(
         self,
         path: str,
@@ -23,16 +272,9 @@ class RequestHelper:
         params: None | tuple | dict = None,
         headers: None | dict = None,
         timeout: None | int = 5,
-        session: None | requests.Session = None,
     ) -> dict:
-        try:
-            url = self._get_url(path)
-            request = session or requests
-            res = request.get(url=url, params=params, headers=headers, timeout=timeout)
-            res.raise_for_status()
-            return res.json()
-        except requests.RequestException as e:
-            raise RequestException(e)
+        kwargs = self._get_request_kwargs(params, headers, timeout, None, None)
+        return self._get_json(self.request("GET", path, **kwargs))
 
     def post(
         self,
@@ -43,24 +285,30 @@ class RequestHelper:
         timeout: None | int = 5,
         data: None | dict = None,
         json: None | dict = None,
-        session: None | requests.Session = None,
     ) -> dict:
-        try:
-            url = self._get_url(path)
-            request = session or requests
-            res = request.post(
-                url=url,
-                params=params,
-                headers=headers,
-                data=data,
-                json=json,
-                timeout=timeout,
-            )
-            res.raise_for_status()
-            return res.json()
-        except requests.RequestException as e:
-            raise RequestException(e)
+        kwargs = self._get_request_kwargs(params, headers, timeout, data, json)
+        return self._get_json(self.request("POST", path, **kwargs))
+
+    async def aget(
+        self,
+        path: str,
+        *,
+        params: None | tuple | dict = None,
+        headers: None | dict = None,
+        timeout: None | int = 5,
+    ) -> dict:
+        kwargs = self._get_request_kwargs(params, headers, timeout, None, None)
+        return self._get_json(await self.arequest("GET", path, **kwargs))
 
-    def get_session(self):
-        session = requests.Session()
-        return session
+    async def apost(
+        self,
+        path: str,
+        *,
+        params: None | tuple = None,
+        headers: None | dict = None,
+        timeout: None | int = 5,
+        data: None | dict = None,
+        json: None | dict = None,
+    ) -> dict:
+        kwargs = self._get_request_kwargs(params, headers, timeout, data, json)
+        return self._get_json(await self.arequest("POST", path, **kwargs))
@@ -6,7 +6,7 @@ from rest_framework import serializers
 
 from core.constraints import ConstraintVerification, get_constraint
 
-from .models import Chain, Sponsor, UserConstraint
+from .models import AllowList, Chain, Sponsor, UserConstraint
 from .utils import UploadFileStorage
 
 
@@ -136,6 +136,8 @@ class ConstraintProviderSerializer(serializers.Serializer):
                 for file in constraint_files:
                     if constraint["CSV_FILE"] == file.name:
                         path = file_storage.save(file)
+                        # parsed once here rather than on every check
+                        AllowList.index(path)
                         constraint["CSV_FILE"] = path
                         file_exist = True
                         break
@@ -0,0 +1,92 @@
+import json
+import logging
+
+from celery import shared_task
+from django.utils import timezone
+
+from core.helpers import memcache_lock
+from core.models import TokenTransferIndex, UnitapPass
+from core.utils import from_task_kwargs, store_constraint_result
+
+
+@shared_task
+def refresh_constraint_result(
+    constraint_name, user_profile_pk, param_values, obj, data, check_kwargs
+):
+    """Checks a constraint whose expired result was served from the cache and
+    caches the new result.
+
+    :param obj: {"obj": model label and pk} of the distribution or raffle
+    :param data: the data the constraint was checked with
+    :param check_kwargs: see AbstractConstraintsValidator.get_check_kwargs
+    """
+    from authentication.models import UserProfile
+    from core.constraints import get_constraint
+    from core.validators import AbstractConstraintsValidator
+
+    constraint = get_constraint(constraint_name)(
+        UserProfile.objects.get(pk=user_profile_pk),
+        obj=from_task_kwargs(obj)["obj"],
+    )
+    if param_values:
+        constraint.param_values = param_values
+    is_verified, info = AbstractConstraintsValidator.check(
+        constraint, data, from_task_kwargs(check_kwargs)
+    )
+    store_constraint_result(constraint, is_verified, info, **data)
+
+
+@shared_task(bind=True)
+def sync_unitap_passes(self):
+    id = f"{self.name}-LOCK"
+
+    with memcache_lock(id, self.app.oid, lock_expire=300) as acquired:
+        if not acquired:
+            logging.info(f"Could not acquire process lock at {self.name}")
+            return
+        count = UnitapPass.sync()
+        logging.info(f"{count} unitap passes changed")
+
+
+def get_active_token_transfer_contracts() -> set[tuple[int, str]]:
+    """
+    :return: {(chain pk, token address)} of the HasTokenTransferVerification
+        constraints of the distributions and raffles that are not finished
+    """
+    from prizetap.models import Raffle
+    from tokenTap.models import TokenDistribution
+
+    name = "core.HasTokenTransferVerification"
+    contracts = set()
+    for model in (TokenDistribution, Raffle):
+        for constraint_params in (
+            model.objects.filter(
+                constraints__name=name, is_active=True, deadline__gt=timezone.now()
+            )
+            .distinct()
+            .values_list("constraint_params", flat=True)
+        ):
+            try:
+                params = json.loads(constraint_params or "{}")[name]
+                contracts.add((int(params["CHAIN"]), params["ADDRESS"].lower()))
+            except (ValueError, KeyError, TypeError) as e:
+                logging.warning(f"Invalid {name} params {constraint_params}: {e}")
+    return contracts
+
+
+@shared_task(bind=True)
+def sync_token_transfers(self):
+    id = f"{self.name}-LOCK"
+
+    with memcache_lock(id, self.app.oid, lock_expire=600) as acquired:
+        if not acquired:
+            logging.info(f"Could not acquire process lock at {self.name}")
+            return
+        for chain_pk, token_address in get_active_token_transfer_contracts():
+            TokenTransferIndex.register(chain_pk, token_address)
+        for index in TokenTransferIndex.objects.select_related("chain"):
+            try:
+                count = index.sync()
+                logging.info(f"{count} transfers of {index} indexed")
+            except Exception as e:
+                logging.error(f"Could not index the transfers of {index}: {e}")
@@ -1,6 +1,18 @@
-from unittest.mock import PropertyMock, patch
-
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import MagicMock, PropertyMock, patch
+
+import httpx
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+from hexbytes import HexBytes
 from rest_framework.test import APITestCase
 
 from authentication.models import (
@@ -9,10 +21,49 @@ from authentication.models import (
     UserProfile,
     Wallet,
 )
-from core.models import Chain, NetworkTypes, WalletAccount
+from core.constants import ERC20_METHODS
+from core.constraints.executor import ConstraintExecutor, ConstraintTimeout
+from core.constraints.facts import UserFacts
+from core.models import (
+    AllowList,
+    Chain,
+    NetworkTypes,
+    TokenTransfer,
+    TokenTransferIndex,
+    UnitapPass,
+    WalletAccount,
+)
+from core.rate_limit import (
+    CacheBucketStore,
+    LocalBucketStore,
+    RateLimitExceeded,
+    TokenBucket,
+)
+from core.request_helper import (
+    CircuitOpenException,
+    HTTPClientRegistry,
+    RequestException,
+    RequestHelper,
+)
+from core.tasks import refresh_constraint_result
+from core.thirdpartyapp import FarcasterUtil, Subgraph, config
+from core.thirdpartyapp.cache import cached_response
 from core.thirdpartyapp.twitter import TwitterUtils
+from core.utils import (
+    DeploymentBlockNotFound,
+    GasFeeOracle,
+    NonceManager,
+    TokenClient,
+    Web3ProviderRegistry,
+    Web3Utils,
+    cache_constraint_result,
+    get_constraint_cache_key,
+    to_task_kwargs,
+)
+from core.validators import AbstractConstraintsValidator
 
 from .constraints import (
+    AllowListVerification,
     Attest,
     BeAttestedBy,
     BrightIDAuraVerification,
@@ -24,9 +75,11 @@ from .constraints import (
     HasMinimumTweetCount,
     HasMinimumTwitterFollowerCount,
     HasNFTVerification,
+    HasTokenTransferVerification,
     HasTokenVerification,
     HasTwitter,
     HasVoteOnATweet,
+    IsFollowingFarcasterBatch,
 )
 
 test_wallet_key = "f57fecd11c6034fd2665d622e866f05f9b07f35f253ebd5563e3d7e76ae66809"
@@ -106,8 +159,8 @@ class TestNFTConstraint(BaseTestCase):
         )
 
     @patch(
-        "core.utils.NFTClient.get_number_of_tokens",
-        lambda a, b: 1,
+        "core.utils.NFTClient.get_numbers_of_tokens",
+        lambda a, addresses: {address: 1 for address in addresses},
     )
     def test_nft_constraint_true(self):
         constraint = HasNFTVerification(self.user_profile)
@@ -121,8 +174,8 @@ class TestNFTConstraint(BaseTestCase):
         self.assertEqual(constraint.is_observed(), True)
 
     @patch(
-        "core.utils.NFTClient.get_number_of_tokens",
-        lambda a, b: 0,
+        "core.utils.NFTClient.get_numbers_of_tokens",
+        lambda a, addresses: {address: 0 for address in addresses},
     )
     def test_nft_constraint_false(self):
         constraint = HasNFTVerification(self.user_profile)
@@ -167,8 +220,8 @@ class TestNonNativeTokenConstraint(BaseTestCase):
         )
 
     @patch(
-        "core.utils.TokenClient.get_non_native_token_balance",
-        lambda a, b: 1000000,
+        "core.utils.TokenClient.get_non_native_token_balances",
+        lambda a, addresses: {address: 1000000 for address in addresses},
     )
     def test_non_native_token_constraint_true(self):
         constraint = HasTokenVerification(self.user_profile)
@@ -182,8 +235,8 @@ class TestNonNativeTokenConstraint(BaseTestCase):
         self.assertEqual(constraint.is_observed(), True)
 
     @patch(
-        "core.utils.TokenClient.get_non_native_token_balance",
-        lambda a, b: 100000,
+        "core.utils.TokenClient.get_non_native_token_balances",
+        lambda a, addresses: {address: 100000 for address in addresses},
     )
     def test_non_native_token_constraint_false(self):
         constraint = HasTokenVerification(self.user_profile)
@@ -197,8 +250,8 @@ class TestNonNativeTokenConstraint(BaseTestCase):
         self.assertEqual(constraint.is_observed(), False)
 
     @patch(
-        "core.utils.TokenClient.get_native_token_balance",
-        lambda a, b: 2 * 10**18,
+        "core.utils.TokenClient.get_native_token_balances",
+        lambda a, addresses: {address: 2 * 10**18 for address in addresses},
     )
     def test_native_token_constraint_true(self):
         constraint = HasTokenVerification(self.user_profile)
@@ -212,8 +265,8 @@ class TestNonNativeTokenConstraint(BaseTestCase):
         self.assertEqual(constraint.is_observed(), True)
 
     @patch(
-        "core.utils.TokenClient.get_native_token_balance",
-        lambda a, b: 2 * 10**18,
+        "core.utils.TokenClient.get_native_token_balances",
+        lambda a, addresses: {address: 2 * 10**18 for address in addresses},
     )
     def test_native_token_constraint_false(self):
         constraint = HasTokenVerification(self.user_profile)
@@ -226,6 +279,26 @@ class TestNonNativeTokenConstraint(BaseTestCase):
 
         self.assertEqual(constraint.is_observed(), False)
 
+    @patch("core.utils.TokenClient.get_non_native_token_balances")
+    def test_balances_are_shared_by_constraints(self, balance_mock):
+        balance_mock.side_effect = lambda addresses: {
+            address: 1000000 for address in addresses
+        }
+        facts = UserFacts(self.user_profile)
+        constraints = []
+        for minimum in (self.minimum, 2 * self.minimum):
+            constraint = HasTokenVerification(self.user_profile, facts=facts)
+            constraint.param_values = {
+                "CHAIN": self.chain.pk,
+                "ADDRESS": self.address,
+                "MINIMUM": minimum,
+            }
+            constraints.append(constraint)
+
+        self.assertEqual([c.is_observed() for c in constraints], [True, True])
+        # one call for all the wallets
+        self.assertEqual(balance_mock.call_count, 1)
+
 
 class TestBeAttestedByConstraint(BaseTestCase):
     def setUp(self):
@@ -568,3 +641,1204 @@ class TestGLMStakingConstraint(BaseTestCase):
         }
 
         self.assertEqual(constraint.is_observed(), True)
+
+
+class TestWeb3ProviderRegistry(BaseTestCase):
+    rpc_url = "http://127.0.0.1:8545"
+
+    def tearDown(self):
+        Web3ProviderRegistry.clear()
+
+    @patch("web3.Web3.is_connected", side_effect=AssertionError)
+    def test_provider_is_shared_without_connectivity_probe(self, is_connected_mock):
+        first = Web3Utils(self.rpc_url).w3
+        second = Web3Utils(self.rpc_url).w3
+
+        self.assertIs(first, second)
+        is_connected_mock.assert_not_called()
+
+    def test_poa_providers_are_separated(self):
+        self.assertIsNot(
+            Web3Utils(self.rpc_url).w3, Web3Utils(self.rpc_url, poa=True).w3
+        )
+
+    def test_registry_is_reset_after_fork(self):
+        first = Web3ProviderRegistry.get(self.rpc_url)
+        with patch("core.utils.os.getpid", return_value=-1):
+            self.assertIsNot(Web3ProviderRegistry.get(self.rpc_url), first)
+
+
+@patch("core.request_helper.time.sleep", lambda seconds: None)
+class TestRequestHelper(BaseTestCase):
+    base_url = "https://api.example.com/v2"
+
+    def tearDown(self):
+        HTTPClientRegistry.clear()
+
+    def mock_transport(self, statuses):
+        statuses = iter(statuses)
+        self.requests = []
+
+        def handler(request):
+            self.requests.append(request)
+            return httpx.Response(next(statuses), json={"ok": True})
+
+        transport = httpx.MockTransport(handler)
+        host = HTTPClientRegistry.get_host(self.base_url)
+        HTTPClientRegistry._clients[host] = httpx.Client(transport=transport)
+        return transport
+
+    def test_client_is_shared_per_host(self):
+        first = RequestHelper(self.base_url)
+        second = RequestHelper(f"{self.base_url}/other")
+        host = HTTPClientRegistry.get_host(first._get_url("path"))
+
+        self.assertEqual(host, HTTPClientRegistry.get_host(second._get_url("path")))
+        self.assertIs(HTTPClientRegistry.get(host), HTTPClientRegistry.get(host))
+
+    def test_failed_request_is_retried(self):
+        self.mock_transport([503, 200])
+
+        res = RequestHelper(self.base_url).get("path", params={"a": 1})
+
+        self.assertEqual(res, {"ok": True})
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(str(self.requests[0].url), f"{self.base_url}/path?a=1")
+
+    def test_client_error_is_not_retried(self):
+        self.mock_transport([404])
+
+        with self.assertRaises(RequestException):
+            RequestHelper(self.base_url).get("path")
+        self.assertEqual(len(self.requests), 1)
+
+    @patch("core.request_helper.HTTP_CIRCUIT_FAILURE_THRESHOLD", 2)
+    def test_circuit_opens_after_failures(self):
+        self.mock_transport([500, 500])
+        helper = RequestHelper(self.base_url, retries=0)
+
+        for _ in range(2):
+            with self.assertRaises(RequestException):
+                helper.post("path", json={})
+        with self.assertRaises(CircuitOpenException):
+            helper.post("path", json={})
+        self.assertEqual(len(self.requests), 2)
+
+    def test_async_request(self):
+        transport = self.mock_transport([200])
+
+        async def get():
+            HTTPClientRegistry._async_clients[asyncio.get_running_loop()] = {
+                HTTPClientRegistry.get_host(self.base_url): httpx.AsyncClient(
+                    transport=transport
+                )
+            }
+            return await RequestHelper(self.base_url).aget("path")
+
+        self.assertEqual(asyncio.run(get()), {"ok": True})
+
+
+class ProfileClient:
+    def __init__(self, lookup):
+        self.lookup = lookup
+
+    @cached_response("test_profile", key=str.lower)
+    def get_profile(self, address):
+        return self.lookup(address)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+@patch.dict(config.RESPONSE_CACHE_TTLS, {"test_profile": (60, 10)})
+class TestResponseCache(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_response_is_cached_by_normalized_key(self):
+        lookup = MagicMock(return_value={"fid": 1})
+
+        self.assertEqual(ProfileClient(lookup).get_profile("0xABC"), {"fid": 1})
+        self.assertEqual(ProfileClient(lookup).get_profile("0xabc"), {"fid": 1})
+        lookup.assert_called_once_with("0xABC")
+
+    def test_not_found_is_cached_for_its_ttl(self):
+        lookup = MagicMock(return_value={})
+        client = ProfileClient(lookup)
+        client.get_profile("0xabc")
+
+        expired_at = time.time() + 11
+        with patch(
+            "django.core.cache.backends.locmem.time.time", return_value=expired_at
+        ):
+            client.get_profile("0xabc")
+        client.get_profile("0xabc")
+
+        self.assertEqual(lookup.call_count, 2)
+
+    @patch.dict(config.RESPONSE_CACHE_TTLS, {"test_profile": (60, None)})
+    def test_not_found_is_not_cached_without_ttl(self):
+        lookup = MagicMock(return_value=None)
+        client = ProfileClient(lookup)
+
+        for _ in range(2):
+            self.assertIsNone(client.get_profile("0xabc"))
+        self.assertEqual(lookup.call_count, 2)
+
+    def test_errors_are_not_cached(self):
+        lookup = MagicMock(side_effect=[RequestException("down"), {"fid": 1}])
+        client = ProfileClient(lookup)
+
+        with self.assertRaises(RequestException):
+            client.get_profile("0xabc")
+        self.assertEqual(client.get_profile("0xabc"), {"fid": 1})
+
+    def test_concurrent_misses_are_coalesced(self):
+        def lookup(address):
+            time.sleep(0.2)
+            return {"fid": 1}
+
+        lookup = MagicMock(side_effect=lookup)
+        client = ProfileClient(lookup)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(
+                executor.map(lambda _: client.get_profile("0xabc"), range(4))
+            )
+
+        self.assertEqual(results, [{"fid": 1}] * 4)
+        lookup.assert_called_once()
+
+    @patch.object(config, "RESPONSE_CACHE_COALESCE_WAIT", 0.1)
+    def test_waiters_stop_waiting_for_a_hung_call(self):
+        started = threading.Event()
+        unblock = threading.Event()
+
+        def lookup(address):
+            if not started.is_set():
+                started.set()
+                unblock.wait(5)
+            return {"fid": 1}
+
+        lookup = MagicMock(side_effect=lookup)
+        client = ProfileClient(lookup)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            hung = executor.submit(client.get_profile, "0xabc")
+            started.wait(5)
+            self.assertEqual(client.get_profile("0xabc"), {"fid": 1})
+            unblock.set()
+            hung.result()
+
+        self.assertEqual(lookup.call_count, 2)
+
+    def test_invalidate(self):
+        lookup = MagicMock(return_value={"fid": 1})
+        client = ProfileClient(lookup)
+        client.get_profile("0xabc")
+
+        ProfileClient.get_profile.invalidate("0xABC")
+        client.get_profile("0xabc")
+
+        self.assertEqual(lookup.call_count, 2)
+
+
+class TestTokenBucket(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.now = 1000.0
+        patcher = patch("core.rate_limit.time.time", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def get_bucket(self, store=None, max_wait=1):
+        return TokenBucket(
+            "test", 5, 1, max_wait=max_wait, store=store or LocalBucketStore()
+        )
+
+    def test_burst_then_refill(self):
+        bucket = self.get_bucket()
+
+        for _ in range(5):
+            self.assertEqual(bucket.take(), 0)
+        self.assertAlmostEqual(bucket.take(), 0.2)
+
+        self.now += 0.2
+        self.assertEqual(bucket.take(), 0)
+
+    @patch("core.rate_limit.Metrics")
+    def test_call_waits_for_its_token(self, metrics):
+        bucket = self.get_bucket()
+        for _ in range(5):
+            bucket.acquire()
+
+        with patch("core.rate_limit.time.sleep", self.sleep):
+            bucket.acquire()
+
+        self.assertAlmostEqual(self.now, 1000.2)
+        metrics.incr.assert_called_once_with("ratelimit.test.throttled")
+
+    @patch("core.rate_limit.Metrics")
+    def test_call_fails_past_max_wait(self, metrics):
+        bucket = self.get_bucket(max_wait=0.1)
+        for _ in range(5):
+            bucket.acquire()
+
+        with self.assertRaises(RateLimitExceeded):
+            bucket.acquire()
+        metrics.incr.assert_called_once_with("ratelimit.test.rejected")
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_bucket_is_shared_through_the_cache(self):
+        cache.clear()
+        # one per worker
+        buckets = [self.get_bucket(CacheBucketStore()) for _ in range(2)]
+
+        for i in range(6):
+            wait = buckets[i % 2].take()
+        self.assertAlmostEqual(wait, 0.2)
+        cache.clear()
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_held_lock_is_waited_for(self):
+        cache.clear()
+        store = CacheBucketStore()
+        cache.set("test-lock", "holder", 1)
+
+        def release(seconds):
+            cache.delete("test-lock")
+
+        with patch("core.rate_limit.time.sleep", side_effect=release) as sleep:
+            self.assertEqual(
+                store.update("test", lambda state: (1, "updated")), "updated"
+            )
+
+        sleep.assert_called_once()
+        self.assertEqual(cache.get("test"), 1)
+        self.assertEqual(store.fallback._states, {})
+        cache.clear()
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_lock_is_released_by_its_owner_only(self):
+        cache.clear()
+        store = CacheBucketStore()
+
+        def func(state):
+            # the lock expired and another worker took it
+            cache.set("test-lock", "other", 1)
+            return 1, None
+
+        store.update("test", func)
+
+        self.assertEqual(cache.get("test-lock"), "other")
+        cache.clear()
+
+    def test_unreachable_cache_limits_locally(self):
+        store = CacheBucketStore()
+
+        self.assertEqual(store.update("test", lambda state: (1, "local")), "local")
+        self.assertEqual(store.fallback._states, {"test": 1})
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class TestFarcasterBatchLookups(BaseTestCase):
+    cast_hash = "0xcast"
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    @staticmethod
+    def get_response(path, params, headers):
+        if path == FarcasterUtil.paths["cast"]:
+            return {"reactions": {"likes": [{"fid": 1}, {"fid": 2}], "recasts": []}}
+        addresses = params["addresses"].split(",")
+        return {
+            address.lower(): [{"fid": i + 2}] for i, address in enumerate(addresses)
+        }
+
+    def test_reactors_are_shared_by_users(self):
+        addresses = [
+            "0x23826Fd930916718a98A21FF170088FBb4C30803",
+            "0x23826Fd930916718a98A21FF170088FBb4C30804",
+        ]
+        with patch.object(
+            FarcasterUtil.requests, "get", side_effect=self.get_response
+        ) as get:
+            # users checked with their own FarcasterUtil
+            self.assertTrue(FarcasterUtil().did_liked_cast(self.cast_hash, addresses))
+            self.assertFalse(
+                FarcasterUtil().did_recast_cast(self.cast_hash, addresses[:1])
+            )
+
+        paths = [c.kwargs["path"] for c in get.call_args_list]
+        self.assertEqual(paths.count(FarcasterUtil.paths["cast"]), 1)
+
+    @patch.object(FarcasterUtil, "bulk_size", 2)
+    def test_followers_status_is_looked_up_in_bulk(self):
+        def get(path, params, headers):
+            return {
+                "users": [
+                    {"fid": fid, "viewer_context": {"following": fid == "3"}}
+                    for fid in params["fids"].split(",")
+                ]
+            }
+
+        with patch.object(FarcasterUtil.requests, "get", side_effect=get) as get:
+            statuses = FarcasterUtil()._get_followers_status(10, ["1", 2, 3, 3])
+
+        self.assertEqual(statuses, {1: False, 2: False, 3: True})
+        self.assertEqual(get.call_count, 2)
+
+    def test_channel_followings_are_looked_up_concurrently(self):
+        threads = set()
+
+        def get(path, params, headers):
+            threads.add(threading.get_ident())
+            time.sleep(0.1)
+            following = params["viewer_fid"] == 3
+            return {"channels": [{"viewer_context": {"following": following}}]}
+
+        with patch.object(
+            FarcasterUtil, "_get_fids_from_addresses", return_value={2, 3}
+        ), patch.object(FarcasterUtil.requests, "get", side_effect=get) as get_mock:
+            self.assertTrue(FarcasterUtil().is_following_channel("unitap", ["0x1"]))
+
+        self.assertEqual(get_mock.call_count, 2)
+        self.assertEqual(len(threads), 2)
+
+
+class TestMulticall(BaseTestCase):
+    rpc_url = "http://127.0.0.1:8545"
+    token = "0xc2132D05D31c914a87C6611C10748AEb04B58e8F"
+    addresses = [
+        "0x23826Fd930916718a98A21FF170088FBb4C30803",
+        "0x23826Fd930916718a98A21FF170088FBb4C30804",
+    ]
+
+    def setUp(self):
+        super().setUp()
+        self.web3_utils = Web3Utils(self.rpc_url)
+        self.web3_utils.set_contract(self.token, ERC20_METHODS)
+        self.funcs = [
+            self.web3_utils.contract.functions.balanceOf(
+                Web3Utils.to_checksum_address(address)
+            )
+            for address in self.addresses
+        ]
+
+    def tearDown(self):
+        Web3ProviderRegistry.clear()
+
+    @staticmethod
+    def encode(value):
+        return value.to_bytes(32, "big")
+
+    def test_contracts_are_shared(self):
+        other = Web3Utils(self.rpc_url)
+        other.set_contract(self.token, ERC20_METHODS)
+
+        self.assertIs(other.contract, self.web3_utils.contract)
+
+    def test_calls_are_aggregated(self):
+        with patch.object(
+            Web3Utils, "multicall3", new_callable=PropertyMock
+        ) as multicall3:
+            aggregate3 = multicall3.return_value.functions.aggregate3
+            aggregate3.return_value.call.return_value = [
+                (True, self.encode(5)),
+                (False, b""),
+            ]
+            results = self.web3_utils.multicall(self.funcs)
+
+        self.assertEqual(results, [5, None])
+        calls = aggregate3.call_args.args[0]
+        self.assertEqual([call[0] for call in calls], [self.token, self.token])
+
+    def test_falls_back_to_batch_request(self):
+        provider = self.web3_utils.w3.provider
+        with patch.object(
+            Web3Utils, "multicall3", new_callable=PropertyMock
+        ) as multicall3, patch.object(
+            provider,
+            "make_batch_request",
+            return_value=[
+                {"result": "0x" + self.encode(7).hex()},
+                {"error": {"message": "execution reverted"}},
+            ],
+        ) as make_batch_request:
+            multicall3.return_value.functions.aggregate3.side_effect = Exception
+            results = self.web3_utils.multicall(self.funcs)
+
+        self.assertEqual(results, [7, None])
+        self.assertEqual(
+            [call[0] for call in make_batch_request.call_args.args[0]],
+            ["eth_call", "eth_call"],
+        )
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class TestNonceManager(BaseTestCase):
+    rpc_url = "http://127.0.0.1:8545"
+    address = "0x90F8bf6A479f320ead074411a4B0e7944Ea8c9C1"
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.transaction_counts = {"pending": 5, "latest": 5}
+        self.w3 = MagicMock()
+        self.w3.eth.chain_id = 1
+        self.w3.eth.get_transaction_count.side_effect = (
+            lambda address, block_identifier: self.transaction_counts[block_identifier]
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def get_manager(self):
+        return NonceManager(self.w3, self.rpc_url, self.address)
+
+    def test_nonces_are_allocated_without_rpc(self):
+        self.assertEqual(self.get_manager().allocate(), 5)
+        self.assertEqual(self.get_manager().allocate(), 6)
+        self.assertEqual(self.get_manager().allocate(), 7)
+        self.assertEqual(self.w3.eth.get_transaction_count.call_count, 1)
+
+    def test_resync_when_wallet_used_elsewhere(self):
+        manager = self.get_manager()
+        manager.allocate()
+        self.transaction_counts = {"pending": 9, "latest": 8}
+        cache.delete(manager.check_key)
+
+        self.assertEqual(manager.allocate(), 9)
+
+    def test_gap_is_detected(self):
+        manager = self.get_manager()
+        for _ in range(3):
+            manager.allocate()
+        # only the first transaction was broadcast and mined
+        self.transaction_counts = {"pending": 6, "latest": 6}
+        cache.delete(manager.check_key)
+        # the allocations were never released
+        manager.in_flight_timeout = 0
+
+        self.assertEqual(manager.allocate(), 6)
+
+    def test_gap_is_repaired_between_broadcasts(self):
+        manager = self.get_manager()
+        for _ in range(3):
+            manager.release(manager.allocate())
+        # the last two were broadcast but dropped from the mempool
+        self.transaction_counts = {"pending": 6, "latest": 6}
+        cache.delete(manager.check_key)
+
+        self.assertEqual(manager.allocate(), 6)
+
+    def test_no_resync_while_allocations_are_in_flight(self):
+        manager = self.get_manager()
+        for _ in range(3):
+            manager.allocate()
+        # the last two are allocated but not broadcast yet
+        self.transaction_counts = {"pending": 6, "latest": 6}
+        cache.delete(manager.check_key)
+
+        self.assertEqual(manager.allocate(), 8)
+
+    def test_allocations_wait_for_the_lock(self):
+        manager = self.get_manager()
+        manager.allocate()
+        cache.set(manager.lock_key, "other", 1)
+
+        def release(seconds):
+            cache.delete(manager.lock_key)
+
+        with patch("core.utils.time.sleep", side_effect=release) as sleep:
+            self.assertEqual(manager.allocate(), 6)
+
+        sleep.assert_called_once()
+
+    def test_lock_timeout_raises(self):
+        manager = self.get_manager()
+        manager.allocate()
+        manager.lock_timeout = 0
+        cache.set(manager.lock_key, "other", 1)
+
+        with patch("core.utils.time.sleep"), self.assertRaises(TimeoutError):
+            manager.allocate()
+
+        self.assertEqual(self.w3.eth.get_transaction_count.call_count, 1)
+
+    def test_reset_waits_for_the_lock(self):
+        manager = self.get_manager()
+        manager.allocate()
+        manager.lock_timeout = 0
+        cache.set(manager.lock_key, "other", 1)
+
+        with patch("core.utils.time.sleep"), self.assertRaises(TimeoutError):
+            manager.reset()
+
+        self.assertEqual(cache.get(manager.key), 6)
+
+    def test_unused_nonce_is_given_back(self):
+        manager = self.get_manager()
+        first = manager.allocate()
+        second = manager.allocate()
+        manager.release(second, is_used=False)
+
+        self.assertEqual(manager.allocate(), 6)
+        manager.release(first)
+        self.assertEqual(list(manager.get_in_flight()), [6])
+
+    def get_web3_utils(self):
+        web3_utils = Web3Utils(self.rpc_url)
+        web3_utils._w3 = self.w3
+        web3_utils._account = MagicMock(address=self.address)
+        return web3_utils
+
+    def test_failed_build_gives_back_nonce(self):
+        web3_utils = self.get_web3_utils()
+        func = MagicMock()
+        func.build_transaction.side_effect = ValueError("execution reverted")
+
+        with self.assertRaises(ValueError):
+            web3_utils.build_contract_txn(func)
+
+        self.assertEqual(web3_utils.nonce_manager.allocate(), 5)
+
+    def test_failed_broadcast_resets_counter(self):
+        web3_utils = self.get_web3_utils()
+        self.w3.eth.send_raw_transaction.side_effect = ValueError("nonce too low")
+
+        with patch.object(web3_utils, "sign_tx", return_value=MagicMock(hash=b"1")):
+            signed_tx = web3_utils.build_contract_txn(MagicMock())
+        with self.assertRaises(ValueError):
+            web3_utils.send_raw_tx(signed_tx)
+
+        self.assertIsNone(cache.get(web3_utils.nonce_manager.key))
+        self.assertEqual(web3_utils.nonce_manager.get_in_flight(), {})
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+    )
+    def test_falls_back_to_rpc_without_cache(self):
+        self.assertEqual(self.get_manager().allocate(), 5)
+        self.assertEqual(self.get_manager().allocate(), 5)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class TestGasFeeOracle(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.chain = Chain.objects.create(
+            chain_name="Ethereum",
+            native_currency_name="ethereum",
+            symbol="ETH",
+            rpc_url_private="http://127.0.0.1:8545",
+            wallet=WalletAccount.objects.create(
+                name="Test Wallet", private_key=test_wallet_key
+            ),
+            chain_id="1",
+            max_gas_price=100,
+            is_eip1559=True,
+        )
+        self.fee_history = {
+            "baseFeePerGas": [10, 12, 20],
+            "reward": [[1, 2, 3], [1, 4, 9], [1, 6, 9]],
+        }
+
+    def tearDown(self):
+        cache.clear()
+
+    @patch("core.utils.Web3Utils.get_gas_price", return_value=30)
+    def test_gas_price_is_cached(self, gas_price_mock):
+        self.assertEqual(GasFeeOracle(self.chain).get_gas_price(), 30)
+        self.assertEqual(self.chain.get_gas_price(), 30)
+        self.assertEqual(gas_price_mock.call_count, 1)
+
+    @patch("core.utils.Web3Utils.get_fee_history")
+    def test_type2_fees(self, fee_history_mock):
+        fee_history_mock.return_value = self.fee_history
+        oracle = GasFeeOracle(self.chain)
+
+        self.assertEqual(
+            oracle.get_tx_fee_params(),
+            {"maxFeePerGas": 44, "maxPriorityFeePerGas": 4},
+        )
+        self.assertEqual(oracle.get_expected_gas_price(), 24)
+        self.assertEqual(fee_history_mock.call_count, 1)
+
+    @patch("core.utils.Web3Utils.get_fee_history")
+    def test_max_fee_is_capped(self, fee_history_mock):
+        fee_history_mock.return_value = {**self.fee_history, "baseFeePerGas": [90]}
+
+        fees = GasFeeOracle(self.chain).get_eip1559_fees()
+
+        self.assertEqual(fees["maxFeePerGas"], 100)
+        self.assertEqual(fees["expected_gas_price"], 94)
+
+    @patch("core.utils.Web3Utils.get_gas_price", return_value=30)
+    @patch("core.utils.Web3Utils.get_fee_history")
+    def test_legacy_fallback(self, fee_history_mock, gas_price_mock):
+        fee_history_mock.return_value = {"baseFeePerGas": [0, 0], "reward": []}
+        self.chain.gas_multiplier = 1.5
+
+        self.assertEqual(GasFeeOracle(self.chain).get_tx_fee_params(), {"gasPrice": 45})
+        self.chain.is_eip1559 = False
+        self.assertEqual(GasFeeOracle(self.chain).get_tx_fee_params(), {"gasPrice": 45})
+        self.assertEqual(fee_history_mock.call_count, 1)
+
+
+class TestConstraintExecutor(TransactionTestCase):
+    def test_checks_run_concurrently(self):
+        started_at = time.monotonic()
+        results = ConstraintExecutor(max_workers=4).map(
+            lambda item: time.sleep(0.3) or item * 2, [1, 2, 3, 4]
+        )
+
+        self.assertEqual(results, {1: 2, 2: 4, 3: 6, 4: 8})
+        self.assertLess(time.monotonic() - started_at, 1)
+
+    def test_slow_check_times_out(self):
+        results = ConstraintExecutor(timeout=0.2).map(
+            lambda item: time.sleep(item) or item, [0, 2]
+        )
+
+        self.assertEqual(results[0], 0)
+        self.assertIsInstance(results[2], ConstraintTimeout)
+
+    def test_checks_query_through_their_own_connections(self):
+        user = User.objects.create_user(username="test", password="1234")
+
+        results = ConstraintExecutor().map(
+            lambda pk: User.objects.filter(pk=pk).exists(), [user.pk, -1]
+        )
+
+        self.assertEqual(results, {user.pk: True, -1: False})
+
+    def test_checks_run_serially_in_a_transaction(self):
+        with transaction.atomic():
+            user = User.objects.create_user(username="test", password="1234")
+            results = ConstraintExecutor().map(
+                lambda pk: (
+                    User.objects.filter(pk=pk).exists(),
+                    threading.get_ident(),
+                ),
+                [user.pk, -1],
+            )
+
+        self.assertEqual(
+            results,
+            {
+                user.pk: (True, threading.get_ident()),
+                -1: (False, threading.get_ident()),
+            },
+        )
+
+    def test_errors_are_raised(self):
+        def check(item):
+            if item:
+                raise ValueError(item)
+            return item
+
+        with self.assertRaises(ValueError):
+            ConstraintExecutor().map(check, [0, 1])
+
+
+class TestUserFacts(BaseTestCase):
+    def test_fact_is_computed_once(self):
+        facts = UserFacts(self.user_profile)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return 1
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _: facts.get("fact", compute), range(4)))
+
+        self.assertEqual(set(results), {1})
+        self.assertEqual(len(calls), 1)
+
+    def test_missing_connection(self):
+        facts = UserFacts(self.user_profile)
+
+        with self.assertNumQueries(1):
+            for _ in range(2):
+                with self.assertRaises(TwitterConnection.DoesNotExist):
+                    facts.get_connection(TwitterConnection)
+
+
+class TestConstraintEvaluation(BaseTestCase):
+    def get_constraint(self):
+        constraint = IsFollowingFarcasterBatch(self.user_profile)
+        constraint.param_values = {"FARCASTER_FIDS": [1, 2]}
+        return constraint
+
+    @patch.object(
+        UserFacts,
+        "get_connection",
+        lambda self, cls: SimpleNamespace(user_wallet_address="0x1"),
+    )
+    @patch.object(FarcasterUtil, "is_following_batch", return_value={1: True, 2: True})
+    def test_info_is_fetched_once(self, is_following_batch):
+        constraint = self.get_constraint()
+
+        for _ in range(2):
+            self.assertEqual(
+                AbstractConstraintsValidator.check(constraint, {}, {}),
+                (True, {1: True, 2: True}),
+            )
+        self.assertEqual(is_following_batch.call_count, 1)
+
+    @patch.object(
+        UserFacts,
+        "get_connection",
+        lambda self, cls: SimpleNamespace(user_wallet_address="0x1"),
+    )
+    @patch.object(FarcasterUtil, "is_following_batch", return_value={1: True, 2: False})
+    def test_new_params_are_fetched_again(self, is_following_batch):
+        constraint = self.get_constraint()
+        self.assertFalse(constraint.is_observed())
+
+        constraint.param_values = {"FARCASTER_FIDS": [1]}
+        is_following_batch.return_value = {1: True}
+
+        self.assertEqual(constraint.evaluate(), (True, {1: True}))
+        self.assertEqual(is_following_batch.call_count, 2)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class TestConstraintResultCache(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.raffles = [MagicMock(pk=1), MagicMock(pk=2)]
+
+    def tearDown(self):
+        cache.clear()
+
+    def get_constraint(self, minimum, obj):
+        constraint = HasMinimumHumanityScore(self.user_profile, obj=obj)
+        constraint.param_values = {"MINIMUM": minimum}
+        return constraint
+
+    def test_result_is_shared_across_objects(self):
+        compute = MagicMock(return_value=(True, None))
+
+        for raffle in self.raffles:
+            result = cache_constraint_result(self.get_constraint(10, raffle), compute)
+            self.assertTrue(result["is_verified"])
+
+        compute.assert_called_once()
+
+    def test_params_are_part_of_the_key(self):
+        self.assertNotEqual(
+            get_constraint_cache_key(self.get_constraint(10, None)),
+            get_constraint_cache_key(self.get_constraint(20, None)),
+        )
+        self.assertNotEqual(
+            get_constraint_cache_key(self.get_constraint(10, None), tweet_id="1"),
+            get_constraint_cache_key(self.get_constraint(10, None), tweet_id="2"),
+        )
+
+    @patch.object(HasMinimumHumanityScore, "is_object_dependent", True)
+    def test_object_dependent_result_is_not_shared(self):
+        # any model instance will do as the checked object
+        objs = [Chain(pk=1), Chain(pk=2)]
+
+        self.assertNotEqual(
+            get_constraint_cache_key(self.get_constraint(10, objs[0])),
+            get_constraint_cache_key(self.get_constraint(10, objs[1])),
+        )
+
+    def test_expired_result_is_served_while_it_is_revalidated(self):
+        constraint = self.get_constraint(10, None)
+        cache_constraint_result(constraint, MagicMock(return_value=(True, None)))
+        compute = MagicMock(return_value=(False, None))
+        revalidate = MagicMock()
+
+        expired_at = time.time() + constraint.valid_cache_until + 10
+        with patch("core.utils.time.time", return_value=expired_at):
+            for _ in range(2):
+                result = cache_constraint_result(
+                    constraint, compute, revalidate=revalidate
+                )
+                self.assertTrue(result["is_verified"])
+
+        compute.assert_not_called()
+        revalidate.assert_called_once()
+
+    @patch.object(HasMinimumHumanityScore, "max_staleness", 5)
+    def test_result_is_not_served_past_max_staleness(self):
+        constraint = self.get_constraint(10, None)
+        cache_constraint_result(constraint, MagicMock(return_value=(True, None)))
+        compute = MagicMock(return_value=(False, None))
+        revalidate = MagicMock()
+
+        expired_at = time.time() + constraint.valid_cache_until + 10
+        with patch("core.utils.time.time", return_value=expired_at):
+            result = cache_constraint_result(constraint, compute, revalidate=revalidate)
+
+        self.assertFalse(result["is_verified"])
+        revalidate.assert_not_called()
+
+    def test_failed_result_is_not_served_stale(self):
+        constraint = self.get_constraint(10, None)
+        cache_constraint_result(constraint, MagicMock(return_value=(False, None)))
+        compute = MagicMock(return_value=(True, None))
+
+        expired_at = time.time() + constraint.invalid_cache_until + 10
+        with patch("core.utils.time.time", return_value=expired_at):
+            result = cache_constraint_result(
+                constraint, compute, revalidate=MagicMock()
+            )
+
+        self.assertTrue(result["is_verified"])
+        compute.assert_called_once()
+
+    @patch.object(HasMinimumHumanityScore, "is_observed", return_value=True)
+    def test_refresh_constraint_result(self, is_observed):
+        refresh_constraint_result(
+            "core.HasMinimumHumanityScore",
+            self.user_profile.pk,
+            {"MINIMUM": 10},
+            to_task_kwargs({"obj": None}),
+            {},
+            to_task_kwargs({"user_profile": self.user_profile}),
+        )
+
+        self.assertEqual(
+            is_observed.call_args.kwargs["user_profile"], self.user_profile
+        )
+        result = cache.get(get_constraint_cache_key(self.get_constraint(10, None)))
+        self.assertTrue(result["is_verified"])
+
+
+class TestAllowListConstraint(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        create_new_wallet(
+            self.user_profile,
+            "0x23826Fd930916718a98A21FF170088FBb4C30803",
+            NetworkTypes.EVM,
+        )
+        f = tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False)
+        f.write("0x23826fd930916718a98a21ff170088fbb4c30803\n0xABC\n\n0xabc\n")
+        f.close()
+        self.file_path = f.name
+        self.addCleanup(os.remove, self.file_path)
+
+    def get_constraint(self):
+        constraint = AllowListVerification(self.user_profile)
+        constraint.param_values = {"CSV_FILE": self.file_path}
+        return constraint
+
+    def test_allow_list_is_indexed(self):
+        allow_list = AllowList.index(self.file_path)
+
+        self.assertEqual(allow_list.size, 2)
+        self.assertEqual(AllowList.index(self.file_path), allow_list)
+        self.assertEqual(allow_list.addresses.count(), 2)
+
+    def test_file_is_not_read_when_indexed(self):
+        AllowList.index(self.file_path)
+
+        with patch.object(AllowList, "parse") as parse:
+            self.assertTrue(self.get_constraint().is_observed())
+        parse.assert_not_called()
+
+    def test_allow_list_is_indexed_on_first_check(self):
+        self.assertTrue(self.get_constraint().is_observed())
+        self.assertEqual(AllowList.objects.get(file_path=self.file_path).size, 2)
+
+    def test_address_not_in_allow_list(self):
+        AllowList.index(self.file_path)
+        Wallet.objects.filter(user_profile=self.user_profile).delete()
+
+        self.assertFalse(self.get_constraint().is_observed())
+
+
+class TestUnitapPass(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.address = "0x23826Fd930916718a98A21FF170088FBb4C30803"
+        create_new_wallet(self.user_profile, self.address, NetworkTypes.EVM)
+
+    @staticmethod
+    def get_response(block, nfts):
+        return {"data": {"_meta": {"block": {"number": block}}, "nfts": nfts}}
+
+    def test_changes_are_paginated_by_id(self):
+        nfts = [
+            {"id": f"0x{i}", "tokenId": str(i), "owner": "0xowner"} for i in range(3)
+        ]
+        responses = [
+            self.get_response(10, nfts[:2]),
+            self.get_response(10, nfts[2:]),
+        ]
+
+        with patch.object(
+            Subgraph, "send_post_request", side_effect=responses
+        ) as send_post_request:
+            block, changes = Subgraph().get_unitap_pass_changes(5, first=2)
+
+        self.assertEqual(block, 10)
+        self.assertEqual(changes, nfts)
+        last_vars = send_post_request.call_args.kwargs["vars"]
+        self.assertEqual(last_vars["lastId"], "0x1")
+        self.assertEqual(last_vars["fromBlock"], 5)
+        self.assertEqual(last_vars["block"], {"number": 10})
+
+    def test_sync_is_incremental(self):
+        subgraph = MagicMock()
+        subgraph.get_unitap_pass_changes.return_value = (
+            10,
+            [
+                {"id": "0x1", "tokenId": "1", "owner": self.address},
+                {"id": "0x2", "tokenId": "2", "owner": "0xother"},
+            ],
+        )
+        self.assertEqual(UnitapPass.sync(subgraph), 2)
+
+        subgraph.get_unitap_pass_changes.return_value = (
+            12,
+            [{"id": "0x2", "tokenId": "2", "owner": self.address}],
+        )
+        self.assertEqual(UnitapPass.sync(subgraph), 1)
+
+        subgraph.get_unitap_pass_changes.assert_called_with(10)
+        self.assertEqual(UnitapPass.get_holders(), {self.address.lower(): {1, 2}})
+
+    def test_failed_sync_saves_nothing(self):
+        subgraph = MagicMock()
+        subgraph.get_unitap_pass_changes.return_value = None
+
+        self.assertEqual(UnitapPass.sync(subgraph), 0)
+        self.assertFalse(UnitapPass.objects.exists())
+
+    def test_has_unitap_pass(self):
+        UnitapPass.objects.create(token_id=7, owner=self.address.lower())
+        UnitapPass.objects.create(token_id=8, owner="0xother")
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.user_profile.has_unitap_pass(), (True, [7]))
+
+    def test_has_no_unitap_pass(self):
+        self.assertEqual(self.user_profile.has_unitap_pass(), (False, []))
+
+
+class TestTokenTransferIndex(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.address = "0x23826Fd930916718a98A21FF170088FBb4C30803"
+        create_new_wallet(self.user_profile, self.address, NetworkTypes.EVM)
+        self.token_address = "0xc2132d05d31c914a87c6611c10748aeb04b58e8f"
+        self.wallet = WalletAccount.objects.create(
+            name="Sepolia Chain Wallet",
+            private_key=test_wallet_key,
+            network_type=NetworkTypes.EVM,
+        )
+        self.chain = Chain.objects.create(
+            chain_name="Polygon",
+            wallet=self.wallet,
+            rpc_url_private="https://polygon-rpc.com/",
+            explorer_url="https://etherscan.io/",
+            native_currency_name="ETH",
+            symbol="ETH",
+            chain_id="1",
+        )
+        self.index = TokenTransferIndex.register(self.chain.pk, self.token_address)
+
+    @staticmethod
+    def get_event(sender, value, block, log_index=0):
+        return SimpleNamespace(
+            args={"from": sender, "to": "0xreceiver", "value": value},
+            blockNumber=block,
+            transactionHash=HexBytes(block.to_bytes(32, "big")),
+            logIndex=log_index,
+        )
+
+    def add_transfer(self, sender, amount, block):
+        TokenTransfer.objects.create(
+            index=self.index,
+            sender=sender.lower(),
+            amount=amount,
+            block_number=block,
+            tx_hash=f"0x{block}",
+            log_index=0,
+        )
+
+    @patch("core.models.TOKEN_TRANSFER_CONFIRMATIONS", 12)
+    @patch("core.models.TOKEN_TRANSFER_LOG_RANGE", 100)
+    def test_sync_halves_rejected_ranges(self):
+        token_client = MagicMock()
+        token_client.web3_utils.get_current_block.return_value = 112
+        token_client.get_deployment_block.return_value = 0
+        token_client.get_transfer_logs.side_effect = [
+            ValueError("query returned more than 10000 results"),
+            [self.get_event(self.address, 10, 5), self.get_event("0xother", 1, 7)],
+            [],
+            [self.get_event(self.address, 20, 100)],
+        ]
+
+        self.assertEqual(self.index.sync(token_client), 3)
+
+        self.assertEqual(
+            [c.args for c in token_client.get_transfer_logs.call_args_list],
+            [(0, 99), (0, 49), (50, 99), (100, 100)],
+        )
+        self.index.refresh_from_db()
+        self.assertEqual(self.index.indexed_block, 100)
+        self.assertTrue(self.index.is_backfilled)
+        self.assertEqual(
+            self.index.get_transferred_amounts([self.address]), {self.address: 30}
+        )
+
+    @patch("core.models.TOKEN_TRANSFER_CONFIRMATIONS", 0)
+    def test_sync_starts_at_deployment_block(self):
+        token_client = MagicMock()
+        token_client.web3_utils.get_current_block.return_value = 1000
+        token_client.get_deployment_block.return_value = 900
+        token_client.get_transfer_logs.return_value = []
+
+        self.index.sync(token_client)
+        self.index.sync(token_client)
+
+        token_client.get_deployment_block.assert_called_once_with(1000)
+        token_client.get_transfer_logs.assert_called_once_with(900, 1000)
+        self.index.refresh_from_db()
+        self.assertEqual(self.index.start_block, 900)
+
+    def test_sync_stops_without_deployment_block(self):
+        token_client = MagicMock()
+        token_client.web3_utils.get_current_block.return_value = 1000
+        token_client.get_deployment_block.side_effect = DeploymentBlockNotFound(
+            "The node does not serve old state"
+        )
+
+        with self.assertRaises(DeploymentBlockNotFound):
+            self.index.sync(token_client)
+
+        token_client.get_transfer_logs.assert_not_called()
+        self.index.refresh_from_db()
+        self.assertIsNone(self.index.start_block)
+        self.assertIsNone(self.index.indexed_block)
+        self.assertIn("Set the start block", self.index.last_error)
+
+    def get_token_client(self, deployment_block):
+        token_client = TokenClient(self.chain, contract=self.token_address)
+        token_client.web3_utils._w3 = MagicMock()
+        token_client.web3_utils.w3.eth.get_code.side_effect = (
+            lambda address, block_identifier: (
+                b"code" if block_identifier >= deployment_block else b""
+            )
+        )
+        return token_client
+
+    def test_deployment_block_is_searched(self):
+        token_client = self.get_token_client(900)
+
+        self.assertEqual(token_client.get_deployment_block(1000), 900)
+
+    def test_deployment_block_needs_archive_node(self):
+        token_client = self.get_token_client(900)
+        token_client.web3_utils.w3.eth.get_balance.side_effect = ValueError(
+            "missing trie node"
+        )
+
+        with self.assertRaises(DeploymentBlockNotFound):
+            token_client.get_deployment_block(1000)
+        token_client.web3_utils.w3.eth.get_code.assert_not_called()
+
+    @patch("core.models.TOKEN_TRANSFER_LOG_RANGE", 2)
+    def test_sync_records_rejected_block(self):
+        self.index.indexed_block = 50
+        self.index.save()
+        token_client = MagicMock()
+        token_client.web3_utils.get_current_block.return_value = 1000
+        token_client.get_transfer_logs.side_effect = ValueError("rejected")
+
+        with self.assertRaises(ValueError):
+            self.index.sync(token_client)
+
+        self.index.refresh_from_db()
+        self.assertEqual(self.index.indexed_block, 50)
+        self.assertEqual(self.index.last_error, "Block 51: rejected")
+
+    def test_sync_continues_from_cursor(self):
+        self.index.indexed_block = 50
+        self.index.save()
+        token_client = MagicMock()
+        token_client.web3_utils.get_current_block.return_value = 1000
+        token_client.get_transfer_logs.return_value = []
+
+        self.index.sync(token_client, max_blocks=10)
+
+        token_client.get_transfer_logs.assert_called_once_with(51, 60)
+        self.index.refresh_from_db()
+        self.assertEqual(self.index.indexed_block, 60)
+        self.assertFalse(self.index.is_backfilled)
+
+    def get_constraint(self):
+        constraint = HasTokenTransferVerification(self.user_profile)
+        constraint.param_values = {
+            "CHAIN": self.chain.pk,
+            "ADDRESS": self.token_address,
+            "MINIMUM": 25,
+        }
+        return constraint
+
+    @patch("core.utils.TokenClient.get_transfer_logs")
+    @patch("core.utils.TokenClient.get_non_native_token_transfer_amount")
+    def test_constraint_reads_backfilled_index(
+        self, get_transfer_amount, get_transfer_logs
+    ):
+        self.index.indexed_block = 2
+        self.index.is_backfilled = True
+        self.index.save()
+        self.add_transfer(self.address, 10, 1)
+        self.add_transfer(self.address, 10, 2)
+        # indexed after the cursor was read, the live logs include it
+        self.add_transfer(self.address, 5, 3)
+        get_transfer_logs.return_value = [self.get_event(self.address, 5, 3)]
+
+        self.assertTrue(self.get_constraint().is_observed())
+        get_transfer_amount.assert_not_called()
+        get_transfer_logs.assert_called_once_with(3, "latest", senders=[self.address])
+
+    @patch(
+        "core.utils.TokenClient.get_non_native_token_transfer_amount",
+        lambda a, b: 30,
+    )
+    def test_constraint_falls_back_to_logs_before_backfill(self):
+        self.index.delete()
+
+        self.assertTrue(self.get_constraint().is_observed())
+        self.assertTrue(
+            TokenTransferIndex.objects.filter(
+                chain=self.chain, token_address=self.token_address
+            ).exists()
+        )
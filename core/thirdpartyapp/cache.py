@@ -0,0 +1,120 @@
+import functools
+import hashlib
+import json
+import threading
+import time
+
+from django.core.cache import cache
+
+from core.thirdpartyapp import config
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+_lock = threading.Lock()
+_calls: dict[str, _Call] = {}
+
+
+def cached_response(endpoint: str, *, key=None, is_not_found=lambda result: not result):
+    """Caches what a third party lookup returns across requests and workers.
+
+    :param endpoint: name of the TTLs of the lookup in config.RESPONSE_CACHE_TTLS
+    :param key: maps the arguments of the lookup to the request they make,
+        e.g. to a lower case address, defaults to the arguments themselves
+    :param is_not_found: results that are cached for the "not found" TTL
+
+    Exceptions are not cached. Concurrent misses of the same request share
+    one call, threads of the process and other processes wait for it up to
+    RESPONSE_CACHE_COALESCE_WAIT seconds before they make their own. The
+    decorated method gets invalidate(*args, **kwargs) to drop a cached
+    response.
+    """
+
+    def decorator(func):
+        def get_cache_key(*args, **kwargs) -> str:
+            request = key(*args, **kwargs) if key else [args, kwargs]
+            digest = hashlib.sha256(
+                json.dumps(request, sort_keys=True, default=str).encode()
+            ).hexdigest()
+            return f"thirdparty-{endpoint}-{digest}"
+
+        def store(cache_key, result):
+            ttl, not_found_ttl = config.RESPONSE_CACHE_TTLS[endpoint]
+            if is_not_found(result):
+                ttl = not_found_ttl
+            if ttl:
+                cache.set(cache_key, {"result": result}, ttl)
+
+        def wait_for_other_process(cache_key, lock_key) -> None | dict:
+            """
+            :return: the cached response once the process holding the lock
+                stored it, None if it failed or took too long
+            """
+            deadline = time.monotonic() + config.RESPONSE_CACHE_COALESCE_WAIT
+            while time.monotonic() < deadline:
+                time.sleep(0.1)
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    return cached
+                if cache.get(lock_key) is None:
+                    return None
+            return None
+
+        def load(self, cache_key, args, kwargs):
+            lock_key = f"{cache_key}-lock"
+            timeout = config.RESPONSE_CACHE_COALESCE_WAIT
+            # the lock is only waited for if the cache is reachable
+            acquired = cache.add(lock_key, 1, timeout)
+            if not acquired and cache.get(lock_key) is not None:
+                cached = wait_for_other_process(cache_key, lock_key)
+                if cached is not None:
+                    return cached["result"]
+            try:
+                result = func(self, *args, **kwargs)
+                store(cache_key, result)
+                return result
+            finally:
+                if acquired:
+                    cache.delete(lock_key)
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            cache_key = get_cache_key(*args, **kwargs)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached["result"]
+
+            with _lock:
+                call = _calls.get(cache_key)
+                is_owner = call is None
+                if is_owner:
+                    call = _calls[cache_key] = _Call()
+            if not is_owner:
+                if not call.done.wait(config.RESPONSE_CACHE_COALESCE_WAIT):
+                    return load(self, cache_key, args, kwargs)
+                if call.error is not None:
+                    raise call.error
+                return call.result
+
+            try:
+                call.result = load(self, cache_key, args, kwargs)
+                return call.result
+            except Exception as e:
+                call.error = e
+                raise
+            finally:
+                with _lock:
+                    _calls.pop(cache_key, None)
+                call.done.set()
+
+        wrapper.invalidate = lambda *args, **kwargs: cache.delete(
+            get_cache_key(*args, **kwargs)
+        )
+        return wrapper
+
+    return decorator
@@ -23,3 +23,22 @@ EAS_BASE_URL = {
 }
 SUBGRAPH_BASE_URL = os.getenv("SUBGRAPH_BASE_URL", "https://api.studio.thegraph.com")
 ZORA_BASE_URL = os.getenv("ZORA_BASE_URL", "https://explorer.zora.energy")
+# seconds, (ttl, "not found" ttl) of the cached third party lookups, see
+# cached_response. None doesn't cache the "not found" results
+RESPONSE_CACHE_TTLS = {
+    "farcaster_profiles": (60 * 60, 5 * 60),
+    "farcaster_cast_reactors": (60, None),
+    "lens_profile": (60 * 60, 5 * 60),
+    "gitcoin_passport_score": (10 * 60, 60),
+    "ens_name": (60 * 60, 10 * 60),
+    "twitter_user_id": (24 * 60 * 60, None),
+}
+# seconds a lookup waits for the same lookup running in another process
+RESPONSE_CACHE_COALESCE_WAIT = float(os.getenv("RESPONSE_CACHE_COALESCE_WAIT", 5))
+# (calls, seconds) allowed by the providers, shared by all the workers
+RATE_LIMITS = {
+    "rapid_twitter": (int(os.getenv("RAPID_TWITTER_RATE_LIMIT", 5)), 1),
+    "neynar": (int(os.getenv("NEYNAR_RATE_LIMIT", 5)), 1),
+}
+# seconds a call waits for its turn before it fails
+RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", 10))
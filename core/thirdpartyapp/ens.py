@@ -1,5 +1,6 @@
 from ens import ENS
 
+from core.thirdpartyapp.cache import cached_response
 from core.utils import Web3Utils
 
 
@@ -25,6 +26,7 @@ class ENSUtil:
         """
         return self.ns.address(name)
 
+    @cached_response("ens_name", key=str.lower, is_not_found=lambda r: r is None)
     def get_name(self, address: str) -> None | str:
         """return name on address
         :param address:
@@ -1,24 +1,36 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
+from core.rate_limit import TokenBucket
 from core.request_helper import RequestException, RequestHelper
 from core.thirdpartyapp import config
+from core.thirdpartyapp.cache import cached_response
 from core.utils import Web3Utils
 
 
 class FarcasterUtil:
-    requests = RequestHelper(config.FARCASTER_BASE_URL)
+    requests = RequestHelper(
+        config.FARCASTER_BASE_URL,
+        rate_limiter=TokenBucket(
+            "neynar", *config.RATE_LIMITS["neynar"], max_wait=config.RATE_LIMIT_MAX_WAIT
+        ),
+    )
     paths = {
         "cast": "cast",
         "get_bulk_profile_by_address": "user/bulk-by-address",
         "get_bulk_profile_by_fid": "user/bulk",
         "get_bulk_channel": "channel/bulk",
     }
+    # fids of a user/bulk call
+    bulk_size = 100
+    # concurrent channel/bulk calls of a channel check
+    max_channel_lookups = 8
 
     def __init__(self):
-        self.session = self.requests.get_session()
-
-    def __del__(self):
-        self.session.close()
+        # responses are kept for the lifetime of the instance, so constraints
+        # sharing it look each profile and cast up once
+        self._bulk_profiles = {}
+        self._reactions = {}
 
     @property
     def headers(self):
@@ -26,21 +38,31 @@ class FarcasterUtil:
 
     def _get_profile(self, address: str) -> dict:
         address = Web3Utils.to_checksum_address(address)
-        params = {"addresses": address}
-        path = self.paths.get("get_bulk_profile_by_address")
-        res = self.requests.get(
-            path=path, headers=self.headers, params=params, session=self.session
-        )
+        res = self._get_bulk_profile([address])
         return res[address.lower()][0]
 
-    def _get_bulk_profile(self, addresses: list[str]) -> dict:
+    @cached_response(
+        "farcaster_profiles", key=lambda addresses: sorted(map(str.lower, addresses))
+    )
+    def _request_bulk_profile(self, addresses: tuple[str]) -> dict:
+        """
+        :return: {lower case address: [profile]}, empty if none of the
+            addresses has a profile
+        """
         path = self.paths.get("get_bulk_profile_by_address")
-        addresses = map(Web3Utils.to_checksum_address, addresses)
         params = {"addresses": ",".join(addresses)}
-        res = self.requests.get(
-            path=path, session=self.session, params=params, headers=self.headers
-        )
-        return res
+        try:
+            return self.requests.get(path=path, params=params, headers=self.headers)
+        except RequestException as e:
+            if e.response is not None and e.response.status_code == 404:
+                return {}
+            raise
+
+    def _get_bulk_profile(self, addresses: list[str]) -> dict:
+        addresses = tuple(map(Web3Utils.to_checksum_address, addresses))
+        if addresses not in self._bulk_profiles:
+            self._bulk_profiles[addresses] = self._request_bulk_profile(addresses)
+        return self._bulk_profiles[addresses]
 
     def get_address_fid(self, address: str) -> None | str:
         """return fid for given EVM address.
@@ -66,21 +88,35 @@ class FarcasterUtil:
             logging.error("user profile for this address not found")
             return None
 
-    def _get_reacts_on_casts(self, cast_hash: str) -> dict:
+    @cached_response("farcaster_cast_reactors", key=str.lower)
+    def _request_cast_reactors(self, cast_hash: str) -> dict[str, frozenset[int]]:
+        """
+        :return: {"likes": {fid}, "recasts": {fid}} of the cast, shared by
+            every user checked against it
+        """
         path = self.paths.get("cast")
         params = {"identifier": cast_hash, "type": "hash"}
 
         res = self.requests.get(
             path=path,
             headers=self.headers,
-            session=self.session,
             params=params,
         )
-        return res["reactions"]
+        return {
+            reaction_type: frozenset(
+                int(reaction["fid"]) for reaction in res["reactions"][reaction_type]
+            )
+            for reaction_type in ("likes", "recasts")
+        }
+
+    def _get_cast_reactors(self, cast_hash: str) -> dict[str, frozenset[int]]:
+        if cast_hash not in self._reactions:
+            self._reactions[cast_hash] = self._request_cast_reactors(cast_hash)
+        return self._reactions[cast_hash]
 
-    def _get_fids_from_addresses(self, addreses: list[str]) -> list[str]:
+    def _get_fids_from_addresses(self, addreses: list[str]) -> set[int]:
         profiles = self._get_bulk_profile(addreses)
-        return set([profiles[address][0]["fid"] for address in profiles])
+        return set([int(profiles[address][0]["fid"]) for address in profiles])
 
     def did_liked_cast(self, cast_hash: str, addresses: list[str]) -> bool:
         """
@@ -90,10 +126,7 @@ class FarcasterUtil:
         """
         try:
             fids = self._get_fids_from_addresses(addresses)
-            likes = self._get_reacts_on_casts(cast_hash)["likes"]
-            for like in likes:
-                if like["fid"] in fids:
-                    return True
+            return not fids.isdisjoint(self._get_cast_reactors(cast_hash)["likes"])
         except (RequestException, KeyError, AttributeError) as e:
             logging.error(f"user not found, error: {e}")
         return False
@@ -106,25 +139,37 @@ class FarcasterUtil:
         """
         try:
             fids = self._get_fids_from_addresses(addresses)
-            recasts = self._get_reacts_on_casts(cast_hash)["recasts"]
-            for recast in recasts:
-                if recast["fid"] in fids:
-                    return True
+            recasts = self._get_cast_reactors(cast_hash)["recasts"]
+            return not fids.isdisjoint(recasts)
         except (RequestException, KeyError, AttributeError) as e:
             logging.error(f"user not found, error: {e}")
         return False
 
-    def _get_followers_status(self, user_fid: str, follower_fids: str | list) -> bool:
-        if isinstance(follower_fids, list):
-            follower_fids = ",".join(map(str, follower_fids))
+    def _get_followers_status(
+        self, user_fid: str, follower_fids: str | list
+    ) -> dict[int, bool]:
+        """
+        :param follower_fids: a fid, comma separated fids or list of fids
+        :return: {fid: whether user_fid follows it}, bulk_size fids a call
+        """
+        if isinstance(follower_fids, (str, int)):
+            follower_fids = str(follower_fids).split(",")
+        fids = list(dict.fromkeys(map(int, follower_fids)))
         path = self.paths.get("get_bulk_profile_by_fid")
-        params = {"viewer_fid": user_fid, "fids": follower_fids}
-        res = self.requests.get(
-            path=path, params=params, session=self.session, headers=self.headers
-        )
-        return {
-            data["fid"]: data["viewer_context"]["following"] for data in res["users"]
-        }
+        statuses = {}
+        for i in range(0, len(fids), self.bulk_size):
+            params = {
+                "viewer_fid": user_fid,
+                "fids": ",".join(map(str, fids[i : i + self.bulk_size])),
+            }
+            res = self.requests.get(path=path, params=params, headers=self.headers)
+            statuses.update(
+                {
+                    int(data["fid"]): data["viewer_context"]["following"]
+                    for data in res["users"]
+                }
+            )
+        return statuses
 
     def is_following(self, fid: str, address: str) -> bool:
         """check if address followed fid or not.
@@ -134,7 +179,7 @@ class FarcasterUtil:
         """
         try:
             follower_fid = self._get_profile(address)["fid"]
-            return self._get_followers_status(follower_fid, fid)[fid]
+            return self._get_followers_status(follower_fid, fid)[int(fid)]
         except (
             RequestException,
             IndexError,
@@ -153,7 +198,8 @@ class FarcasterUtil:
         """
         try:
             following_fid = self._get_profile(address)["fid"]
-            return self._get_follow_status(fid, following_fid)[following_fid]
+            statuses = self._get_followers_status(fid, following_fid)
+            return statuses[int(following_fid)]
         except (
             RequestException,
             IndexError,
@@ -170,24 +216,35 @@ class FarcasterUtil:
         :param addresses: list of EVM address
         :return: True or False
         """
-        path = self.paths.get("get_bulk_channel")
         try:
             fids = self._get_fids_from_addresses(addresses)
-            params = {
-                "ids": channel_id,
-                "type": "id",
-            }
-            for fid in fids:
-                params["viewer_fid"] = fid
-                res = self.requests.get(
-                    path, session=self.session, params=params, headers=self.headers
-                )
-                if res.get("channels")[0].get("viewer_context").get("following"):
-                    return True
+            if not fids:
+                return False
+            statuses = self._get_channel_followings(channel_id, fids)
+            return any(statuses.values())
         except (RequestException, KeyError, AttributeError) as e:
             logging.error(f"Channel not found, error: {e}")
         return False
 
+    def _get_channel_followings(
+        self, channel_id: str, fids: set[int]
+    ) -> dict[int, bool]:
+        """the channel is only looked up for one viewer a call, so the fids
+        are looked up concurrently, through the shared pool of the host
+        :return: {fid: whether fid follows the channel}
+        """
+        path = self.paths.get("get_bulk_channel")
+
+        def get_following(fid):
+            params = {"ids": channel_id, "type": "id", "viewer_fid": fid}
+            res = self.requests.get(path, params=params, headers=self.headers)
+            channel = res.get("channels")[0]
+            return fid, bool(channel.get("viewer_context").get("following"))
+
+        max_workers = min(self.max_channel_lookups, len(fids))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(executor.map(get_following, fids))
+
     def is_following_batch(self, fids: list[str], address: str) -> None | dict:
         try:
             follower_fid = self._get_profile(address)["fid"]
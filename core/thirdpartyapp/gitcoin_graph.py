@@ -1,17 +1,24 @@
 import json
 import logging
 
-import requests
 import zstandard as zstd
 
+from core.request_helper import RequestHelper
+
 
 class GitcoinGraph:
     URL = "https://grants-stack-indexer-v2.gitcoin.co/graphql"
+    requests = RequestHelper(URL)
 
     def send_post_request(self, json_data):
         try:
-            res = requests.post(
-                self.URL, headers={"Content-Type": "application/json"}, json=json_data
+            res = self.requests.request(
+                "POST",
+                None,
+                headers={"Content-Type": "application/json"},
+                json=json_data,
+                # the responses are large, but a hung request is retried
+                timeout=30,
             )
             return json.loads(zstd.decompress(res.content, 1073741824).decode())
         except Exception as e:
@@ -2,6 +2,7 @@ import logging
 
 from core.request_helper import RequestException, RequestHelper
 from core.thirdpartyapp import config
+from core.thirdpartyapp.cache import cached_response
 
 
 class GitcoinPassportRequestError(RequestException):
@@ -41,6 +42,8 @@ class GitcoinPassport:
         except RequestException as e:
             logging.error(f"error in gitcoin-passport occurred: {e}")
             return None
+        finally:
+            self._request_score.invalidate(address)
 
         score = res.get("score")
         return score
@@ -50,10 +53,14 @@ class GitcoinPassport:
         :param address: address that already register in gitcoin passport account
         :return: tuple first elem is total_score second is dict {stamp_name: score}
         """
-        path = f'{self.paths.get("get-score")}/{address}'
         try:
-            res = self.requests.get(path=path, headers=self.headers)
+            res = self._request_score(address)
         except RequestException as e:
             logging.error(f"error in gitcoin-passport occurred: {e}")
             return None
         return res.get("score"), res.get("stamp_scores")
+
+    @cached_response("gitcoin_passport_score", key=str.lower)
+    def _request_score(self, address: str) -> dict:
+        path = f'{self.paths.get("get-score")}/{address}'
+        return self.requests.get(path=path, headers=self.headers)
@@ -1,6 +1,7 @@
 import logging
 
 from core.request_helper import RequestException, RequestHelper
+from core.thirdpartyapp.cache import cached_response
 from core.thirdpartyapp.config import LENS_BASE_URL
 from core.utils import Web3Utils
 
@@ -9,10 +10,8 @@ class LensUtil:
     requests = RequestHelper(base_url=LENS_BASE_URL)
 
     def __init__(self) -> None:
-        self.session = self.requests.get_session()
-
-    def __del__(self):
-        self.session.close()
+        # kept for the lifetime of the instance, see FarcasterUtil
+        self._profile_infos = {}
 
     @property
     def headers(self):
@@ -26,11 +25,13 @@ class LensUtil:
         return json
 
     def _post_request(self, json: dict) -> dict:
-        return self.requests.post(
-            path="", json=json, headers=self.headers, session=self.session
-        )
+        return self.requests.post(path="", json=json, headers=self.headers)
 
-    def _get_profile_info(self, address: str):
+    @cached_response("lens_profile", key=str.lower, is_not_found=lambda r: r is None)
+    def _request_profile_info(self, address: str) -> None | dict:
+        """
+        :return: the default profile of the address, None if it has none
+        """
         query = """
         query DefaultProfile($request: DefaultProfileRequest!) {
           defaultProfile(request: $request) {
@@ -47,9 +48,15 @@ class LensUtil:
             "query": query,
             "variables": variables,
         }
+        res = self._post_request(json=json)
+        return res.get("data").get("defaultProfile")
+
+    def _get_profile_info(self, address: str):
+        if address in self._profile_infos:
+            return self._profile_infos[address]
         try:
-            res = self._post_request(json=json)
-            profile_info = res.get("data").get("defaultProfile")
+            profile_info = self._request_profile_info(address)
+            self._profile_infos[address] = profile_info
             return profile_info
         except RequestException as e:
             logging.error(f"connection lost, {e}")
@@ -12,18 +12,11 @@ class Subgraph:
         "arb_bridge_mainnet": "query/21879/unitap-arb-bridge-mainnet/version/latest",
     }
 
-    def __init__(self):
-        self.session = self.requests.get_session()
-
-    def __del__(self):
-        self.session.close()
-
     def send_post_request(self, path, query, vars, **kwargs):
         try:
             return self.requests.post(
                 path=path,
                 json={"query": query, "variables": vars},
-                session=self.session,
                 **kwargs,
             )
         except RequestException:
@@ -64,3 +57,45 @@ class Subgraph:
                     for item in nfts:
                         count += 1
                         holders[item["owner"]].add(item["tokenId"])
+
+    def get_unitap_pass_changes(
+        self, from_block=0, first=1000
+    ) -> tuple[int, list[dict]] | None:
+        """get the unitap passes changed since from_block, paginated by id
+        instead of skip, all the pages are read at the same block
+        :return: (indexed block number, [{"id", "tokenId", "owner"}]),
+            None if the subgraph could not be read
+        """
+        query = """
+        query GetNFTChanges(
+            $first: Int, $lastId: ID, $fromBlock: Int, $block: Block_height
+        ) {
+            _meta(block: $block) { block { number } }
+            nfts (
+                first: $first,
+                orderBy: id,
+                block: $block,
+                where: {id_gt: $lastId, _change_block: {number_gte: $fromBlock}}
+            ) {
+                id,
+                tokenId,
+                owner
+            }
+        }
+        """
+        vars = {"first": first, "lastId": "", "fromBlock": from_block, "block": None}
+        changes = []
+        while True:
+            res = self.send_post_request(
+                self.paths.get("unitap_pass"), query=query, vars=vars
+            )
+            match res:
+                case {"data": {"_meta": {"block": {"number": block}}, "nfts": nfts}}:
+                    changes.extend(nfts)
+                    if len(nfts) < first:
+                        return block, changes
+                    vars["block"] = {"number": block}
+                    vars["lastId"] = nfts[-1]["id"]
+                case _:
+                    logging.error(f"Unexpected subgraph response {res}")
+                    return None
@@ -3,7 +3,10 @@ import os
 import requests
 import tweepy
 from django.core.cache import cache
-from ratelimit import limits, sleep_and_retry
+
+from core.rate_limit import TokenBucket
+from core.thirdpartyapp import config
+from core.thirdpartyapp.cache import cached_response
 
 
 class TwitterUtilsError(tweepy.TweepyException):
@@ -30,6 +33,7 @@ class TwitterUtils:
             access_token_secret=access_token_secret,
             wait_on_rate_limit=False,
         )
+        self._credentials = None
 
     @classmethod
     def get_authorization_url_and_token(cls) -> tuple:
@@ -67,16 +71,22 @@ class TwitterUtils:
 
         return access_token, access_token_secret
 
+    def verify_credentials(self):
+        # the user of the tokens doesn't change, checked once per instance
+        if self._credentials is None:
+            self._credentials = self.api.verify_credentials()
+        return self._credentials
+
     def get_username(self) -> str:
         try:
-            username = self.api.verify_credentials().screen_name
+            username = self.verify_credentials().screen_name
         except tweepy.TweepyException as e:
             raise TwitterUtilsError(f"Can not get username, error: {e}")
         return username
 
     def get_user_id(self) -> str:
         try:
-            user_id = self.api.verify_credentials().id_str
+            user_id = self.verify_credentials().id_str
         except tweepy.TweepyException as e:
             raise TwitterUtilsError(f"Can not get user_id, error: {e}")
         return user_id
@@ -176,10 +186,14 @@ class TwitterUtils:
 class RapidTwitter:
     rapid_key = os.getenv("RAPID_API_KEY")
     host = "twitter135.p.rapidapi.com"
+    rate_limiter = TokenBucket(
+        "rapid_twitter",
+        *config.RATE_LIMITS["rapid_twitter"],
+        max_wait=config.RATE_LIMIT_MAX_WAIT,
+    )
 
-    @sleep_and_retry
-    @limits(calls=5, period=1)
     def _request(self, url, params):
+        self.rate_limiter.acquire()
         return requests.get(
             url=f"https://{self.host}/{url}",
             headers={
@@ -192,6 +206,7 @@ class RapidTwitter:
             timeout=10,
         )
 
+    @cached_response("twitter_user_id", key=str.lower)
     def get_user_id(self, username: str):
         response = self._request(url="UserByScreenName", params={"username": username})
         response.raise_for_status()
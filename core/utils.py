@@ -1,28 +1,49 @@
 import datetime
+import hashlib
+import json
 import logging
 import os
+import threading
 import time
 import uuid
 from contextlib import contextmanager
 
 from django.http import HttpRequest
 import pytz
+import requests
 import web3.exceptions
 from django.core.cache import cache
 from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import UploadedFile
+from django.db import models
 from django.utils import timezone
 from eth_account.datastructures import SignedTransaction
 from eth_account.messages import encode_defunct
+from eth_utils import to_bytes
+from hexbytes import HexBytes
 from solana.rpc.api import Client
-from web3 import Account, Web3
+from requests.adapters import HTTPAdapter
+from web3 import Account, HTTPProvider, Web3
 from web3.contract.contract import Contract, ContractFunction
 from web3.logs import DISCARD, IGNORE, STRICT, WARN
+from web3._utils.encoding import FriendlyJsonSerde
 from web3.middleware import geth_poa_middleware
 from web3.types import TxParams, Type
 
-from brightIDfaucet.settings import MEDIA_ROOT
-from core.constants import ERC20_METHODS, ERC721_READ_METHODS
+from brightIDfaucet.settings import (
+    CONSTRAINT_REVALIDATE_LOCK_TTL,
+    GAS_FEE_ORACLE_TTL,
+    MEDIA_ROOT,
+    WEB3_PROVIDER_POOL_SIZE,
+    WEB3_PROVIDER_TIMEOUT,
+)
+from core.constants import (
+    ERC20_METHODS,
+    ERC721_READ_METHODS,
+    MULTICALL3_ABI,
+    MULTICALL3_ADDRESS,
+)
+from core.helpers import is_cache_reachable
 
 
 @contextmanager
@@ -137,6 +158,385 @@ class TimeUtils:
         )
 
 
+class PooledHTTPProvider(HTTPProvider):
+    """HTTPProvider that sends every request through one shared session.
+
+    web3 caches its sessions per thread, so gunicorn threads and celery
+    pools would each open their own connections to the same node.
+    """
+
+    def __init__(self, endpoint_uri, session: requests.Session, **kwargs) -> None:
+        super().__init__(endpoint_uri, **kwargs)
+        self._session = session
+
+    def make_request(self, method, params):
+        request_data = self.encode_rpc_request(method, params)
+        response = self._session.post(
+            self.endpoint_uri, data=request_data, **self.get_request_kwargs()
+        )
+        response.raise_for_status()
+        return self.decode_rpc_response(response.content)
+
+    def make_batch_request(self, calls: list[tuple[str, list]]) -> list:
+        """send all calls as one JSON-RPC batch
+        :param calls: list of (method, params)
+        :return: responses in the same order as calls
+        """
+        request_ids = []
+        payload = []
+        for method, params in calls:
+            request_id = next(self.request_counter)
+            request_ids.append(request_id)
+            payload.append(
+                {
+                    "jsonrpc": "2.0",
+                    "method": method,
+                    "params": params or [],
+                    "id": request_id,
+                }
+            )
+        response = self._session.post(
+            self.endpoint_uri,
+            data=to_bytes(text=FriendlyJsonSerde().json_encode(payload)),
+            **self.get_request_kwargs(),
+        )
+        response.raise_for_status()
+        responses = self.decode_rpc_response(response.content)
+        if not isinstance(responses, list):
+            raise ValueError(f"Batch request is not supported: {responses}")
+        responses_by_id = {res.get("id"): res for res in responses}
+        return [responses_by_id.get(request_id) for request_id in request_ids]
+
+
+class Web3ProviderRegistry:
+    """Process-wide registry of Web3 instances keyed by rpc url.
+
+    Instances are built once, without the ``is_connected`` probe, and keep
+    their HTTP connections alive in a bounded pool. The registry is dropped
+    after a fork so prefork workers never share sockets with their parent.
+    """
+
+    _lock = threading.Lock()
+    _instances: dict[tuple[str, bool], Web3] = {}
+    _contracts: dict[tuple, tuple[Web3, list, Type[Contract]]] = {}
+    _sessions: list[requests.Session] = []
+    _pid = os.getpid()
+
+    @classmethod
+    def get(cls, rpc_url: str, poa: bool = False) -> Web3:
+        key = (rpc_url, bool(poa))
+        if cls._pid == os.getpid():
+            _w3 = cls._instances.get(key)
+            if _w3 is not None:
+                return _w3
+
+        with cls._lock:
+            if cls._pid != os.getpid():
+                cls._instances = {}
+                cls._contracts = {}
+                cls._sessions = []
+                cls._pid = os.getpid()
+            _w3 = cls._instances.get(key)
+            if _w3 is None:
+                _w3 = cls._create(rpc_url, poa)
+                cls._instances[key] = _w3
+            return _w3
+
+    @classmethod
+    def get_contract(cls, w3: Web3, address: str, abi: list) -> Type[Contract]:
+        """
+        Contract objects of the registered Web3 instances, the abi is expected
+        to be a module level constant.
+        """
+        key = (id(w3), address, id(abi))
+        # w3 and abi are kept with the contract so their ids are not reused
+        cached = cls._contracts.get(key)
+        if cached is None or cached[0] is not w3 or cached[1] is not abi:
+            cached = (w3, abi, w3.eth.contract(address=address, abi=abi))
+            cls._contracts[key] = cached
+        return cached[2]
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            for session in cls._sessions:
+                session.close()
+            cls._instances = {}
+            cls._contracts = {}
+            cls._sessions = []
+
+    @classmethod
+    def _create(cls, rpc_url: str, poa: bool) -> Web3:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=WEB3_PROVIDER_POOL_SIZE,
+            pool_block=True,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        cls._sessions.append(session)
+
+        provider = PooledHTTPProvider(
+            rpc_url,
+            session=session,
+            request_kwargs={"timeout": WEB3_PROVIDER_TIMEOUT},
+        )
+        _w3 = Web3(provider)
+        if poa:
+            _w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+        return _w3
+
+
+class NonceManager:
+    """Allocates the nonces of a hot wallet from a counter in the cache.
+
+    Back to back transactions don't need an eth_getTransactionCount each, and
+    workers sharing the wallet across apps never get the same nonce. The
+    counter is resynced from the pending transaction count when it is
+    missing, after a failed broadcast and when a gap is detected.
+
+    A nonce is in flight from its allocation until it is released, when its
+    transaction is broadcast or given up. The counter only changes under a
+    short cache lock, and never while the RPC is called.
+    """
+
+    check_interval = 30
+    lock_timeout = 5
+    # an allocation that is not released within this many seconds is taken
+    # as dropped, e.g. its worker died
+    in_flight_timeout = 60
+    _chain_ids: dict[str, int] = {}
+
+    def __init__(self, w3: Web3, rpc_url: str, address: str):
+        self.w3 = w3
+        self.address = address
+        chain_id = self._chain_ids.get(rpc_url)
+        if chain_id is None:
+            chain_id = self._chain_ids[rpc_url] = w3.eth.chain_id
+        self.key = f"nonce_manager_{chain_id}_{address.lower()}"
+        self.check_key = f"{self.key}_checked"
+        self.lock_key = f"{self.key}_lock"
+        self.in_flight_key = f"{self.key}_in_flight"
+
+    def get_transaction_count(self, block_identifier="pending"):
+        return self.w3.eth.get_transaction_count(self.address, block_identifier)
+
+    @contextmanager
+    def lock(self):
+        """
+        :raise: TimeoutError if the lock is not free within lock_timeout
+        """
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_timeout
+        while not cache.add(self.lock_key, token, self.lock_timeout):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Could not lock the nonces of {self.address}")
+            time.sleep(0.01)
+        try:
+            yield
+        finally:
+            if cache.get(self.lock_key) == token:
+                cache.delete(self.lock_key)
+
+    def get_in_flight(self) -> dict[int, float]:
+        """
+        :return: {nonce: allocated at} of the nonces that are not released
+        """
+        now = time.time()
+        return {
+            nonce: allocated_at
+            for nonce, allocated_at in (cache.get(self.in_flight_key) or {}).items()
+            if now - allocated_at < self.in_flight_timeout
+        }
+
+    def allocate(self) -> int:
+        """
+        :raise: TimeoutError if the counter stays locked
+        """
+        if not is_cache_reachable():
+            logging.warning(f"Nonce manager unavailable for {self.address}")
+            return self.get_transaction_count()
+        self.check_gap()
+        if cache.get(self.key) is None:
+            # no counter yet, start from the pending transaction count
+            nonce = self.get_transaction_count()
+            with self.lock():
+                cache.add(self.key, nonce, None)
+        with self.lock():
+            try:
+                nonce = cache.incr(self.key) - 1
+            except ValueError:
+                # reset since it was read, the next allocation resyncs it
+                raise TimeoutError(f"Nonce counter of {self.address} was reset")
+            in_flight = self.get_in_flight()
+            in_flight[nonce] = time.time()
+            cache.set(self.in_flight_key, in_flight, self.in_flight_timeout)
+        return nonce
+
+    def release(self, nonce: int, is_used=True):
+        """Takes a nonce out of flight once its transaction is broadcast. The
+        nonce of a transaction that was not sent is given back, if no later
+        one was allocated, and the counter is resynced on the next allocation
+        if nothing else is in flight.
+        """
+        if not is_cache_reachable():
+            return
+        with self.lock():
+            in_flight = self.get_in_flight()
+            in_flight.pop(nonce, None)
+            cache.set(self.in_flight_key, in_flight, self.in_flight_timeout)
+            if is_used:
+                return
+            if cache.get(self.key) == nonce + 1:
+                cache.set(self.key, nonce, None)
+            if not in_flight:
+                cache.delete(self.key)
+
+    def check_gap(self):
+        # at most once per check_interval, shared by all workers
+        if not cache.add(self.check_key, True, self.check_interval):
+            return
+        next_nonce = cache.get(self.key)
+        if next_nonce is None:
+            return
+        # a nonce released while the RPC is read would make the counts stale
+        is_idle = not self.get_in_flight()
+        pending = self.get_transaction_count("pending")
+        latest = self.get_transaction_count("latest")
+        with self.lock():
+            current_nonce = cache.get(self.key)
+            if current_nonce is None:
+                return
+            if current_nonce < pending:
+                # the wallet was used without the nonce manager
+                self.resync(pending)
+            elif (
+                is_idle
+                and current_nonce == next_nonce
+                and not self.get_in_flight()
+                and current_nonce > pending == latest
+            ):
+                # nothing is in flight and nothing of the wallet is waiting
+                # in the mempool, so the nonces in between were never
+                # broadcast
+                logging.warning(
+                    f"Nonce gap for {self.address}: next nonce is {current_nonce} "
+                    f"but the chain is at {pending}"
+                )
+                self.resync(pending)
+
+    def resync(self, nonce=None):
+        if nonce is None:
+            nonce = self.get_transaction_count()
+        cache.set(self.key, nonce, None)
+
+    def reset(self):
+        with self.lock():
+            cache.delete(self.key)
+
+
+class GasFeeOracle:
+    """Fee data of a chain, cached for GAS_FEE_ORACLE_TTL seconds.
+
+    The price checks and the transaction of a broadcast, and the broadcasts
+    of all workers within the TTL, share one eth_gasPrice and one
+    eth_feeHistory call.
+    """
+
+    fee_history_blocks = 10
+    reward_percentiles = [25, 50, 75]
+    # a max fee of twice the next base fee is still enough after six full
+    # blocks in a row
+    base_fee_multiplier = 2
+
+    def __init__(self, chain, web3_utils=None):
+        self.chain = chain
+        self.web3_utils = web3_utils or Web3Utils(chain.rpc_url_private, chain.poa)
+
+    def get_cache_key(self, name):
+        return f"gas_fee_oracle_{name}_{self.chain.pk}"
+
+    def _get_cached(self, name, read):
+        key = self.get_cache_key(name)
+        value = cache.get(key)
+        if value is None:
+            value = read()
+            if value is not None:
+                cache.set(key, value, GAS_FEE_ORACLE_TTL)
+        return value
+
+    def get_gas_price(self) -> int:
+        return self._get_cached("gas_price", self.web3_utils.get_gas_price)
+
+    def read_fee_history(self):
+        try:
+            fee_history = self.web3_utils.get_fee_history(
+                self.fee_history_blocks, self.reward_percentiles
+            )
+        except Exception as e:
+            logging.warning(
+                f"Could not get fee history of {self.chain.chain_name}: {e}"
+            )
+            return None
+        base_fees = fee_history.get("baseFeePerGas") or []
+        if not base_fees or not base_fees[-1]:
+            # no EIP-1559 on this chain, cached as such
+            return {}
+        rewards = fee_history.get("reward") or []
+        priority_fees = {}
+        for i, percentile in enumerate(self.reward_percentiles):
+            fees = sorted(reward[i] for reward in rewards if len(reward) > i)
+            priority_fees[percentile] = fees[len(fees) // 2] if fees else 0
+        # the last base fee is the one of the next block
+        return {"base_fee": base_fees[-1], "priority_fees": priority_fees}
+
+    def get_fee_history(self):
+        """
+        :return: {"base_fee", "priority_fees": {percentile: median reward}},
+            None when the chain has no base fee or the history could not be read
+        """
+        return self._get_cached("fee_history", self.read_fee_history) or None
+
+    def get_eip1559_fees(self, percentile=50):
+        """
+        :return: {"maxFeePerGas", "maxPriorityFeePerGas", "expected_gas_price"}
+            with the max fee capped by Chain.max_gas_price, None without a base
+            fee
+        """
+        fee_history = self.get_fee_history()
+        if fee_history is None:
+            return None
+        priority_fee = int(
+            fee_history["priority_fees"][percentile] * self.chain.gas_multiplier
+        )
+        max_fee = self.base_fee_multiplier * fee_history["base_fee"] + priority_fee
+        return {
+            "maxFeePerGas": min(max_fee, self.chain.max_gas_price),
+            "maxPriorityFeePerGas": min(priority_fee, self.chain.max_gas_price),
+            "expected_gas_price": fee_history["base_fee"] + priority_fee,
+        }
+
+    def get_expected_gas_price(self) -> int:
+        """what the next transaction is expected to pay per gas"""
+        if self.chain.is_eip1559:
+            fees = self.get_eip1559_fees()
+            if fees is not None:
+                return fees["expected_gas_price"]
+        return self.get_gas_price()
+
+    def get_tx_fee_params(self) -> dict:
+        """fee fields of a transaction, type-2 on EIP-1559 chains"""
+        if self.chain.is_eip1559:
+            fees = self.get_eip1559_fees()
+            if fees is not None:
+                return {
+                    "maxFeePerGas": fees["maxFeePerGas"],
+                    "maxPriorityFeePerGas": fees["maxPriorityFeePerGas"],
+                }
+        return {"gasPrice": int(self.get_gas_price() * self.chain.gas_multiplier)}
+
+
 class Web3Utils:
     LOG_STRICT = STRICT
     LOG_IGNORE = IGNORE
@@ -149,20 +549,15 @@ class Web3Utils:
         self._account = None
         self._contract = None
         self._poa = poa
+        self._nonce_manager = None
+        # {signed tx hash: nonce} of the built transactions not sent yet
+        self._allocated_nonces = {}
 
     @property
     def w3(self) -> Web3:
-        if self._w3 and self._w3.is_connected():
-            return self._w3
-
-        self._w3 = Web3(Web3.HTTPProvider(self._rpc_url))
-        if self.poa:
-            self._w3.middleware_onion.inject(geth_poa_middleware, layer=0)
-
-        if self._w3.is_connected():
-            return self._w3
-
-        raise Exception(f"RPC provider is not connected ({self._rpc_url})")
+        if self._w3 is None:
+            self._w3 = Web3ProviderRegistry.get(self._rpc_url, self.poa)
+        return self._w3
 
     @property
     def poa(self):
@@ -174,13 +569,28 @@ class Web3Utils:
 
     def set_account(self, private_key):
         self._account = self.w3.eth.account.from_key(private_key)
+        self._nonce_manager = None
+
+    @property
+    def nonce_manager(self) -> NonceManager:
+        if self._nonce_manager is None:
+            self._nonce_manager = NonceManager(
+                self.w3, self._rpc_url, self.account.address
+            )
+        return self._nonce_manager
 
     @property
     def contract(self) -> Type[Contract]:
         return self._contract
 
     def set_contract(self, address, abi):
-        self._contract = self.w3.eth.contract(address=address, abi=abi)
+        self._contract = Web3ProviderRegistry.get_contract(self.w3, address, abi)
+
+    @property
+    def multicall3(self) -> Type[Contract]:
+        return Web3ProviderRegistry.get_contract(
+            self.w3, MULTICALL3_ADDRESS, MULTICALL3_ABI
+        )
 
     def get_contract_function(self, func_name: str):
         func = getattr(self.contract.functions, func_name)
@@ -200,17 +610,33 @@ class Web3Utils:
         return func.estimate_gas({"from": self.account.address})
 
     def build_contract_txn(self, func: Type[ContractFunction], **kwargs):
-        nonce = self.w3.eth.get_transaction_count(self.account.address)
-        tx_data = func.build_transaction(
-            {"from": self.account.address, "nonce": nonce, **kwargs}
-        )
-        return self.sign_tx(tx_data)
+        nonce = self.nonce_manager.allocate()
+        try:
+            tx_data = func.build_transaction(
+                {"from": self.account.address, "nonce": nonce, **kwargs}
+            )
+            signed_tx = self.sign_tx(tx_data)
+        except Exception:
+            # e.g. the gas estimation failed, the nonce is not used
+            self.nonce_manager.release(nonce, is_used=False)
+            raise
+        self._allocated_nonces[signed_tx.hash] = nonce
+        return signed_tx
 
     def sign_tx(self, tx_data: TxParams):
         return self.w3.eth.account.sign_transaction(tx_data, self.account.key)
 
     def send_raw_tx(self, signed_tx: SignedTransaction):
-        return self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        nonce = self._allocated_nonces.pop(signed_tx.hash, None)
+        try:
+            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        except Exception:
+            if nonce is not None:
+                self.nonce_manager.release(nonce, is_used=False)
+            raise
+        if nonce is not None:
+            self.nonce_manager.release(nonce)
+        return tx_hash
 
     def wait_for_transaction_receipt(self, tx_hash):
         return self.w3.eth.wait_for_transaction_receipt(tx_hash)
@@ -224,6 +650,9 @@ class Web3Utils:
     def get_gas_price(self):
         return self.w3.eth.gas_price
 
+    def get_fee_history(self, block_count, reward_percentiles):
+        return self.w3.eth.fee_history(block_count, "latest", reward_percentiles)
+
     def from_wei(self, value: int, unit: str = "ether"):
         return self.w3.from_wei(value, unit)
 
@@ -250,6 +679,72 @@ class Web3Utils:
     def get_balance(self, address):
         return self.w3.eth.get_balance(address)
 
+    def batch_call(self, calls: list[tuple[str, list]]) -> list:
+        """run raw rpc calls in one round trip
+        falls back to one request per call if the node rejects batches
+        :param calls: list of (method, params)
+        :return: raw results in the same order, None for failed calls
+        """
+        provider = self.w3.provider
+        try:
+            responses = provider.make_batch_request(calls)
+        except Exception as e:
+            logging.warning(f"Batch request to {self._rpc_url} failed: {e}")
+            responses = []
+            for method, params in calls:
+                try:
+                    responses.append(provider.make_request(method, params))
+                except Exception as e:
+                    logging.warning(f"{method} request to {self._rpc_url} failed: {e}")
+                    responses.append(None)
+
+        results = []
+        for response in responses:
+            if not response or "error" in response:
+                results.append(None)
+            else:
+                results.append(response.get("result"))
+        return results
+
+    def multicall(self, funcs: list[ContractFunction]) -> list:
+        """run read only contract calls in one eth_call through Multicall3
+        falls back to a JSON-RPC batch of eth_calls if Multicall3 can't be
+        called on the chain
+        :return: decoded results in the same order, None for reverted calls
+            and calls to addresses without code
+        """
+        if not funcs:
+            return []
+        calls = [(func.address, func._encode_transaction_data()) for func in funcs]
+        try:
+            results = self.multicall3.functions.aggregate3(
+                [(target, True, data) for target, data in calls]
+            ).call()
+            return_data = [data if success else None for success, data in results]
+        except Exception as e:
+            logging.warning(f"Multicall3 on {self._rpc_url} failed: {e}")
+            responses = self.w3.provider.make_batch_request(
+                [
+                    ("eth_call", [{"to": target, "data": data}, "latest"])
+                    for target, data in calls
+                ]
+            )
+            return_data = [
+                None if not res or "error" in res else HexBytes(res.get("result"))
+                for res in responses
+            ]
+
+        results = []
+        for func, data in zip(funcs, return_data):
+            if not data:
+                results.append(None)
+                continue
+            values = self.w3.codec.decode(
+                [output["type"] for output in func.abi["outputs"]], data
+            )
+            results.append(values[0] if len(values) == 1 else values)
+        return results
+
 
 class SolanaWeb3Utils:
     def __init__(self, rpc_url) -> None:
@@ -271,6 +766,10 @@ class InvalidAddressException(Exception):
     pass
 
 
+class DeploymentBlockNotFound(Exception):
+    pass
+
+
 class NFTClient:
     def __init__(
         self,
@@ -291,6 +790,21 @@ class NFTClient:
         ):
             raise InvalidAddressException("Invalid contract address")
 
+    def get_numbers_of_tokens(self, addresses: list[str]) -> dict[str, int]:
+        """read the balances of all the addresses in one call
+        :return: {address: number of tokens}
+        """
+        funcs = [
+            self.web3_utils.contract.functions.balanceOf(
+                self.to_checksum_address(address)
+            )
+            for address in addresses
+        ]
+        results = self.web3_utils.multicall(funcs)
+        if None in results:
+            raise InvalidAddressException("Invalid contract address")
+        return dict(zip(addresses, results))
+
     def to_checksum_address(self, address: str):
         return self.web3_utils.w3.to_checksum_address(address)
 
@@ -330,6 +844,50 @@ class TokenClient:
         ):
             raise InvalidAddressException("Invalid contract address")
 
+    def get_non_native_token_balances(self, addresses: list[str]) -> dict[str, int]:
+        """read the balances of all the addresses in one call
+        :return: {address: balance}
+        """
+        if not self.web3_utils.contract:
+            raise InvalidAddressException("Invalid contract address")
+        funcs = [
+            self.web3_utils.contract.functions.balanceOf(
+                self.to_checksum_address(address)
+            )
+            for address in addresses
+        ]
+        results = self.web3_utils.multicall(funcs)
+        if None in results:
+            raise InvalidAddressException("Invalid contract address")
+        return dict(zip(addresses, results))
+
+    def get_native_token_balances(self, addresses: list[str]) -> dict[str, int]:
+        """read the balances of all the addresses in one call, through
+        Multicall3 or else a JSON-RPC batch of eth_getBalance
+        :return: {address: balance}
+        """
+        if self.web3_utils.contract:
+            raise InvalidAddressException("Invalid contract address")
+        checksum_addresses = [self.to_checksum_address(a) for a in addresses]
+        multicall3 = self.web3_utils.multicall3
+        try:
+            results = self.web3_utils.multicall(
+                [multicall3.functions.getEthBalance(a) for a in checksum_addresses]
+            )
+        except Exception as e:
+            logging.warning(f"Could not read balances through Multicall3: {e}")
+            results = [None]
+        if None in results:
+            results = [
+                None if result is None else int(result, 16)
+                for result in self.web3_utils.batch_call(
+                    [("eth_getBalance", [a, "latest"]) for a in checksum_addresses]
+                )
+            ]
+        if None in results:
+            raise ValueError("Could not read the native token balances")
+        return dict(zip(addresses, results))
+
     def get_non_native_token_transfer_amount(self, address: str):
         if not self.web3_utils.contract:
             raise InvalidAddressException("Invalid contract address")
@@ -344,6 +902,58 @@ class TokenClient:
             total_transferred += event.args.value
         return total_transferred
 
+    def get_transfer_logs(
+        self, from_block: int, to_block: int | str, senders: list[str] = None
+    ) -> list:
+        """
+        :param senders: only the transfers of these addresses are read
+        :return: the Transfer events of the contract in the block range
+        """
+        if not self.web3_utils.contract:
+            raise InvalidAddressException("Invalid contract address")
+        argument_filters = None
+        if senders is not None:
+            argument_filters = {
+                "from": [self.to_checksum_address(sender) for sender in senders]
+            }
+        return self.web3_utils.contract.events.Transfer.get_logs(
+            fromBlock=from_block, toBlock=to_block, argument_filters=argument_filters
+        )
+
+    def get_deployment_block(self, head: int) -> int:
+        """Binary searches the first block with the code of the contract.
+        :return: the block the contract was deployed in
+        :raise: DeploymentBlockNotFound if the node doesn't serve the state of
+            old blocks, which a pruned node answers as empty code
+        """
+        if not self.web3_utils.contract:
+            raise InvalidAddressException("Invalid contract address")
+        address = self.web3_utils.contract.address
+        w3 = self.web3_utils.w3
+
+        def has_code(block):
+            return bool(w3.eth.get_code(address, block_identifier=block))
+
+        try:
+            # only archive nodes serve the state of the first blocks
+            w3.eth.get_balance(address, block_identifier=1)
+        except Exception as e:
+            raise DeploymentBlockNotFound(f"The node does not serve old state: {e}")
+        if not has_code(head):
+            raise DeploymentBlockNotFound(f"No contract at {address} in block {head}")
+        low, high = 0, head
+        while low < high:
+            middle = (low + high) // 2
+            if has_code(middle):
+                high = middle
+            else:
+                low = middle + 1
+        if not has_code(low) or (low > 0 and has_code(low - 1)):
+            raise DeploymentBlockNotFound(
+                f"The node answered inconsistent code around block {low}"
+            )
+        return low
+
     def get_delegates_address(self, address: str):
         if not self.web3_utils.contract:
             raise InvalidAddressException("Invalid contract address")
@@ -380,8 +990,6 @@ class UploadFileStorage:
         return MEDIA_ROOT + "/" + path
 
 
-
-
 class RequestContextExtractor:
     def __init__(self, request) -> None:
         self.headers = request.headers
@@ -398,17 +1006,125 @@ class RequestContextExtractor:
         return None
 
 
-
-def cache_constraint_result(cache_key, is_verified, constraint, info):
-    caching_time = constraint.valid_cache_until if is_verified else constraint.invalid_cache_until
-    expiration_time = time.time() + caching_time
+def get_constraint_cache_key(constraint, **kwargs):
+    """
+    The same check of the same user shares its result across distributions
+    and raffles, unless the constraint depends on the one it is checked for.
+    :param kwargs: the data the constraint is checked with
+    """
+    payload = {"params": constraint.param_values, "kwargs": kwargs}
+    if constraint.is_object_dependent and constraint.obj is not None:
+        payload["obj"] = f"{constraint.obj._meta.label}-{constraint.obj.pk}"
+    params_hash = hashlib.sha256(
+        json.dumps(payload, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return (
+        f"constraint-{constraint.__class__.__name__}-"
+        f"{constraint.user_profile.pk}-{params_hash}"
+    )
+
+
+def get_constraint_stale_window(constraint) -> int:
+    """
+    :return: seconds past its expiration a verified result of the constraint
+        may be served while it is refreshed in the background, 0 when the
+        constraint doesn't opt in to stale_while_revalidate
+    """
+    if not constraint.is_cachable:
+        return 0
+    window = constraint.stale_while_revalidate
+    if constraint.max_staleness is not None:
+        window = min(window, constraint.max_staleness)
+    return max(window, 0)
+
+
+def store_constraint_result(constraint, is_verified, info, **kwargs):
+    """
+    :param kwargs: the data the constraint is checked with, part of the key
+    :return: {"is_verified", "info", "expiration_time"}
+    """
+    caching_time = (
+        constraint.valid_cache_until if is_verified else constraint.invalid_cache_until
+    )
     cache_data = {
         "is_verified": is_verified,
         "info": info,
-        "expiration_time": expiration_time,
+        "expiration_time": time.time() + caching_time,
+    }
+    if caching_time > 0:
+        # a failed check is not served stale, the user is likely retrying
+        # right after fixing it
+        stale_window = get_constraint_stale_window(constraint) if is_verified else 0
+        cache.set(
+            get_constraint_cache_key(constraint, **kwargs),
+            cache_data,
+            caching_time + stale_window,
+        )
+    return cache_data
+
+
+def cache_constraint_result(constraint, compute, revalidate=None, **kwargs):
+    """
+    :param compute: returns (is_observed, info) of the constraint, called when
+        there is no cached result
+    :param revalidate: schedules a refresh of the cached result, when given an
+        expired result that is still in the stale window of the constraint is
+        returned and refreshed in the background instead of computed
+    :param kwargs: the data the constraint is checked with, part of the key
+    :return: {"is_verified", "info", "expiration_time"}, is_verified is the
+        result of is_observed, before reversing
+    """
+    if not constraint.is_cachable:
+        is_verified, info = compute()
+        return {"is_verified": is_verified, "info": info}
+
+    cache_key = get_constraint_cache_key(constraint, **kwargs)
+    cache_data = cache.get(cache_key)
+    if cache_data is not None:
+        now = time.time()
+        if now < cache_data["expiration_time"]:
+            return cache_data
+        is_servable = (
+            revalidate is not None
+            and cache_data["is_verified"]
+            and now
+            < cache_data["expiration_time"] + get_constraint_stale_window(constraint)
+        )
+        if is_servable:
+            # one refresh at a time, the others keep serving the stale result
+            lock_key = f"{cache_key}-revalidating"
+            if cache.add(lock_key, 1, CONSTRAINT_REVALIDATE_LOCK_TTL):
+                try:
+                    revalidate()
+                except Exception as e:
+                    logging.exception(f"Could not refresh {cache_key}: {e}")
+            return cache_data
+
+    is_verified, info = compute()
+    return store_constraint_result(constraint, is_verified, info, **kwargs)
+
+
+def to_task_kwargs(kwargs: dict) -> dict:
+    """Replaces the model instances of kwargs with their label and pk, so they
+    can be sent to a celery task"""
+    return {
+        key: (
+            {"model": value._meta.label, "pk": value.pk}
+            if isinstance(value, models.Model)
+            else value
+        )
+        for key, value in kwargs.items()
+    }
+
+
+def from_task_kwargs(kwargs: dict) -> dict:
+    from django.apps import apps
+
+    return {
+        key: (
+            apps.get_model(value["model"]).objects.get(pk=value["pk"])
+            if isinstance(value, dict) and value.keys() == {"model", "pk"}
+            else value
+        )
+        for key, value in kwargs.items()
     }
-    if caching_time <= 0:
-        return cache_data
-    
-    cache.set(cache_key, cache_data, caching_time)
-    return cache_data
\ No newline at end of file
@@ -1,7 +1,19 @@
-from rest_framework.exceptions import ValidationError
+import json
+import logging
+from abc import ABC, abstractmethod
+
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from solders.pubkey import Pubkey
 
-from core.utils import Web3Utils
+from core.constraints import ConstraintVerification, get_constraint
+from core.constraints.executor import ConstraintExecutor, ConstraintTimeout
+from core.constraints.facts import UserFacts
+from core.utils import (
+    Web3Utils,
+    cache_constraint_result,
+    get_constraint_cache_key,
+    to_task_kwargs,
+)
 
 from .models import Chain, NetworkTypes
 
@@ -23,3 +35,151 @@ def address_validator(address, chain: Chain):
 
     if not is_address_valid:
         raise ValidationError({"address": f"{address} is not valid"})
+
+
+class AbstractConstraintsValidator(ABC):
+    """Checks the constraints of a token distribution or a raffle for a user.
+
+    Subclasses set user_profile and request, and define constraint_obj,
+    get_check_data and get_check_kwargs.
+    """
+
+    user_profile = None
+    request = None
+
+    @property
+    @abstractmethod
+    def constraint_obj(self):
+        pass
+
+    @abstractmethod
+    def get_check_data(self, c) -> dict:
+        """data sent by the user for the constraint, e.g. a tweet id"""
+        pass
+
+    @abstractmethod
+    def get_check_kwargs(self) -> dict:
+        """arguments of get_info and is_observed that come from constraint_obj"""
+        pass
+
+    def get_constraints(self, facts: UserFacts) -> dict:
+        """
+        :return: {constraint model: ConstraintVerification}
+        """
+        try:
+            param_values = json.loads(self.constraint_obj.constraint_params or "{}")
+        except Exception as e:
+            logging.error(f"Error parsing constraint params: {e}")
+            param_values = {}
+        constraints = dict()
+        for c in self.constraint_obj.constraints.all():
+            constraint: ConstraintVerification = get_constraint(c.name)(
+                self.user_profile, obj=self.constraint_obj
+            )
+            constraint.response = c.response
+            constraint.facts = facts
+            try:
+                constraint.param_values = param_values[c.name]
+            except KeyError:
+                pass
+            constraints[c] = constraint
+        return constraints
+
+    def get_cache_key(self, c, constraint: ConstraintVerification):
+        return get_constraint_cache_key(constraint, **self.get_check_data(c))
+
+    @staticmethod
+    def check(constraint: ConstraintVerification, data, check_kwargs, request=None):
+        """
+        :return: (is_observed, info)
+        """
+        return constraint.evaluate(**data, **check_kwargs, context={"request": request})
+
+    def revalidate(self, c, constraint: ConstraintVerification):
+        from core.tasks import refresh_constraint_result
+
+        refresh_constraint_result.delay(
+            c.name,
+            self.user_profile.pk,
+            constraint.param_values,
+            to_task_kwargs({"obj": constraint.obj}),
+            self.get_check_data(c),
+            to_task_kwargs(self.get_check_kwargs()),
+        )
+
+    def get_observed_data(self, c, constraint: ConstraintVerification):
+        """
+        :return: the cached result of the constraint, before reversing
+        """
+        cdata = self.get_check_data(c)
+        return cache_constraint_result(
+            constraint,
+            lambda: self.check(
+                constraint, cdata, self.get_check_kwargs(), self.request
+            ),
+            revalidate=lambda: self.revalidate(c, constraint),
+            **cdata,
+        )
+
+    def get_constraint_data(self, c, observed_data):
+        if isinstance(observed_data, ConstraintTimeout):
+            return {"is_verified": False, "info": None}
+        if str(c.pk) in self.constraint_obj.reversed_constraints_list:
+            return {**observed_data, "is_verified": not observed_data["is_verified"]}
+        return observed_data
+
+    def get_result(self, constraints, observed_data, raise_exception=True):
+        """
+        :param observed_data: {constraint model: result of get_observed_data}
+        :return: {constraint pk: {"is_verified", "info", ...}}
+        """
+        error_messages = dict()
+        result = dict()
+        for c, constraint in constraints.items():
+            constraint_data = self.get_constraint_data(c, observed_data[c])
+            if not constraint_data.get("is_verified"):
+                error_messages[c.title] = constraint.response
+            result[c.pk] = constraint_data
+        if len(error_messages) and raise_exception:
+            raise PermissionDenied(error_messages)
+        return result
+
+    def check_constraints(self, raise_exception=True):
+        # lookups shared by all the constraints of this check
+        constraints = self.get_constraints(UserFacts(self.user_profile))
+        observed_data = ConstraintExecutor().map(
+            lambda c: self.get_observed_data(c, constraints[c]), constraints
+        )
+        return self.get_result(constraints, observed_data, raise_exception)
+
+    @staticmethod
+    def check_in_bulk(validators) -> list[dict]:
+        """Checks the constraints of several distributions or raffles of one
+        user, the same constraint with the same params is checked only once.
+        :return: the result of each validator, as check_constraints without
+            raising
+        """
+        if not validators:
+            return []
+        facts = UserFacts(validators[0].user_profile)
+        checks = dict()
+        validators_constraints = []
+        for validator in validators:
+            constraints = validator.get_constraints(facts)
+            keys = dict()
+            for c, constraint in constraints.items():
+                keys[c] = validator.get_cache_key(c, constraint)
+                checks.setdefault(keys[c], (validator, c, constraint))
+            validators_constraints.append((validator, constraints, keys))
+
+        checked = ConstraintExecutor().map(
+            lambda key: checks[key][0].get_observed_data(*checks[key][1:]), checks
+        )
+        return [
+            validator.get_result(
+                constraints,
+                {c: checked[keys[c]] for c in constraints},
+                raise_exception=False,
+            )
+            for validator, constraints, keys in validators_constraints
+        ]
@@ -1,9 +1,14 @@
+from abc import ABC, abstractmethod
 from collections import defaultdict
 
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import ListAPIView
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from core.constraints import get_constraint
+from core.validators import AbstractConstraintsValidator
 
 
 class AbstractConstraintsListView(ListAPIView):
@@ -18,3 +23,58 @@ class AbstractConstraintsListView(ListAPIView):
             )
 
         return Response(response)
+
+
+class AbstractBulkConstraintsView(APIView, ABC):
+    """Checks the constraints of the distributions or raffles given in the ids
+    query param, e.g. ?ids=1,2,3, for a listing page.
+
+    A constraint shared by several of them is checked once, the response is
+    {"success": True, "constraints": {id: [constraint data, ...]}}.
+    """
+
+    permission_classes = [IsAuthenticated]
+    queryset = None
+    constraint_serializer_class = None
+    max_ids = 50
+
+    @abstractmethod
+    def get_validator(self, obj, request) -> AbstractConstraintsValidator:
+        pass
+
+    def get_ids(self, request):
+        try:
+            ids = {
+                int(pk)
+                for pk in request.query_params.get("ids", "").split(",")
+                if pk.strip()
+            }
+        except ValueError:
+            raise ValidationError("ids must be a comma separated list of ids")
+        if len(ids) > self.max_ids:
+            raise ValidationError(f"At most {self.max_ids} ids can be checked")
+        return ids
+
+    def get(self, request):
+        objs = list(
+            self.queryset.filter(pk__in=self.get_ids(request)).prefetch_related(
+                "constraints"
+            )
+        )
+        results = AbstractConstraintsValidator.check_in_bulk(
+            [self.get_validator(obj, request) for obj in objs]
+        )
+        response_constraints = dict()
+        for obj, result in zip(objs, results):
+            constraints = {c.pk: c for c in obj.constraints.all()}
+            response_constraints[obj.pk] = [
+                {
+                    **self.constraint_serializer_class(constraints[c_pk]).data,
+                    **data,
+                    "is_reversed": str(c_pk) in obj.reversed_constraints_list,
+                }
+                for c_pk, data in result.items()
+            ]
+        return Response(
+            {"success": True, "constraints": response_constraints}, status=200
+        )
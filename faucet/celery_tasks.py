@@ -7,16 +7,21 @@ import requests
 import web3.exceptions
 from django.core.cache import cache
 from django.db import transaction
-from django.db.models import F, Func
+from django.db.models import F, Func, Subquery
 from django.utils import timezone
 from sentry_sdk import capture_exception
+from web3 import Web3
 
-from core.models import TokenPrice
+from core.models import Chain, TokenPrice
 from core.utils import Web3Utils
 from faucet.faucet_manager.claim_manager import RoundCreditStrategy
 
 from .constants import FUEL_LEVEL_STATUS_NUMBER
+from .faucet_manager.batch_sizer import BatchSizer
+from .faucet_manager.claim_dispatcher import ClaimBatcher, ClaimDispatcher
+from .faucet_manager.confirmation_tracker import ConfirmationTracker
 from .faucet_manager.fund_manager import FundMangerException, get_fund_manager
+from .faucet_manager.maintenance import FaucetMaintenancePipeline
 from .models import (
     ClaimReceipt,
     DonationContract,
@@ -102,6 +107,8 @@ class CeleryTasks:
         finally:
             batch.save()
             batch.claims.update(_status=batch._status)
+            if batch._status != ClaimReceipt.PENDING:
+                ClaimDispatcher.wake(batch.faucet_id)
 
     @staticmethod
     def reject_expired_pending_claims():
@@ -113,7 +120,17 @@ class CeleryTasks:
         ).update(_status=ClaimReceipt.REJECTED)
 
     @staticmethod
-    def process_faucet_pending_claims(faucet_id):
+    def process_faucet_pending_claims(faucet_id, max_batch_size=None):
+        if max_batch_size is None:
+            faucet = Faucet.objects.select_related("chain").get(pk=faucet_id)
+            backlog = ClaimReceipt.objects.filter(
+                faucet=faucet, _status=ClaimReceipt.PENDING, batch=None
+            ).count()
+            if backlog == 0:
+                return None
+            # sized before taking the lock, it may need the block gas limit
+            max_batch_size = BatchSizer(faucet.chain).get_batch_size(backlog)
+
         with transaction.atomic():
             faucet = Faucet.objects.select_for_update().get(
                 pk=faucet_id
@@ -121,26 +138,54 @@ class CeleryTasks:
 
             # all pending batches must be resolved before new transactions can be made
             if has_pending_batch(faucet):
-                return
-
-            # get all pending receipts for this chain
-            # pending receipts are receipts that have not been batched yet
-            receipts = ClaimReceipt.objects.filter(
-                faucet=faucet, _status=ClaimReceipt.PENDING, batch=None
+                return None
+
+            # pending receipts are receipts that have not been batched yet,
+            # the ones locked by a concurrent transaction are skipped
+            receipts = (
+                ClaimReceipt.objects.select_for_update(skip_locked=True)
+                .filter(faucet=faucet, _status=ClaimReceipt.PENDING, batch=None)
+                .order_by("pk")
+                .values("pk")[:max_batch_size]
             )
 
-            if receipts.count() == 0:
-                return
-
-            receipts = receipts.order_by("pk")[:32]
-
             # if there are no pending batches, create a new batch
             batch = TransactionBatch.objects.create(faucet=faucet)
 
-            # assign the batch to the receipts
-            for receipt in receipts:
-                receipt.batch = batch
-                receipt.save()
+            # assign the batch to the receipts in a single
+            # UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED LIMIT n)
+            assigned = ClaimReceipt.objects.filter(pk__in=Subquery(receipts)).update(
+                batch=batch, last_updated=timezone.now()
+            )
+            if assigned == 0:
+                transaction.set_rollback(True)
+                return None
+
+            return batch
+
+    @staticmethod
+    def batch_faucet_claims(faucet_id):
+        """
+        Event driven counterpart of process_faucet_pending_claims, runs as soon
+        as claims are signaled instead of on the next poll
+        """
+        if has_pending_batch(faucet_id):
+            # the batcher is woken up again when the pending batch is resolved
+            return None
+        if not ClaimBatcher(faucet_id).collect():
+            return None
+        return CeleryTasks.process_faucet_pending_claims(faucet_id)
+
+    @staticmethod
+    def update_faucets_maintenance():
+        """
+        Refresh the chain snapshots, needs_funding, remaining claim number
+        and fuel level of all active faucets, reading each chain only once
+        """
+        faucets = Faucet.objects.filter(is_active=True).select_related(
+            "chain", "chain__wallet"
+        )
+        return FaucetMaintenancePipeline(faucets).run()
 
     @staticmethod
     def update_needs_funding_status_faucet(faucet_id):
@@ -246,67 +291,84 @@ class CeleryTasks:
         donation_receipt = DonationReceipt.objects.get(pk=donation_receipt_pk)
         faucet = donation_receipt.faucet
         evm_fund_manager = get_fund_manager(faucet)
-        try:
-            donation_contract_address = DonationContract.objects.get(
-                faucet=faucet
-            ).contract_address
-        except DonationContract.DoesNotExist:
-            donation_contract_address = (
-                evm_fund_manager.get_fund_manager_checksum_address()
-            )
-            logging.error(
-                f"donation contract for faucet {faucet.chain} does not exists"
-            )
         try:
             if not evm_fund_manager.is_tx_verified(donation_receipt.tx_hash):
                 donation_receipt.status = ClaimReceipt.REJECTED
                 donation_receipt.save()
                 return
-            user = donation_receipt.user_profile
             tx = evm_fund_manager.get_tx(donation_receipt.tx_hash)
-            if tx.get("from").lower() not in user.wallets.annotate(
-                lower_address=Func(F("address"), function="LOWER")
-            ).values_list("lower_address", flat=True):
-                donation_receipt.status = ClaimReceipt.REJECTED
-                donation_receipt.save()
-                return
-            if (
-                Web3Utils.to_checksum_address(tx.get("to"))
-                != evm_fund_manager.get_fund_manager_checksum_address()
-                and
-                # TODO: remove fund_manager address
-                Web3Utils.to_checksum_address(tx.get("to"))
-                != Web3Utils.to_checksum_address(donation_contract_address)
-            ):
-                donation_receipt.status = ClaimReceipt.REJECTED
-                donation_receipt.save()
-                return
-            donation_receipt.value = str(evm_fund_manager.from_wei(tx.get("value")))
-            if not faucet.chain.is_testnet:
-                try:
-                    token_price = TokenPrice.objects.get(symbol=faucet.chain.symbol)
-                    donation_receipt.total_price = str(
-                        decimal.Decimal(donation_receipt.value)
-                        * decimal.Decimal(token_price.usd_price)
-                    )
-                except TokenPrice.DoesNotExist:
-                    logging.error(
-                        f"TokenPrice for Chain: "
-                        f"{faucet.chain.chain_name}"
-                        f" did not defined"
-                    )
-                    donation_receipt.status = ClaimReceipt.REJECTED
-                    donation_receipt.save()
-                    return
-            else:
-                donation_receipt.total_price = str(0)
-            donation_receipt.status = ClaimReceipt.VERIFIED
+            CeleryTasks.verify_donation_tx(donation_receipt, tx)
             donation_receipt.save()
         except (web3.exceptions.TransactionNotFound, web3.exceptions.TimeExhausted):
             donation_receipt.status = ClaimReceipt.REJECTED
             donation_receipt.save()
             return
 
+    @staticmethod
+    def verify_donation_tx(donation_receipt, tx):
+        """
+        Check the mined transaction of a donation and fill in its value
+        sets the status of the donation receipt without saving it
+        :param tx: transaction with "from", "to" and "value" in wei
+        """
+        faucet = donation_receipt.faucet
+        fund_manager_address = Web3Utils.to_checksum_address(
+            faucet.fund_manager_address
+        )
+        try:
+            donation_contract_address = DonationContract.objects.get(
+                faucet=faucet
+            ).contract_address
+        except DonationContract.DoesNotExist:
+            donation_contract_address = fund_manager_address
+            logging.error(
+                f"donation contract for faucet {faucet.chain} does not exists"
+            )
+
+        user = donation_receipt.user_profile
+        if tx.get("from").lower() not in user.wallets.annotate(
+            lower_address=Func(F("address"), function="LOWER")
+        ).values_list("lower_address", flat=True):
+            donation_receipt.status = ClaimReceipt.REJECTED
+            return
+        if (
+            Web3Utils.to_checksum_address(tx.get("to")) != fund_manager_address
+            and
+            # TODO: remove fund_manager address
+            Web3Utils.to_checksum_address(tx.get("to"))
+            != Web3Utils.to_checksum_address(donation_contract_address)
+        ):
+            donation_receipt.status = ClaimReceipt.REJECTED
+            return
+        donation_receipt.value = str(Web3.from_wei(tx.get("value"), "ether"))
+        if not faucet.chain.is_testnet:
+            try:
+                token_price = TokenPrice.objects.get(symbol=faucet.chain.symbol)
+                donation_receipt.total_price = str(
+                    decimal.Decimal(donation_receipt.value)
+                    * decimal.Decimal(token_price.usd_price)
+                )
+            except TokenPrice.DoesNotExist:
+                logging.error(
+                    f"TokenPrice for Chain: "
+                    f"{faucet.chain.chain_name}"
+                    f" did not defined"
+                )
+                donation_receipt.status = ClaimReceipt.REJECTED
+                return
+        else:
+            donation_receipt.total_price = str(0)
+        donation_receipt.status = ClaimReceipt.VERIFIED
+
+    @staticmethod
+    def track_chain_confirmations(chain_id):
+        """
+        Resolve the pending gas tap batches and donations of a chain
+        with one batched receipt lookup, without waiting for any transaction
+        """
+        chain = Chain.objects.get(pk=chain_id)
+        return ConfirmationTracker(chain).run()
+
     @staticmethod
     def update_claims_for_faucet(faucet_id, since_last_round):
         faucet = Faucet.objects.get(pk=faucet_id)
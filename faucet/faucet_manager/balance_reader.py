@@ -0,0 +1,214 @@
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.models import Chain, ChainStateSnapshot, NetworkTypes
+from core.utils import Web3Utils
+from faucet.models import Faucet
+
+
+def hex_to_int(value):
+    if value is None:
+        return None
+    return int(value, 16)
+
+
+class ChainBalanceReader:
+    """Reads the wallet balance, gas price and fund manager balances of a chain.
+
+    A fresh ChainStateSnapshot is used when there is one. Otherwise, on EVM
+    chains every read goes into a single JSON-RPC batch and other chains fall
+    back to the model methods.
+    """
+
+    def __init__(self, chain: Chain, faucets: list[Faucet], use_snapshot=True):
+        self.chain = chain
+        self.faucets = faucets
+        self.active_faucets = [
+            faucet
+            for faucet in faucets
+            if faucet.is_active and not faucet.is_deprecated
+        ]
+        # resolved here so that read() never touches the database
+        self.wallet_address = chain.wallet.address
+        self.snapshot = ChainStateSnapshot.get_fresh(chain.pk) if use_snapshot else None
+
+    @property
+    def is_readable(self):
+        return self.chain.is_active and bool(self.chain.rpc_url_private)
+
+    @property
+    def is_batchable(self):
+        return (
+            self.chain.chain_type == NetworkTypes.EVM or int(self.chain.chain_id) == 500
+        )
+
+    def _get_calls(self):
+        calls = [
+            ("eth_gasPrice", []),
+            ("eth_blockNumber", []),
+            (
+                "eth_getBalance",
+                [Web3Utils.to_checksum_address(self.wallet_address), "latest"],
+            ),
+        ]
+        for faucet in self.active_faucets:
+            calls.append(
+                (
+                    "eth_getBalance",
+                    [
+                        Web3Utils.to_checksum_address(faucet.fund_manager_address),
+                        "latest",
+                    ],
+                )
+            )
+        return calls
+
+    def _read_batch(self):
+        web3_utils = Web3Utils(self.chain.rpc_url_private, self.chain.poa)
+        results = web3_utils.batch_call(self._get_calls())
+        gas_price, block_number, wallet_balance, *manager_balances = map(
+            hex_to_int, results
+        )
+        return (
+            gas_price,
+            block_number,
+            wallet_balance,
+            {
+                faucet.pk: balance
+                for faucet, balance in zip(self.active_faucets, manager_balances)
+            },
+        )
+
+    def _read_one_by_one(self):
+        return (
+            self.chain.get_gas_price(),
+            None,
+            self.chain.get_wallet_balance(),
+            {faucet.pk: faucet.get_manager_balance() for faucet in self.active_faucets},
+        )
+
+    def _read_snapshot(self):
+        manager_balances = {
+            faucet.pk: self.snapshot.get_balance(faucet.fund_manager_address)
+            for faucet in self.active_faucets
+        }
+        wallet_balance = self.snapshot.get_balance(self.wallet_address)
+        if wallet_balance is None or None in manager_balances.values():
+            # the wallet or a faucet changed after the snapshot was taken
+            return None
+        return (
+            self.snapshot.gas_price,
+            self.snapshot.block_number,
+            wallet_balance,
+            manager_balances,
+        )
+
+    def read_live(self):
+        """Reads the chain state from the RPC. The batched read never touches
+        the database, the model methods of the other chains may, so worker
+        threads close their connection after it.
+
+        :return: (gas_price, block_number, wallet_balance, {faucet_pk: balance}),
+            with None for the values that could not be read
+        """
+        if not self.is_readable:
+            return self.empty_state
+        try:
+            if self.is_batchable:
+                return self._read_batch()
+            return self._read_one_by_one()
+        except Exception as e:
+            logging.exception(
+                f"Error reading balances for {self.chain.chain_name} error is {e}"
+            )
+            return self.empty_state
+
+    @property
+    def empty_state(self):
+        return None, None, None, {}
+
+    def store_snapshot(self, state):
+        """Stores a state returned by read_live() as the chain snapshot.
+        Nothing is stored when the read failed."""
+        gas_price, block_number, wallet_balance, manager_balances = state
+        if gas_price is None or wallet_balance is None:
+            return None
+        balances = {self.wallet_address: wallet_balance}
+        for faucet in self.active_faucets:
+            balances[faucet.fund_manager_address] = manager_balances.get(faucet.pk)
+        self.snapshot = ChainStateSnapshot.record(
+            self.chain, gas_price, block_number, balances
+        )
+        return self.snapshot
+
+    def take_snapshot(self):
+        return self.store_snapshot(self.read_live())
+
+    def get_balances(self, state) -> dict[int, dict]:
+        """
+        :return: {faucet_pk: {"contract_balance", "wallet_balance", "gas_price",
+            "has_enough_funds", "has_enough_fees"}}
+        """
+        gas_price, _, wallet_balance, manager_balances = state
+
+        if gas_price is None:
+            gas_price = self.chain.max_gas_price + 1
+        if wallet_balance is None:
+            wallet_balance = 0
+        has_enough_fees = self.chain.is_fee_enough(wallet_balance, gas_price)
+
+        balances = {}
+        for faucet in self.faucets:
+            manager_balance = manager_balances.get(faucet.pk) or 0
+            balances[faucet.pk] = {
+                "contract_balance": manager_balance,
+                "wallet_balance": wallet_balance,
+                "gas_price": gas_price,
+                "has_enough_funds": faucet.is_fund_enough(manager_balance),
+                "has_enough_fees": has_enough_fees,
+            }
+        return balances
+
+    def read(self) -> dict[int, dict]:
+        state = self._read_snapshot() if self.snapshot is not None else None
+        if state is None:
+            state = self.read_live()
+        return self.get_balances(state)
+
+
+class FaucetBalanceReader:
+    """Reads the balances of many faucets with one round trip per chain,
+    running the chains concurrently."""
+
+    max_workers = 8
+
+    @staticmethod
+    def _read(reader):
+        try:
+            return reader.read()
+        finally:
+            connections[DEFAULT_DB_ALIAS].close()
+
+    def __init__(self, faucets):
+        faucets_by_chain = defaultdict(list)
+        chains = {}
+        for faucet in faucets:
+            faucets_by_chain[faucet.chain_id].append(faucet)
+            chains[faucet.chain_id] = faucet.chain
+        self.chain_readers = [
+            ChainBalanceReader(chains[chain_pk], chain_faucets)
+            for chain_pk, chain_faucets in faucets_by_chain.items()
+        ]
+
+    def read(self) -> dict[int, dict]:
+        balances = {}
+        if not self.chain_readers:
+            return balances
+        max_workers = min(self.max_workers, len(self.chain_readers))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for chain_balances in executor.map(self._read, self.chain_readers):
+                balances.update(chain_balances)
+        return balances
@@ -0,0 +1,121 @@
+import logging
+
+from django.core.cache import cache
+
+from core.metrics import Metrics
+from core.models import Chain, NetworkTypes
+from core.utils import Web3Utils
+
+
+class BatchSizer:
+    """Chooses how many receipts go into the next multiWithdrawEth of a chain.
+
+    The size is bounded by:
+    - the backlog, there is no point in waiting for more receipts
+    - Chain.max_batch_size
+    - the share of the block gas limit a batch may use, divided by the gas
+      a recipient recently cost on the chain
+    - half of the last batch size whose gas estimation failed
+    """
+
+    block_gas_limit_share = 0.5
+    default_gas_per_recipient = 40000
+    # weight of the newest estimate in the moving average
+    gas_per_recipient_weight = 0.3
+
+    block_gas_limit_timeout = 600
+    gas_per_recipient_timeout = 24 * 60 * 60
+    failed_estimation_timeout = 60 * 60
+
+    def __init__(self, chain: Chain):
+        self.chain = chain
+
+    @staticmethod
+    def get_block_gas_limit_key(chain_pk):
+        return f"batch_sizer_block_gas_limit_{chain_pk}"
+
+    @staticmethod
+    def get_gas_per_recipient_key(chain_pk):
+        return f"batch_sizer_gas_per_recipient_{chain_pk}"
+
+    @staticmethod
+    def get_size_ceiling_key(chain_pk):
+        return f"batch_sizer_size_ceiling_{chain_pk}"
+
+    @staticmethod
+    def get_metric_name(chain_pk, metric):
+        return f"gastap.chain.{chain_pk}.{metric}"
+
+    def get_block_gas_limit(self):
+        if self.chain.chain_type != NetworkTypes.EVM:
+            return None
+        key = self.get_block_gas_limit_key(self.chain.pk)
+        block_gas_limit = cache.get(key)
+        if block_gas_limit is None:
+            try:
+                block_gas_limit = (
+                    Web3Utils(self.chain.rpc_url_private, self.chain.poa)
+                    .w3.eth.get_block("latest")
+                    .gasLimit
+                )
+            except Exception as e:
+                logging.warning(
+                    f"Could not get block gas limit of {self.chain.chain_name}: {e}"
+                )
+                return None
+            cache.set(key, block_gas_limit, self.block_gas_limit_timeout)
+        return block_gas_limit
+
+    def get_gas_per_recipient(self):
+        return (
+            cache.get(self.get_gas_per_recipient_key(self.chain.pk))
+            or self.default_gas_per_recipient
+        )
+
+    def get_batch_size(self, backlog):
+        size = min(backlog, self.chain.max_batch_size)
+
+        block_gas_limit = self.get_block_gas_limit()
+        if block_gas_limit:
+            size = min(
+                size,
+                int(
+                    block_gas_limit
+                    * self.block_gas_limit_share
+                    // self.get_gas_per_recipient()
+                ),
+            )
+
+        size_ceiling = cache.get(self.get_size_ceiling_key(self.chain.pk))
+        if size_ceiling:
+            size = min(size, size_ceiling)
+
+        return max(1, size)
+
+    @classmethod
+    def record_gas_estimate(cls, chain, recipients, gas):
+        if not recipients:
+            return
+        gas_per_recipient = gas / recipients
+        key = cls.get_gas_per_recipient_key(chain.pk)
+        average = cache.get(key)
+        if average is not None:
+            gas_per_recipient = (
+                cls.gas_per_recipient_weight * gas_per_recipient
+                + (1 - cls.gas_per_recipient_weight) * average
+            )
+        cache.set(key, int(gas_per_recipient), cls.gas_per_recipient_timeout)
+
+        Metrics.observe(cls.get_metric_name(chain.pk, "recipients_per_tx"), recipients)
+        Metrics.observe(
+            cls.get_metric_name(chain.pk, "gas_per_recipient"), gas / recipients
+        )
+
+    @classmethod
+    def record_failed_estimation(cls, chain, recipients):
+        cache.set(
+            cls.get_size_ceiling_key(chain.pk),
+            max(1, recipients // 2),
+            cls.failed_estimation_timeout,
+        )
+        Metrics.incr(cls.get_metric_name(chain.pk, "failed_gas_estimations"))
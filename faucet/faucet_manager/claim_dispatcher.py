@@ -0,0 +1,239 @@
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+
+import redis
+
+from brightIDfaucet.settings import (
+    CLAIM_BATCH_LINGER,
+    CLAIM_BATCH_MAX_SIZE,
+    CLAIM_DISPATCH_MODE,
+    CLAIM_QUEUE_BACKEND,
+    REDIS_URL,
+)
+from faucet.models import ClaimReceipt, TransactionBatch
+
+
+class ClaimQueue(ABC):
+    """Per faucet queue of new claim receipt ids.
+
+    The queue only signals that a faucet has work to do, the receipts that go
+    into a batch are always read from the database.
+    """
+
+    @abstractmethod
+    def push(self, faucet_pk, receipt_pk):
+        pass
+
+    @abstractmethod
+    def pop(self, faucet_pk, count, timeout=0) -> list[int]:
+        """Pops up to count receipt ids. When the queue is empty, waits up to
+        timeout seconds for the first one."""
+        pass
+
+    @abstractmethod
+    def length(self, faucet_pk) -> int:
+        pass
+
+    @abstractmethod
+    def acquire_batcher(self, faucet_pk, ttl) -> bool:
+        """Makes sure there is only one scheduled batcher per faucet."""
+        pass
+
+    @abstractmethod
+    def release_batcher(self, faucet_pk):
+        pass
+
+
+class LocalClaimQueue(ClaimQueue):
+    """In process queue, for tests and single worker setups."""
+
+    _condition = threading.Condition()
+    _queues = defaultdict(deque)
+    _batchers = {}
+
+    def push(self, faucet_pk, receipt_pk):
+        with self._condition:
+            self._queues[faucet_pk].append(receipt_pk)
+            self._condition.notify_all()
+
+    def pop(self, faucet_pk, count, timeout=0):
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            queue = self._queues[faucet_pk]
+            while not queue:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                self._condition.wait(remaining)
+            return [queue.popleft() for _ in range(min(count, len(queue)))]
+
+    def length(self, faucet_pk):
+        with self._condition:
+            return len(self._queues[faucet_pk])
+
+    def acquire_batcher(self, faucet_pk, ttl):
+        with self._condition:
+            expires_at = self._batchers.get(faucet_pk)
+            if expires_at is not None and expires_at > time.monotonic():
+                return False
+            self._batchers[faucet_pk] = time.monotonic() + ttl
+            return True
+
+    def release_batcher(self, faucet_pk):
+        with self._condition:
+            self._batchers.pop(faucet_pk, None)
+
+    @classmethod
+    def clear(cls):
+        with cls._condition:
+            cls._queues.clear()
+            cls._batchers.clear()
+
+
+class RedisClaimQueue(ClaimQueue):
+    def __init__(self, url):
+        self.redis = redis.Redis.from_url(url)
+
+    @staticmethod
+    def get_key(faucet_pk):
+        return f"gastap:pending_claims:{faucet_pk}"
+
+    @staticmethod
+    def get_batcher_key(faucet_pk):
+        return f"gastap:pending_claims:{faucet_pk}:batcher"
+
+    def push(self, faucet_pk, receipt_pk):
+        self.redis.rpush(self.get_key(faucet_pk), receipt_pk)
+
+    def _pop_now(self, faucet_pk, count):
+        if count <= 0:
+            return []
+        key = self.get_key(faucet_pk)
+        pipe = self.redis.pipeline()
+        pipe.lrange(key, 0, count - 1)
+        pipe.ltrim(key, count, -1)
+        items, _ = pipe.execute()
+        return [int(item) for item in items]
+
+    def pop(self, faucet_pk, count, timeout=0):
+        items = self._pop_now(faucet_pk, count)
+        if items or timeout <= 0:
+            return items
+        item = self.redis.blpop(self.get_key(faucet_pk), timeout=timeout)
+        if item is None:
+            return []
+        return [int(item[1])] + self._pop_now(faucet_pk, count - 1)
+
+    def length(self, faucet_pk):
+        return self.redis.llen(self.get_key(faucet_pk))
+
+    def acquire_batcher(self, faucet_pk, ttl):
+        return bool(
+            self.redis.set(
+                self.get_batcher_key(faucet_pk), 1, nx=True, ex=max(1, int(ttl))
+            )
+        )
+
+    def release_batcher(self, faucet_pk):
+        self.redis.delete(self.get_batcher_key(faucet_pk))
+
+
+_claim_queue = None
+
+
+def get_claim_queue() -> ClaimQueue:
+    global _claim_queue
+    if _claim_queue is None:
+        if CLAIM_QUEUE_BACKEND == "redis":
+            _claim_queue = RedisClaimQueue(REDIS_URL)
+        else:
+            _claim_queue = LocalClaimQueue()
+    return _claim_queue
+
+
+class ClaimBatcher:
+    """Collects the signals of a faucet: returns as soon as max_batch_size
+    claims are waiting, or linger seconds after the first one arrived."""
+
+    def __init__(
+        self,
+        faucet_pk,
+        queue: ClaimQueue = None,
+        linger=CLAIM_BATCH_LINGER,
+        max_batch_size=CLAIM_BATCH_MAX_SIZE,
+    ):
+        self.faucet_pk = faucet_pk
+        self.queue = queue or get_claim_queue()
+        self.linger = linger
+        self.max_batch_size = max_batch_size
+
+    def collect(self) -> list[int]:
+        receipt_pks = self.queue.pop(self.faucet_pk, self.max_batch_size)
+        if not receipt_pks:
+            return receipt_pks
+        deadline = time.monotonic() + self.linger
+        while len(receipt_pks) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            receipt_pks += self.queue.pop(
+                self.faucet_pk,
+                self.max_batch_size - len(receipt_pks),
+                timeout=remaining,
+            )
+        return receipt_pks
+
+
+class ClaimDispatcher:
+    """Wakes up the batcher of a faucet when there is something to batch, so
+    claims don't wait for the periodic polling.
+
+    Only active when CLAIM_DISPATCH_MODE is "event"; the polling tasks keep
+    running as a safety net either way.
+    """
+
+    # a batcher that crashed without releasing its flag blocks the faucet
+    # for this long, after that the polling takes over again
+    batcher_ttl = 60
+
+    @staticmethod
+    def is_enabled():
+        return CLAIM_DISPATCH_MODE == "event"
+
+    @classmethod
+    def notify(cls, faucet_pk, receipt_pk):
+        if not cls.is_enabled():
+            return
+        try:
+            get_claim_queue().push(faucet_pk, receipt_pk)
+            cls.schedule(faucet_pk)
+        except Exception as e:
+            # the polling picks the claim up
+            logging.exception(f"Could not dispatch claim {receipt_pk}: {e}")
+
+    @classmethod
+    def schedule(cls, faucet_pk):
+        from faucet.tasks import batch_faucet_claims
+
+        if get_claim_queue().acquire_batcher(faucet_pk, cls.batcher_ttl):
+            batch_faucet_claims.delay(faucet_pk)
+
+    @classmethod
+    def wake(cls, faucet_pk):
+        """Schedules the batcher if claims arrived while it could not run,
+        e.g. because the previous batch of the faucet was still pending."""
+        if not cls.is_enabled():
+            return
+        try:
+            if (
+                get_claim_queue().length(faucet_pk)
+                and not TransactionBatch.objects.filter(
+                    faucet_id=faucet_pk, _status=ClaimReceipt.PENDING
+                ).exists()
+            ):
+                cls.schedule(faucet_pk)
+        except Exception as e:
+            logging.exception(f"Could not wake the batcher of faucet {faucet_pk}: {e}")
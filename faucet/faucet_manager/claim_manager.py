@@ -6,6 +6,7 @@ from django.db import transaction
 from django.utils import timezone
 
 from authentication.models import UserProfile
+from faucet.faucet_manager.claim_dispatcher import ClaimDispatcher
 from faucet.faucet_manager.credit_strategy import (
     CreditStrategy,
     CreditStrategyFactory,
@@ -70,7 +71,7 @@ class SimpleClaimManager(ClaimManager):
             ]
         )
 
-        return ClaimReceipt.objects.create(
+        receipt = ClaimReceipt.objects.create(
             faucet_id=_faucet.pk,
             user_profile=_user_profile,
             datetime=timezone.now(),
@@ -78,6 +79,10 @@ class SimpleClaimManager(ClaimManager):
             _status=ClaimReceipt.PENDING,
             to_address=to_address,
         )
+        transaction.on_commit(
+            lambda: ClaimDispatcher.notify(receipt.faucet_id, receipt.pk)
+        )
+        return receipt
 
     def get_credit_strategy(self) -> CreditStrategy:
         return self.credit_strategy
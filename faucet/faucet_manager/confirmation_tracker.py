@@ -0,0 +1,149 @@
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import Chain, NetworkTypes
+from core.utils import Web3Utils
+from faucet.faucet_manager.balance_reader import hex_to_int
+from faucet.faucet_manager.claim_dispatcher import ClaimDispatcher
+from faucet.models import ClaimReceipt, DonationReceipt, TransactionBatch
+
+
+class ConfirmationTracker:
+    """Resolves the pending transaction batches and donation receipts of a
+    chain.
+
+    All the outstanding hashes are looked up in a single JSON-RPC batch per
+    tick, a transaction that is not mined yet is simply checked again on the
+    next tick instead of parking a worker until it is.
+    """
+
+    network_types = [NetworkTypes.EVM, NetworkTypes.NONEVMXDC]
+
+    def __init__(self, chain: Chain):
+        self.chain = chain
+
+    @property
+    def pending_batches(self):
+        return (
+            TransactionBatch.objects.filter(
+                faucet__chain=self.chain, _status=ClaimReceipt.PENDING
+            )
+            .exclude(tx_hash=None)
+            .exclude(updating=True)
+        )
+
+    @property
+    def pending_donations(self):
+        return DonationReceipt.objects.filter(
+            faucet__chain=self.chain, status=ClaimReceipt.PENDING
+        ).select_related("faucet__chain", "user_profile")
+
+    @staticmethod
+    def is_donation_expired(donation):
+        return timezone.now() - donation.datetime > timedelta(
+            minutes=ClaimReceipt.MAX_PENDING_DURATION
+        )
+
+    def get_transactions(self, receipt_hashes, transaction_hashes):
+        """
+        :return: ({hash: receipt}, {hash: transaction}),
+            None for the ones that are not mined or could not be read
+        """
+        calls = [
+            ("eth_getTransactionReceipt", [tx_hash]) for tx_hash in receipt_hashes
+        ] + [("eth_getTransactionByHash", [tx_hash]) for tx_hash in transaction_hashes]
+        if not calls:
+            return {}, {}
+        results = Web3Utils(self.chain.rpc_url_private, self.chain.poa).batch_call(
+            calls
+        )
+        receipts = dict(zip(receipt_hashes, results[: len(receipt_hashes)]))
+        transactions = dict(zip(transaction_hashes, results[len(receipt_hashes) :]))
+        return receipts, transactions
+
+    def resolve_batches(self, batches, receipts):
+        verified, rejected = [], []
+        for batch in batches:
+            receipt = receipts.get(batch.tx_hash)
+            if receipt is not None:
+                if hex_to_int(receipt.get("status")) == 1:
+                    verified.append(batch)
+                else:
+                    rejected.append(batch)
+            elif batch.is_expired:
+                rejected.append(batch)
+
+        with transaction.atomic():
+            for batches_, status in (
+                (verified, ClaimReceipt.VERIFIED),
+                (rejected, ClaimReceipt.REJECTED),
+            ):
+                batch_pks = [batch.pk for batch in batches_]
+                if not batch_pks:
+                    continue
+                TransactionBatch.objects.filter(pk__in=batch_pks).update(_status=status)
+                ClaimReceipt.objects.filter(batch_id__in=batch_pks).update(
+                    _status=status
+                )
+
+        for faucet_pk in {batch.faucet_id for batch in verified + rejected}:
+            ClaimDispatcher.wake(faucet_pk)
+        return len(verified), len(rejected)
+
+    def resolve_donations(self, donations, receipts, transactions):
+        from faucet.celery_tasks import CeleryTasks
+
+        resolved = []
+        for donation in donations:
+            receipt = receipts.get(donation.tx_hash)
+            tx = transactions.get(donation.tx_hash)
+            if receipt is None or tx is None:
+                if self.is_donation_expired(donation):
+                    donation.status = ClaimReceipt.REJECTED
+                    resolved.append(donation)
+                continue
+            if hex_to_int(receipt.get("status")) != 1:
+                donation.status = ClaimReceipt.REJECTED
+            else:
+                CeleryTasks.verify_donation_tx(
+                    donation, {**tx, "value": hex_to_int(tx.get("value"))}
+                )
+            resolved.append(donation)
+
+        DonationReceipt.objects.bulk_update(
+            resolved, ["status", "value", "total_price"]
+        )
+        return len(resolved)
+
+    def run(self):
+        """
+        :return: {"verified_batches", "rejected_batches", "resolved_donations"}
+        """
+        if self.chain.chain_type not in self.network_types:
+            return None
+
+        batches = list(self.pending_batches)
+        donations = list(self.pending_donations)
+        donation_hashes = {donation.tx_hash for donation in donations}
+        receipt_hashes = {batch.tx_hash for batch in batches} | donation_hashes
+        try:
+            receipts, transactions = self.get_transactions(
+                list(receipt_hashes), list(donation_hashes)
+            )
+        except Exception as e:
+            # expired ones are still rejected below
+            logging.exception(
+                f"Error getting receipts for {self.chain.chain_name} error is {e}"
+            )
+            receipts, transactions = {}, {}
+
+        verified_batches, rejected_batches = self.resolve_batches(batches, receipts)
+        resolved_donations = self.resolve_donations(donations, receipts, transactions)
+        return {
+            "verified_batches": verified_batches,
+            "rejected_batches": rejected_batches,
+            "resolved_donations": resolved_donations,
+        }
@@ -10,7 +10,8 @@ from solders.signature import Signature
 from solders.transaction_status import TransactionConfirmationStatus
 
 from authentication.models import NetworkTypes
-from core.utils import Web3Utils
+from core.utils import GasFeeOracle, Web3Utils
+from faucet.faucet_manager.batch_sizer import BatchSizer
 from faucet.faucet_manager.fund_manager_abi import manager_abi
 from faucet.models import BrightUser, Faucet
 
@@ -49,9 +50,10 @@ class EVMFundManager:
         self.web3_utils.set_contract(
             self.get_fund_manager_checksum_address(), abi=manager_abi
         )
+        self.fee_oracle = GasFeeOracle(self.chain, self.web3_utils)
 
     def get_gas_price(self):
-        return self.web3_utils.get_gas_price()
+        return self.fee_oracle.get_expected_gas_price()
 
     @property
     def is_gas_price_too_high(self):
@@ -87,19 +89,22 @@ class EVMFundManager:
 
     def prepare_tx_for_broadcast(self, tx_function_str, *args):
         tx_function = self.web3_utils.get_contract_function(tx_function_str)(*args)
-        gas_estimation = self.web3_utils.get_gas_estimate(tx_function)
+        recipients = len(args[0]) if tx_function_str == "multiWithdrawEth" else 0
+        try:
+            gas_estimation = self.web3_utils.get_gas_estimate(tx_function)
+        except Exception:
+            if recipients:
+                BatchSizer.record_failed_estimation(self.chain, recipients)
+            raise
         if self.chain.chain_id == "997":
             gas_estimation = 100000
+        elif recipients:
+            BatchSizer.record_gas_estimate(self.chain, recipients, gas_estimation)
 
         if self.is_gas_price_too_high:
             raise FundMangerException.GasPriceTooHigh("Gas price is too high")
 
-        tx_params = {
-            "gas": gas_estimation,
-            "gasPrice": int(
-                self.web3_utils.get_gas_price() * self.chain.gas_multiplier
-            ),
-        }
+        tx_params = {"gas": gas_estimation, **self.fee_oracle.get_tx_fee_params()}
 
         signed_tx = self.web3_utils.build_contract_txn(tx_function, **tx_params)
         return signed_tx
@@ -0,0 +1,170 @@
+import decimal
+import logging
+import math
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from sentry_sdk import capture_exception
+
+from brightIDfaucet.settings import FAUCET_MAINTENANCE_CHAIN_TIMEOUT
+from faucet.constants import FUEL_LEVEL_STATUS_NUMBER
+from faucet.faucet_manager.balance_reader import ChainBalanceReader
+from faucet.models import Faucet
+
+
+class FaucetMaintenancePipeline:
+    """Periodic upkeep of the faucets: refreshes every chain snapshot and
+    recomputes needs_funding, the remaining claim number and the fuel level of
+    each faucet from it.
+
+    Each chain is read once, with all chains read concurrently. A chain that
+    does not answer within chain_timeout seconds is handled like a failed
+    read, so a single slow RPC can't hold up the whole cycle.
+    """
+
+    max_workers = 16
+    cache_timeout = 600
+
+    def __init__(self, faucets, chain_timeout=FAUCET_MAINTENANCE_CHAIN_TIMEOUT):
+        self.chain_timeout = chain_timeout
+        faucets_by_chain = defaultdict(list)
+        chains = {}
+        for faucet in faucets:
+            faucets_by_chain[faucet.chain_id].append(faucet)
+            chains[faucet.chain_id] = faucet.chain
+        self.chain_readers = [
+            ChainBalanceReader(chains[chain_pk], chain_faucets, use_snapshot=False)
+            for chain_pk, chain_faucets in faucets_by_chain.items()
+        ]
+
+    def read_chains(self):
+        """
+        :return: ({reader: state}, [timed out readers])
+        """
+        started_at = {}
+
+        def read(reader):
+            started_at[reader] = time.monotonic()
+            try:
+                return reader.read_live()
+            finally:
+                connections[DEFAULT_DB_ALIAS].close()
+
+        states = {}
+        timed_out = []
+        if not self.chain_readers:
+            return states, timed_out
+
+        max_workers = min(self.max_workers, len(self.chain_readers))
+        # upper bound for chains that never get a worker because all of them
+        # are stuck on slow chains
+        rounds = math.ceil(len(self.chain_readers) / max_workers)
+        deadline = time.monotonic() + self.chain_timeout * rounds
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        futures = {
+            executor.submit(read, reader): reader for reader in self.chain_readers
+        }
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = wait(
+                    pending,
+                    timeout=min(1, self.chain_timeout),
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    states[futures[future]] = future.result()
+
+                now = time.monotonic()
+                for future in list(pending):
+                    reader = futures[future]
+                    if now > deadline or (
+                        reader in started_at
+                        and now - started_at[reader] > self.chain_timeout
+                    ):
+                        pending.remove(future)
+                        timed_out.append(reader)
+        finally:
+            # the threads of timed out chains are left to finish on their own,
+            # they close their own database connection
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        for reader in timed_out:
+            logging.warning(
+                f"Reading chain {reader.chain.chain_name} timed out "
+                f"after {self.chain_timeout}s"
+            )
+            states[reader] = reader.empty_state
+        return states, timed_out
+
+    def get_fuel_level(self, faucet, remaining_claim_number):
+        if not faucet.fuel_level:
+            return None
+        float_fuel_level = (
+            remaining_claim_number * FUEL_LEVEL_STATUS_NUMBER
+        ) / faucet.fuel_level
+        return min(FUEL_LEVEL_STATUS_NUMBER, math.ceil(float_fuel_level))
+
+    def update_chain(self, reader, state):
+        reader.store_snapshot(state)
+
+        changed_faucets = []
+        cache_values = {}
+        faucets_balances = reader.get_balances(state)
+        for faucet in reader.faucets:
+            balances = faucets_balances[faucet.pk]
+            # deprecated faucets are not read and are never refunded
+            needs_funding = not faucet.is_deprecated and not (
+                balances["has_enough_funds"] and balances["has_enough_fees"]
+            )
+            if faucet.needs_funding != needs_funding:
+                faucet.needs_funding = needs_funding
+                changed_faucets.append(faucet)
+
+            remaining_claim_number = decimal.Decimal(
+                balances["contract_balance"]
+            ) // decimal.Decimal(faucet.max_claim_amount)
+            cache_values[f"{faucet.pk}_remaining_claim_number"] = remaining_claim_number
+
+            fuel_level = self.get_fuel_level(faucet, remaining_claim_number)
+            if fuel_level is not None:
+                cache_values[f"{faucet.pk}_current_fuel_level"] = fuel_level
+
+        if changed_faucets:
+            Faucet.objects.bulk_update(changed_faucets, ["needs_funding"])
+        cache.set_many(cache_values, timeout=self.cache_timeout)
+
+    def run(self):
+        """
+        :return: {"chains", "updated_chains", "timed_out_chains", "wall_time"}
+        """
+        start = time.monotonic()
+        states, timed_out = self.read_chains()
+
+        updated_chains = 0
+        for reader, state in states.items():
+            try:
+                self.update_chain(reader, state)
+                updated_chains += 1
+            except Exception as e:
+                logging.exception(
+                    f"Error updating faucets of {reader.chain.chain_name} "
+                    f"error is {e}"
+                )
+                capture_exception()
+
+        wall_time = time.monotonic() - start
+        logging.info(
+            f"Faucet maintenance updated {updated_chains}/{len(self.chain_readers)} "
+            f"chains in {wall_time:.2f}s, {len(timed_out)} timed out"
+        )
+        return {
+            "chains": len(self.chain_readers),
+            "updated_chains": updated_chains,
+            "timed_out_chains": [reader.chain.pk for reader in timed_out],
+            "wall_time": wall_time,
+        }
@@ -16,6 +16,7 @@ from core.models import (
     AbstractGlobalSettings,
     BigNumField,
     Chain,
+    ChainStateSnapshot,
     NetworkTypes,
     UniqueArrayField,
 )
@@ -216,7 +217,7 @@ class Faucet(models.Model):
 
     @property
     def has_enough_funds(self):
-        if self.get_manager_balance() > self.max_claim_amount:
+        if self.is_fund_enough(self.manager_balance):
             return True
         logging.warning(
             f"Faucet {self.pk}-{self.chain.chain_name} "
@@ -224,6 +225,9 @@ class Faucet(models.Model):
         )
         return False
 
+    def is_fund_enough(self, manager_balance):
+        return manager_balance > self.max_claim_amount
+
     @property
     def block_scan_address(self):
         if not self.chain.explorer_url:
@@ -236,6 +240,11 @@ class Faucet(models.Model):
 
     @property
     def manager_balance(self):
+        snapshot = ChainStateSnapshot.get_fresh(self.chain_id)
+        if snapshot is not None:
+            manager_balance = snapshot.get_balance(self.fund_manager_address)
+            if manager_balance is not None:
+                return manager_balance
         return self.get_manager_balance()
 
     def get_manager_balance(self):
@@ -281,6 +290,10 @@ class Faucet(models.Model):
         if not self.chain.rpc_url_private:
             return True
 
+        snapshot = ChainStateSnapshot.get_fresh(self.chain_id)
+        if snapshot is not None and snapshot.gas_price is not None:
+            return snapshot.gas_price > self.chain.max_gas_price
+
         try:
             from faucet.faucet_manager.fund_manager import EVMFundManager
 
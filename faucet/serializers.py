@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
 from core.serializers import ChainSerializer
+from faucet.faucet_manager.balance_reader import FaucetBalanceReader
 from faucet.models import ClaimReceipt, DonationReceipt, Faucet, GlobalSettings
 
 
@@ -14,6 +15,9 @@ class FaucetBalanceSerializer(serializers.ModelSerializer):
     contract_balance = serializers.SerializerMethodField()
     wallet_balance = serializers.SerializerMethodField()
     chain = ChainSerializer()
+    # already listed in the fields, overridden so the Faucet property
+    # doesn't read the manager balance again
+    has_enough_funds = serializers.SerializerMethodField()
     has_enough_fees = serializers.SerializerMethodField()
     wallet_address = serializers.SerializerMethodField()
 
@@ -32,14 +36,24 @@ class FaucetBalanceSerializer(serializers.ModelSerializer):
             "block_scan_address",
         ]
 
+    def get_balances(self, faucet):
+        # views may pass the balances of the whole list in the context
+        balances = self.context.setdefault("balances", {})
+        if faucet.pk not in balances:
+            balances.update(FaucetBalanceReader([faucet]).read())
+        return balances[faucet.pk]
+
     def get_contract_balance(self, faucet):
-        return faucet.manager_balance
+        return self.get_balances(faucet)["contract_balance"]
 
     def get_wallet_balance(self, faucet):
-        return faucet.chain.wallet_balance
+        return self.get_balances(faucet)["wallet_balance"]
+
+    def get_has_enough_funds(self, faucet):
+        return self.get_balances(faucet)["has_enough_funds"]
 
     def get_has_enough_fees(self, faucet):
-        return faucet.chain.has_enough_fees
+        return self.get_balances(faucet)["has_enough_fees"]
 
     def get_wallet_address(self, faucet):
         return faucet.chain.wallet.address
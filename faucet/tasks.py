@@ -8,6 +8,8 @@ from core.models import TokenPrice
 from core.utils import memcache_lock
 
 from .celery_tasks import CeleryTasks
+from .faucet_manager.claim_dispatcher import ClaimDispatcher, get_claim_queue
+from .faucet_manager.confirmation_tracker import ConfirmationTracker
 from .models import ClaimReceipt, DonationReceipt, Faucet, TransactionBatch
 
 
@@ -58,6 +60,17 @@ def reject_expired_pending_claims():
     CeleryTasks.reject_expired_pending_claims()
 
 
+@shared_task(bind=True)
+def track_chain_confirmations(self, chain_id):
+    id_ = f"{self.name}-LOCK-{chain_id}"
+    with memcache_lock(id_, self.app.oid) as acquired:
+        if not acquired:
+            logging.info("Could not acquire tracker lock")
+            return
+        CeleryTasks.track_chain_confirmations(chain_id)
+        cache.delete(id_)
+
+
 @shared_task
 def update_pending_batches_with_tx_hash_status():
     batches_queryset = (
@@ -65,7 +78,17 @@ def update_pending_batches_with_tx_hash_status():
         .exclude(tx_hash=None)
         .exclude(updating=True)
     )
-    for _batch in batches_queryset:
+    # one batched receipt lookup per chain, other chains are checked per batch
+    tracked_chain_ids = set(
+        batches_queryset.filter(
+            faucet__chain__chain_type__in=ConfirmationTracker.network_types
+        )
+        .values_list("faucet__chain_id", flat=True)
+        .distinct()
+    )
+    for chain_id in tracked_chain_ids:
+        track_chain_confirmations.delay(chain_id)
+    for _batch in batches_queryset.exclude(faucet__chain_id__in=tracked_chain_ids):
         update_pending_batch_with_tx_hash.delay(_batch.pk)
 
 
@@ -81,6 +104,18 @@ def process_pending_claims():  # periodic task
         process_faucet_pending_claims.delay(_faucet.pk)
 
 
+@shared_task
+def batch_faucet_claims(faucet_id):
+    try:
+        batch = CeleryTasks.batch_faucet_claims(faucet_id)
+    finally:
+        get_claim_queue().release_batcher(faucet_id)
+    if batch is not None:
+        process_batch.delay(batch.pk)
+    else:
+        ClaimDispatcher.wake(faucet_id)
+
+
 @shared_task
 def update_needs_funding_status_faucet(faucet_id):
     CeleryTasks.update_needs_funding_status_faucet(faucet_id)
@@ -88,11 +123,15 @@ def update_needs_funding_status_faucet(faucet_id):
     CeleryTasks.update_current_fuel_level_faucet(faucet_id)
 
 
-@shared_task
-def update_needs_funding_status():  # periodic task
-    faucets = Faucet.objects.filter(is_active=True)
-    for _faucet in faucets:
-        update_needs_funding_status_faucet.delay(_faucet.pk)
+@shared_task(bind=True)
+def update_needs_funding_status(self):  # periodic task
+    id_ = f"{self.name}-LOCK"
+    with memcache_lock(id_, self.app.oid, lock_expire=300) as acquired:
+        if not acquired:
+            logging.info("Could not acquire maintenance lock")
+            return
+        CeleryTasks.update_faucets_maintenance()
+        cache.delete(id_)
 
 
 @shared_task
@@ -138,7 +177,18 @@ def update_donation_receipt_pending_status():
     pending_donation_receipts = DonationReceipt.objects.filter(
         status=ClaimReceipt.PENDING, faucet__chain__is_active=True
     )
-    for pending_donation_receipt in pending_donation_receipts:
+    tracked_chain_ids = set(
+        pending_donation_receipts.filter(
+            faucet__chain__chain_type__in=ConfirmationTracker.network_types
+        )
+        .values_list("faucet__chain_id", flat=True)
+        .distinct()
+    )
+    for chain_id in tracked_chain_ids:
+        track_chain_confirmations.delay(chain_id)
+    for pending_donation_receipt in pending_donation_receipts.exclude(
+        faucet__chain_id__in=tracked_chain_ids
+    ):
         process_donation_receipt.delay(pending_donation_receipt.pk)
 
 
@@ -1,17 +1,32 @@
 import datetime
 import json
+import threading
+import time
 from unittest.mock import patch
 
 from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework.test import APITestCase
 
 from authentication.models import UserProfile, Wallet
-from core.models import WalletAccount
+from core.metrics import Metrics
+from core.models import ChainStateSnapshot, WalletAccount
 from faucet.constraints import OptimismDonationConstraint
+from faucet.faucet_manager.balance_reader import FaucetBalanceReader
+from faucet.faucet_manager.batch_sizer import BatchSizer
+from faucet.faucet_manager.claim_dispatcher import (
+    ClaimBatcher,
+    ClaimDispatcher,
+    LocalClaimQueue,
+)
 from faucet.faucet_manager.claim_manager import ClaimManagerFactory, SimpleClaimManager
+from faucet.faucet_manager.confirmation_tracker import ConfirmationTracker
 from faucet.faucet_manager.credit_strategy import RoundCreditStrategy
+from faucet.faucet_manager.maintenance import FaucetMaintenancePipeline
 from faucet.models import (
     Chain,
     ClaimReceipt,
@@ -674,3 +689,533 @@ class TestFuelChampion(APITestCase):
         self.assertEqual(res.status_code, 200)
         self.assertEqual(len(res.data), 1)
         self.assertEqual(res.data[-1].get("username", 0), self.user_profile.username)
+
+
+class TestFaucetBalanceReader(APITestCase):
+    def setUp(self) -> None:
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key[2:]
+        )
+        self.test_faucet1 = create_test_faucet(
+            self.wallet, max_claim_amount=faucet1_max_claim
+        )
+        self.test_faucet2 = Faucet.objects.create(
+            chain=self.test_faucet1.chain,
+            max_claim_amount=faucet2_max_claim,
+            fund_manager_address=address,
+        )
+
+    @patch("core.utils.Web3Utils.batch_call")
+    def test_one_batch_per_chain(self, batch_call_mock):
+        batch_call_mock.return_value = [
+            hex(10),
+            hex(100),
+            hex(10**18),
+            hex(10**9),
+            None,
+        ]
+
+        balances = FaucetBalanceReader([self.test_faucet1, self.test_faucet2]).read()
+
+        batch_call_mock.assert_called_once()
+        self.assertEqual(len(batch_call_mock.call_args.args[0]), 5)
+        self.assertEqual(balances[self.test_faucet1.pk]["contract_balance"], 10**9)
+        self.assertTrue(balances[self.test_faucet1.pk]["has_enough_funds"])
+        self.assertTrue(balances[self.test_faucet1.pk]["has_enough_fees"])
+        self.assertEqual(balances[self.test_faucet2.pk]["contract_balance"], 0)
+        self.assertFalse(balances[self.test_faucet2.pk]["has_enough_funds"])
+
+    @patch("core.utils.Web3Utils.batch_call", lambda *args: [None] * 5)
+    def test_failed_reads_fall_back_to_safe_values(self):
+        balances = FaucetBalanceReader([self.test_faucet1]).read()
+
+        self.assertEqual(
+            balances[self.test_faucet1.pk]["gas_price"],
+            self.test_faucet1.chain.max_gas_price + 1,
+        )
+        self.assertEqual(balances[self.test_faucet1.pk]["wallet_balance"], 0)
+        self.assertFalse(balances[self.test_faucet1.pk]["has_enough_fees"])
+
+    @patch("core.utils.Web3Utils.batch_call")
+    def test_balance_list_view(self, batch_call_mock):
+        batch_call_mock.return_value = [
+            hex(10),
+            hex(100),
+            hex(10**18),
+            hex(10**9),
+            hex(0),
+        ]
+
+        response = self.client.get(reverse("FAUCET:faucet-balance-list"))
+
+        self.assertEqual(response.status_code, 200)
+        batch_call_mock.assert_called_once()
+        self.assertEqual(len(response.data), 2)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class TestChainStateSnapshot(APITestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key[2:]
+        )
+        self.test_faucet = create_test_faucet(
+            self.wallet, max_claim_amount=faucet1_max_claim
+        )
+        self.chain = self.test_faucet.chain
+
+    def tearDown(self) -> None:
+        cache.clear()
+
+    @patch("core.utils.Web3Utils.batch_call")
+    def test_task_records_snapshot(self, batch_call_mock):
+        batch_call_mock.return_value = [hex(10), hex(100), hex(10**18), hex(10**9)]
+
+        report = CeleryTasks.update_faucets_maintenance()
+
+        self.assertEqual(report["updated_chains"], 1)
+        snapshot = ChainStateSnapshot.objects.get(chain=self.chain)
+        self.assertEqual(snapshot.version, 1)
+        self.assertEqual(snapshot.block_number, 100)
+        self.assertEqual(snapshot.gas_price, 10)
+        self.assertEqual(snapshot.get_balance(self.wallet.address), 10**18)
+        self.assertEqual(snapshot.get_balance(fund_manager), 10**9)
+
+        CeleryTasks.update_faucets_maintenance()
+        self.assertEqual(ChainStateSnapshot.objects.get(chain=self.chain).version, 2)
+
+    @patch("core.utils.Web3Utils.batch_call", lambda *args: [None] * 4)
+    def test_failed_read_keeps_previous_snapshot(self):
+        ChainStateSnapshot.record(self.chain, 10, 100, {fund_manager: 10**9})
+
+        CeleryTasks.update_faucets_maintenance()
+
+        snapshot = ChainStateSnapshot.objects.get(chain=self.chain)
+        self.assertEqual(snapshot.version, 1)
+        self.assertEqual(snapshot.gas_price, 10)
+
+    @patch("faucet.models.Faucet.get_manager_balance")
+    @patch("core.models.Chain.get_wallet_balance")
+    @patch("core.models.Chain.get_gas_price")
+    def test_properties_read_fresh_snapshot(
+        self, gas_price_mock, wallet_balance_mock, manager_balance_mock
+    ):
+        ChainStateSnapshot.record(
+            self.chain,
+            10,
+            100,
+            {self.wallet.address: 10**18, fund_manager: 10**9},
+        )
+        faucet = Faucet.objects.get(pk=self.test_faucet.pk)
+
+        self.assertEqual(faucet.manager_balance, 10**9)
+        self.assertTrue(faucet.has_enough_funds)
+        self.assertEqual(faucet.chain.wallet_balance, 10**18)
+        self.assertEqual(faucet.chain.gas_price, 10)
+        self.assertTrue(faucet.chain.has_enough_fees)
+        self.assertFalse(faucet.is_gas_price_too_high)
+        gas_price_mock.assert_not_called()
+        wallet_balance_mock.assert_not_called()
+        manager_balance_mock.assert_not_called()
+
+    @patch("faucet.models.Faucet.get_manager_balance", lambda *args: 0)
+    def test_stale_snapshot_is_ignored(self):
+        ChainStateSnapshot.record(self.chain, 10, 100, {fund_manager: 10**9})
+        ChainStateSnapshot.objects.filter(chain=self.chain).update(
+            fetched_at=timezone.now() - datetime.timedelta(days=1)
+        )
+        cache.clear()
+
+        self.assertIsNone(ChainStateSnapshot.get_fresh(self.chain.pk))
+        self.assertEqual(Faucet.objects.get(pk=self.test_faucet.pk).manager_balance, 0)
+
+    @patch("core.utils.Web3Utils.batch_call")
+    def test_balance_list_view_reads_snapshot(self, batch_call_mock):
+        ChainStateSnapshot.record(
+            self.chain,
+            10,
+            100,
+            {self.wallet.address: 10**18, fund_manager: 10**9},
+        )
+
+        response = self.client.get(reverse("FAUCET:faucet-balance-list"))
+
+        self.assertEqual(response.status_code, 200)
+        batch_call_mock.assert_not_called()
+        self.assertEqual(response.data[0]["contract_balance"], 10**9)
+        self.assertTrue(response.data[0]["has_enough_funds"])
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class TestFaucetMaintenancePipeline(APITestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key[2:]
+        )
+        self.test_faucet = create_test_faucet(
+            self.wallet, max_claim_amount=faucet1_max_claim
+        )
+        self.test_faucet.needs_funding = True
+        self.test_faucet.save()
+        self.other_faucet = create_test_faucet(
+            self.wallet, chain_id=test_chain_id + 1, max_claim_amount=t_chain_max
+        )
+
+    def tearDown(self) -> None:
+        cache.clear()
+
+    @patch("core.utils.Web3Utils.batch_call")
+    def test_updates_faucets_with_one_read_per_chain(self, batch_call_mock):
+        batch_call_mock.return_value = [
+            hex(10),
+            hex(100),
+            hex(10**18),
+            hex(int(faucet1_max_claim * 5)),
+        ]
+
+        report = CeleryTasks.update_faucets_maintenance()
+
+        self.assertEqual(batch_call_mock.call_count, 2)
+        self.assertEqual(report["chains"], 2)
+        self.assertEqual(report["updated_chains"], 2)
+        self.assertEqual(report["timed_out_chains"], [])
+        self.test_faucet.refresh_from_db()
+        self.assertFalse(self.test_faucet.needs_funding)
+        self.assertEqual(self.test_faucet.remaining_claim_number, 5)
+        self.assertEqual(self.test_faucet.current_fuel_level, 1)
+
+    @patch("core.utils.Web3Utils.batch_call", lambda *args: [None] * 4)
+    def test_failed_read_needs_funding(self):
+        CeleryTasks.update_faucets_maintenance()
+
+        self.other_faucet.refresh_from_db()
+        self.assertTrue(self.other_faucet.needs_funding)
+        self.assertEqual(self.other_faucet.remaining_claim_number, 0)
+
+    @patch("core.utils.Web3Utils.batch_call", lambda *args: [None] * 4)
+    def test_deprecated_faucet_does_not_need_funding(self):
+        self.other_faucet.is_deprecated = True
+        self.other_faucet.save()
+
+        CeleryTasks.update_faucets_maintenance()
+
+        self.other_faucet.refresh_from_db()
+        self.assertFalse(self.other_faucet.needs_funding)
+
+    def test_slow_chain_times_out(self):
+        def read_live(reader):
+            if reader.chain.pk == self.other_faucet.chain_id:
+                time.sleep(0.5)
+            return 10, 100, 10**18, {self.test_faucet.pk: 10**18}
+
+        with patch(
+            "faucet.faucet_manager.balance_reader.ChainBalanceReader.read_live",
+            read_live,
+        ):
+            report = FaucetMaintenancePipeline(
+                Faucet.objects.select_related("chain", "chain__wallet"),
+                chain_timeout=0.1,
+            ).run()
+
+        self.assertEqual(report["timed_out_chains"], [self.other_faucet.chain_id])
+        self.assertEqual(report["updated_chains"], 2)
+        self.test_faucet.refresh_from_db()
+        self.assertFalse(self.test_faucet.needs_funding)
+        self.other_faucet.refresh_from_db()
+        self.assertTrue(self.other_faucet.needs_funding)
+
+
+@patch("faucet.faucet_manager.claim_dispatcher.CLAIM_DISPATCH_MODE", "event")
+class TestClaimDispatcher(APITestCase):
+    def setUp(self) -> None:
+        LocalClaimQueue.clear()
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key
+        )
+        self.user_profile = create_new_user()
+        self.test_faucet = create_test_faucet(
+            self.wallet, max_claim_amount=faucet1_max_claim
+        )
+        GlobalSettings.set("gastap_round_claim_limit", "2")
+
+    def tearDown(self) -> None:
+        LocalClaimQueue.clear()
+
+    @patch("faucet.tasks.batch_faucet_claims.delay")
+    def test_claim_schedules_one_batcher_per_faucet(self, delay_mock):
+        claim_manager = ClaimManagerFactory(
+            self.test_faucet, self.user_profile
+        ).get_manager()
+        with self.captureOnCommitCallbacks(execute=True):
+            receipt = claim_manager.claim(100, address)
+
+        delay_mock.assert_called_once_with(self.test_faucet.pk)
+        ClaimDispatcher.notify(self.test_faucet.pk, receipt.pk + 1)
+        delay_mock.assert_called_once()
+        self.assertEqual(LocalClaimQueue().length(self.test_faucet.pk), 2)
+
+    def test_batcher_stops_at_max_batch_size(self):
+        queue = LocalClaimQueue()
+        for receipt_pk in range(5):
+            queue.push(self.test_faucet.pk, receipt_pk)
+
+        batcher = ClaimBatcher(
+            self.test_faucet.pk, queue=queue, linger=10, max_batch_size=3
+        )
+        start = time.monotonic()
+
+        self.assertEqual(batcher.collect(), [0, 1, 2])
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(queue.length(self.test_faucet.pk), 2)
+
+    def test_batcher_lingers_for_late_claims(self):
+        queue = LocalClaimQueue()
+        queue.push(self.test_faucet.pk, 1)
+        threading.Timer(0.05, queue.push, (self.test_faucet.pk, 2)).start()
+
+        batcher = ClaimBatcher(self.test_faucet.pk, queue=queue, linger=0.5)
+
+        self.assertEqual(batcher.collect(), [1, 2])
+
+    def test_batch_faucet_claims(self):
+        receipt = ClaimReceipt.objects.create(
+            faucet=self.test_faucet,
+            user_profile=self.user_profile,
+            datetime=timezone.now(),
+            amount=100,
+            to_address=address,
+        )
+        LocalClaimQueue().push(self.test_faucet.pk, receipt.pk)
+
+        batch = CeleryTasks.batch_faucet_claims(self.test_faucet.pk)
+
+        receipt.refresh_from_db()
+        self.assertEqual(receipt.batch, batch)
+
+        LocalClaimQueue().push(self.test_faucet.pk, receipt.pk)
+        self.assertIsNone(CeleryTasks.batch_faucet_claims(self.test_faucet.pk))
+        # left in the queue until the pending batch is resolved
+        self.assertEqual(LocalClaimQueue().length(self.test_faucet.pk), 1)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class TestBatchSizer(APITestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key
+        )
+        self.user_profile = create_new_user()
+        self.test_faucet = create_test_faucet(
+            self.wallet, max_claim_amount=faucet1_max_claim
+        )
+        self.chain = self.test_faucet.chain
+        self.chain.max_batch_size = 10
+        self.chain.save()
+
+    def tearDown(self) -> None:
+        cache.clear()
+
+    @patch(
+        "faucet.faucet_manager.batch_sizer.BatchSizer.get_block_gas_limit",
+        lambda *args: None,
+    )
+    def test_size_is_capped_by_backlog_and_chain(self):
+        sizer = BatchSizer(self.chain)
+
+        self.assertEqual(sizer.get_batch_size(3), 3)
+        self.assertEqual(sizer.get_batch_size(50), 10)
+
+    @patch(
+        "faucet.faucet_manager.batch_sizer.BatchSizer.get_block_gas_limit",
+        lambda *args: 1_000_000,
+    )
+    def test_size_fits_in_block_gas_limit(self):
+        BatchSizer.record_gas_estimate(self.chain, 4, 4 * 100_000)
+
+        self.assertEqual(BatchSizer(self.chain).get_batch_size(50), 5)
+        self.assertEqual(
+            Metrics.get_summary(
+                BatchSizer.get_metric_name(self.chain.pk, "recipients_per_tx")
+            )["last"],
+            4,
+        )
+
+    @patch(
+        "faucet.faucet_manager.batch_sizer.BatchSizer.get_block_gas_limit",
+        lambda *args: None,
+    )
+    def test_failed_estimation_halves_size(self):
+        BatchSizer.record_failed_estimation(self.chain, 10)
+
+        self.assertEqual(BatchSizer(self.chain).get_batch_size(50), 5)
+
+    @patch(
+        "faucet.faucet_manager.batch_sizer.BatchSizer.get_block_gas_limit",
+        lambda *args: None,
+    )
+    def test_process_faucet_pending_claims_uses_batch_size(self):
+        self.chain.max_batch_size = 2
+        self.chain.save()
+        for _ in range(3):
+            ClaimReceipt.objects.create(
+                faucet=self.test_faucet,
+                user_profile=self.user_profile,
+                datetime=timezone.now(),
+                amount=100,
+                to_address=address,
+            )
+
+        batch = CeleryTasks.process_faucet_pending_claims(self.test_faucet.pk)
+
+        self.assertEqual(batch.claims.count(), 2)
+
+
+class TestProcessFaucetPendingClaims(APITestCase):
+    def setUp(self) -> None:
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key
+        )
+        self.user_profile = create_new_user()
+        self.test_faucet = create_test_faucet(
+            self.wallet, max_claim_amount=faucet1_max_claim
+        )
+
+    def create_receipts(self, count):
+        return ClaimReceipt.objects.bulk_create(
+            [
+                ClaimReceipt(
+                    faucet=self.test_faucet,
+                    user_profile=self.user_profile,
+                    datetime=timezone.now(),
+                    amount=100,
+                    to_address=address,
+                )
+                for _ in range(count)
+            ]
+        )
+
+    def process_with_query_count(self, max_batch_size):
+        with CaptureQueriesContext(connection) as queries:
+            batch = CeleryTasks.process_faucet_pending_claims(
+                self.test_faucet.pk, max_batch_size=max_batch_size
+            )
+        return batch, len(queries)
+
+    def test_batch_is_assigned_with_constant_queries(self):
+        receipts = self.create_receipts(3)
+        small_batch, small_batch_queries = self.process_with_query_count(2)
+        self.assertEqual(
+            list(small_batch.claims.order_by("pk")), [receipts[0], receipts[1]]
+        )
+
+        small_batch._status = ClaimReceipt.VERIFIED
+        small_batch.save()
+        self.create_receipts(20)
+        large_batch, large_batch_queries = self.process_with_query_count(20)
+
+        self.assertEqual(large_batch.claims.count(), 20)
+        self.assertEqual(small_batch_queries, large_batch_queries)
+
+    def test_no_batch_without_receipts(self):
+        batch = CeleryTasks.process_faucet_pending_claims(
+            self.test_faucet.pk, max_batch_size=5
+        )
+
+        self.assertIsNone(batch)
+        self.assertFalse(TransactionBatch.objects.exists())
+
+
+class TestConfirmationTracker(APITestCase):
+    def setUp(self) -> None:
+        self.wallet = WalletAccount.objects.create(
+            name="Test Wallet", private_key=test_wallet_key
+        )
+        self.user_profile = create_new_user()
+        Wallet.objects.create(
+            user_profile=self.user_profile,
+            wallet_type=NetworkTypes.EVM,
+            address=address,
+        )
+        self.test_faucet = create_test_faucet(
+            self.wallet, max_claim_amount=faucet1_max_claim
+        )
+        self.test_faucet.chain.is_testnet = True
+        self.test_faucet.chain.save()
+
+    def create_batch(self, tx_hash):
+        batch = TransactionBatch.objects.create(
+            faucet=self.test_faucet, tx_hash=tx_hash
+        )
+        ClaimReceipt.objects.create(
+            faucet=self.test_faucet,
+            user_profile=self.user_profile,
+            datetime=timezone.now(),
+            amount=100,
+            to_address=address,
+            batch=batch,
+        )
+        return batch
+
+    @patch("core.utils.Web3Utils.batch_call")
+    def test_resolves_all_hashes_in_one_call(self, batch_call):
+        verified = self.create_batch("0x1")
+        failed = self.create_batch("0x2")
+        unmined = self.create_batch("0x3")
+        batch_call.side_effect = lambda calls: [
+            {"0x1": {"status": "0x1"}, "0x2": {"status": "0x0"}}.get(params[0])
+            for _, params in calls
+        ]
+
+        result = ConfirmationTracker(self.test_faucet.chain).run()
+
+        self.assertEqual(batch_call.call_count, 1)
+        self.assertEqual(result["verified_batches"], 1)
+        self.assertEqual(result["rejected_batches"], 1)
+        for batch, status in (
+            (verified, ClaimReceipt.VERIFIED),
+            (failed, ClaimReceipt.REJECTED),
+            (unmined, ClaimReceipt.PENDING),
+        ):
+            batch.refresh_from_db()
+            self.assertEqual(batch._status, status)
+            self.assertEqual(batch.claims.get()._status, status)
+
+    @patch("core.utils.Web3Utils.batch_call", lambda self, calls: [None] * len(calls))
+    def test_expired_batch_is_rejected(self):
+        batch = self.create_batch("0x1")
+        TransactionBatch.objects.filter(pk=batch.pk).update(
+            datetime=timezone.now()
+            - datetime.timedelta(minutes=ClaimReceipt.MAX_PENDING_DURATION + 1)
+        )
+
+        ConfirmationTracker(self.test_faucet.chain).run()
+
+        batch.refresh_from_db()
+        self.assertEqual(batch._status, ClaimReceipt.REJECTED)
+
+    @patch("core.utils.Web3Utils.batch_call")
+    def test_donation_is_verified(self, batch_call):
+        donation = DonationReceipt.objects.create(
+            user_profile=self.user_profile, tx_hash="0x1", faucet=self.test_faucet
+        )
+        batch_call.return_value = [
+            {"status": "0x1"},
+            {"from": address, "to": fund_manager, "value": hex(10**18)},
+        ]
+
+        result = ConfirmationTracker(self.test_faucet.chain).run()
+
+        self.assertEqual(result["resolved_donations"], 1)
+        donation.refresh_from_db()
+        self.assertEqual(donation.status, ClaimReceipt.VERIFIED)
+        self.assertEqual(donation.value, "1")
+        self.assertEqual(donation.total_price, "0")
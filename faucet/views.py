@@ -25,6 +25,7 @@ from authentication.models import UserProfile
 from core.filters import IsOwnerFilterBackend
 from core.paginations import StandardResultsSetPagination
 from core.validators import address_validator
+from faucet.faucet_manager.balance_reader import FaucetBalanceReader
 from faucet.faucet_manager.claim_manager import (
     ClaimManagerFactory,
     LimitedChainClaimManager,
@@ -241,7 +242,19 @@ class FaucetBalanceListView(ListAPIView):
     serializer_class = FaucetBalanceSerializer
     queryset = Faucet.objects.filter(
         is_active=True, show_in_gastap=True, is_deprecated=False
-    )
+    ).select_related("chain", "chain__wallet")
+
+    def list(self, request, *args, **kwargs):
+        faucets = list(self.filter_queryset(self.get_queryset()))
+        serializer = self.get_serializer(
+            faucets,
+            many=True,
+            context={
+                **self.get_serializer_context(),
+                "balances": FaucetBalanceReader(faucets).read(),
+            },
+        )
+        return Response(serializer.data)
 
 
 class DonationReceiptView(ListCreateAPIView):
@@ -1,18 +1,21 @@
 # import csv
 import logging
 import time
+from collections import defaultdict
 
 import requests
 from celery import shared_task
 from django.db import transaction
 from django.db.models import F
+from django.db.models.functions import Lower
 from django.utils import timezone
 from web3 import Web3
 
 from authentication.models import NetworkTypes, UserProfile, Wallet
 from brightIDfaucet.settings import DEPLOYMENT_ENV
 from core.helpers import memcache_lock
-from core.thirdpartyapp import Subgraph
+from core.metrics import Metrics
+from core.models import UnitapPass
 
 from .models import Raffle, RaffleEntry
 from .utils import PrizetapContractClient, VRFClientContractClient
@@ -113,8 +116,7 @@ def set_raffle_winners(self):
             for raffle in raffles_queryset:
                 print(f"Setting the raffle {raffle.name} winners")
                 raffle_client = PrizetapContractClient(raffle)
-                tx_hash = raffle_client.set_winners()
-                if tx_hash:
+                if raffle_client.set_winners():
                     raffle.status = Raffle.Status.WINNERS_SET
                     raffle.save()
 
@@ -274,22 +276,44 @@ def set_raffle_ids(self):
 
 @shared_task
 def update_prizetap_winning_chance_number():
-    sub = Subgraph()
-    holders = sub.get_unitap_pass_holders()
-    for holder_address, unitap_pass_ids in holders.items():
-        try:
-            user_profile = (
-                Wallet.objects.prefetch_related()
-                .get(address__iexact=holder_address, wallet_type=NetworkTypes.EVM)
-                .user_profile
+    started_at = time.monotonic()
+    holders = UnitapPass.get_holders()
+    # uses the lower(address), wallet_type unique index
+    wallets = (
+        Wallet.objects.annotate(lower_address=Lower("address"))
+        .filter(lower_address__in=holders.keys(), wallet_type=NetworkTypes.EVM)
+        .values_list("lower_address", "user_profile_id")
+    )
+    increments = defaultdict(int)
+    matched_addresses = set()
+    for address, user_profile_pk in wallets:
+        increments[user_profile_pk] += len(holders[address])
+        matched_addresses.add(address)
+    for address in holders.keys() - matched_addresses:
+        logging.warning(f"Wallet address: {address} not exists.")
+
+    # one update per distinct increment, F keeps chances spent meanwhile
+    user_profile_pks = defaultdict(list)
+    for user_profile_pk, increment in increments.items():
+        user_profile_pks[increment].append(user_profile_pk)
+    updated = 0
+    with transaction.atomic():
+        for increment, pks in user_profile_pks.items():
+            updated += UserProfile.objects.filter(pk__in=pks).update(
+                prizetap_winning_chance_number=F("prizetap_winning_chance_number")
+                + increment
             )
-            with transaction.atomic():
-                user_profile.prizetap_winning_chance_number = F(
-                    "prizetap_winning_chance_number"
-                ) + len(unitap_pass_ids)
-                user_profile.save(update_fields=("prizetap_winning_chance_number",))
-        except Wallet.DoesNotExist:
-            logging.warning(f"Wallet address: {holder_address} not exists.")
+
+    metric_name = "prizetap.update_winning_chance_number"
+    Metrics.observe(f"{metric_name}.holders", len(holders))
+    Metrics.observe(
+        f"{metric_name}.unmatched_holders", len(holders) - len(matched_addresses)
+    )
+    Metrics.observe(f"{metric_name}.updated_profiles", updated)
+    Metrics.observe(
+        f"{metric_name}.duration_ms", (time.monotonic() - started_at) * 1000
+    )
+    return updated
 
 
 @shared_task(bind=True)
@@ -4,19 +4,21 @@ from unittest.mock import PropertyMock, patch
 
 from django.contrib.auth.models import User
 from django.core.cache import cache
+from django.test import override_settings
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.test import APITestCase
 
 from authentication.models import UserProfile, Wallet
-from core.models import Chain, NetworkTypes, WalletAccount
+from core.constraints import BrightIDMeetVerification
+from core.models import Chain, NetworkTypes, UnitapPass, WalletAccount
 
 from .models import Constraint, Raffle, RaffleEntry
+from .tasks import set_raffle_winners, update_prizetap_winning_chance_number
+from .utils import PrizetapContractClient
 from .validators import RaffleEnrollmentValidator
 
-# from .utils import PrizetapContractClient
-
 test_wallet_key = "f57fecd11c6034fd2665d622e866f05f9b07f35f253ebd5563e3d7e76ae66809"
 test_rpc_url_private = "https://rpc.ankr.com/eth_sepolia"
 erc20_contract_address = "0x57b2BA844fD37F20E9358ABaa6995caA4fCC9994"
@@ -160,6 +162,46 @@ class RaffleTestCase(BaseTestCase):
         self.assertFalse(self.raffle.is_claimable)
 
 
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class SetRaffleWinnersTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.raffle = Raffle.objects.create(
+            name="Test Raffle",
+            description="Test Raffle Description",
+            contract=erc20_contract_address,
+            raffleId=1,
+            creator_profile=self.user_profile,
+            prize_amount=1e14,
+            prize_asset="0x0000000000000000000000000000000000000000",
+            prize_name="Test raffle",
+            prize_symbol="Eth",
+            decimals=18,
+            chain=self.chain,
+            deadline=timezone.now() - timezone.timedelta(days=1),
+            max_number_of_entries=2,
+            status=Raffle.Status.RANDOM_WORDS_SET,
+        )
+
+    @patch.object(PrizetapContractClient, "get_last_winner_index", return_value=1)
+    def test_winners_already_set(self, _):
+        set_raffle_winners()
+
+        self.raffle.refresh_from_db()
+        self.assertEqual(self.raffle.status, Raffle.Status.WINNERS_SET)
+
+    @patch("core.utils.Web3Utils.contract_txn", return_value="0x1")
+    @patch.object(PrizetapContractClient, "get_last_winner_index", return_value=0)
+    def test_winners_not_set(self, _, contract_txn):
+        set_raffle_winners()
+
+        self.raffle.refresh_from_db()
+        self.assertEqual(self.raffle.status, Raffle.Status.RANDOM_WORDS_SET)
+        contract_txn.assert_called_once()
+
+
 @patch.dict(
     "prizetap.constants.CONTRACT_ADDRESSES",
     {
@@ -568,6 +610,48 @@ class RaffleAPITestCase(RaffleTestCase):
         self.assertEqual(data["pk"], self.meet_constraint.pk)
         self.assertEqual(data["is_verified"], True)
 
+    def test_get_raffles_constraints_checks_shared_constraint_once(self):
+        self.client.force_authenticate(user=self.user_profile.user)
+        other_raffle = Raffle.objects.create(
+            name="Other Raffle",
+            description="Other Raffle Description",
+            contract=erc20_contract_address,
+            raffleId=2,
+            creator_profile=self.user_profile,
+            prize_amount=1e14,
+            prize_asset="0x0000000000000000000000000000000000000000",
+            prize_name="Other raffle",
+            prize_symbol="Eth",
+            decimals=18,
+            chain=self.chain,
+            deadline=timezone.now() + timezone.timedelta(days=1),
+            max_number_of_entries=2,
+            status=Raffle.Status.VERIFIED,
+            reversed_constraints=str(self.meet_constraint.pk),
+        )
+        other_raffle.constraints.set([self.meet_constraint])
+
+        with patch.object(
+            BrightIDMeetVerification, "is_observed", return_value=False
+        ) as is_observed:
+            response = self.client.get(
+                reverse("get-raffles-constraints"),
+                {"ids": f"{self.raffle.pk},{other_raffle.pk}"},
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(is_observed.call_count, 1)
+        constraints = response.data["constraints"]
+        self.assertEqual(constraints[self.raffle.pk][0]["pk"], self.meet_constraint.pk)
+        self.assertEqual(constraints[self.raffle.pk][0]["is_verified"], False)
+        self.assertEqual(constraints[other_raffle.pk][0]["is_verified"], True)
+        self.assertEqual(constraints[other_raffle.pk][0]["is_reversed"], True)
+
+    def test_get_raffles_constraints_with_invalid_ids(self):
+        self.client.force_authenticate(user=self.user_profile.user)
+        response = self.client.get(reverse("get-raffles-constraints"), {"ids": "a,1"})
+        self.assertEqual(response.status_code, 400)
+
     # @patch(
     #     "authentication.models.UserProfile.is_meet_verified",
     #     lambda a: (True, None),
@@ -778,6 +862,48 @@ class RaffleEntryAPITestCase(RaffleEntryTestCase):
         self.assertEqual(data["raffle"]["raffleId"], self.raffle.raffleId)
 
 
+class UpdateWinningChanceNumberTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        Wallet.objects.create(
+            user_profile=self.user_profile,
+            wallet_type=NetworkTypes.EVM,
+            address="0x23826Fd930916718a98A21FF170088FBb4C30803",
+        )
+        self.other_user_profile = UserProfile.objects.create(
+            user=User.objects.create_user(username="test_2", password="1234"),
+            initial_context_id="test_2",
+            username="test_2",
+        )
+        Wallet.objects.create(
+            user_profile=self.other_user_profile,
+            wallet_type=NetworkTypes.EVM,
+            address="0x23826fd930916718a98a21ff170088fbb4c30804",
+        )
+        for token_id, owner in [
+            (1, "0xc1cbb2ab97260a8a7d4591045a9fb34ec14e87fb"),
+            (2, "0x23826fd930916718a98a21ff170088fbb4c30803"),
+            (3, "0x23826fd930916718a98a21ff170088fbb4c30803"),
+            (4, "0x23826fd930916718a98a21ff170088fbb4c30804"),
+            (5, "0x0000000000000000000000000000000000000001"),
+        ]:
+            UnitapPass.objects.create(token_id=token_id, owner=owner)
+
+    def test_update_prizetap_winning_chance_number(self):
+        self.other_user_profile.prizetap_winning_chance_number = 2
+        self.other_user_profile.save()
+
+        # passes, wallets, savepoint, one update per distinct increment, release
+        with self.assertNumQueries(6):
+            updated = update_prizetap_winning_chance_number()
+
+        self.assertEqual(updated, 2)
+        self.user_profile.refresh_from_db()
+        self.other_user_profile.refresh_from_db()
+        self.assertEqual(self.user_profile.prizetap_winning_chance_number, 3)
+        self.assertEqual(self.other_user_profile.prizetap_winning_chance_number, 3)
+
+
 # class UtilsTestCase(RaffleTestCase):
 #     def setUp(self):
 #         super().setUp()
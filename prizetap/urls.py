@@ -6,6 +6,7 @@ from prizetap.views import (
     CreateRaffleView,
     GetRaffleConstraintsView,
     GetRaffleEntryView,
+    GetRafflesConstraintsView,
     LineaRaffleView,
     RaffleDetailsView,
     RaffleEnrollmentView,
@@ -50,6 +51,11 @@ urlpatterns = [
         GetRaffleConstraintsView.as_view(),
         name="get-raffle-constraints",
     ),
+    path(
+        "get-raffles-constraints/",
+        GetRafflesConstraintsView.as_view(),
+        name="get-raffles-constraints",
+    ),
     path(
         "create-raffle/",
         CreateRaffleView.as_view(),
@@ -1,5 +1,8 @@
 import time
 
+from django.core.cache import cache
+from web3.exceptions import TransactionNotFound
+
 from brightIDfaucet.settings import DEPLOYMENT_ENV
 from core.models import Chain
 from core.utils import Web3Utils
@@ -45,22 +48,47 @@ class PrizetapContractClient:
         raffle = self.get_raffle()
         return raffle["lastWinnerIndex"]
 
+    def get_set_winners_tx_key(self):
+        return f"prizetap_set_winners_tx_{self.raffle.pk}"
+
+    def is_tx_pending(self, tx_hash):
+        try:
+            self.web3_utils.get_transaction_receipt(tx_hash)
+            return False
+        except TransactionNotFound:
+            pass
+        try:
+            self.web3_utils.get_transaction_by_hash(tx_hash)
+            return True
+        except TransactionNotFound:
+            # dropped, the chunk is sent again
+            return False
+
     def set_winners(self):
+        """
+        Sends the next chunk of winners without waiting for it to be mined,
+        meant to be called periodically
+        :return: True once all the winners are set, otherwise False
+        """
+        tx_key = self.get_set_winners_tx_key()
+        tx_hash = cache.get(tx_key)
+        if tx_hash and self.is_tx_pending(tx_hash):
+            return False
+
         winners_count = self.raffle.winners_count
         last_winner_index = self.get_last_winner_index()
-        tx_hash = None
-        while last_winner_index < winners_count:
-            to_id = last_winner_index + 25
-            if to_id > winners_count:
-                to_id = winners_count
-            func = self.web3_utils.contract.functions.setWinners(
-                self.raffle.raffleId, to_id
-            )
-            last_winner_index = to_id
-            tx_hash = self.web3_utils.contract_txn(func)
-            self.web3_utils.wait_for_transaction_receipt(tx_hash)
-
-        return tx_hash
+        if last_winner_index >= winners_count:
+            cache.delete(tx_key)
+            return True
+
+        to_id = last_winner_index + 25
+        if to_id > winners_count:
+            to_id = winners_count
+        func = self.web3_utils.contract.functions.setWinners(
+            self.raffle.raffleId, to_id
+        )
+        cache.set(tx_key, self.web3_utils.contract_txn(func), 24 * 60 * 60)
+        return False
 
     def get_raffle_winners(self):
         func = self.web3_utils.contract.functions.getWinners(
@@ -1,16 +1,12 @@
-import json
-
-from django.core.cache import cache
 from rest_framework.exceptions import PermissionDenied, ValidationError
 
 from authentication.models import UserProfile
-from core.constraints import ConstraintVerification, get_constraint
-from core.utils import cache_constraint_result
+from core.validators import AbstractConstraintsValidator
 
 from .models import Raffle, RaffleEntry
 
 
-class RaffleEnrollmentValidator:
+class RaffleEnrollmentValidator(AbstractConstraintsValidator):
     def __init__(self, *args, **kwargs):
         self.user_profile: UserProfile = kwargs["user_profile"]
         self.raffle: Raffle = kwargs["raffle"]
@@ -21,59 +17,18 @@ class RaffleEnrollmentValidator:
         if not self.raffle.is_claimable:
             raise PermissionDenied("Can't enroll in this raffle")
 
+    @property
+    def constraint_obj(self):
+        return self.raffle
+
+    def get_check_data(self, c) -> dict:
+        return self.raffle_data.get(str(c.pk), dict())
+
+    def get_check_kwargs(self) -> dict:
+        return {"from_time": int(self.raffle.start_at.timestamp())}
+
     def check_user_constraints(self, raise_exception=True):
-        try:
-            param_values = json.loads(self.raffle.constraint_params)
-        except Exception:
-            param_values = {}
-        error_messages = dict()
-        result = dict()
-        for c in self.raffle.constraints.all():
-            constraint: ConstraintVerification = get_constraint(c.name)(
-                self.user_profile, obj=self.raffle
-            )
-            constraint.response = c.response
-            try:
-                constraint.param_values = param_values[c.name]
-            except KeyError:
-                pass
-            cdata = self.raffle_data.get(str(c.pk), dict())
-            cache_key = f"prizetap-{self.user_profile.pk}-{self.raffle.pk}-{c.pk}"
-            constraint_data = cache.get(cache_key)
-            if constraint_data is None:
-                """
-                Refactor: this is not good design beacuse info is duplicated with
-                is_observed so we need some design change for in is_observed so
-                if info needed it must return it.
-                or more basical change likes change how constraints logic is.
-                """
-                info = constraint.get_info(
-                    **cdata, from_time=int(self.raffle.start_at.timestamp())
-                )
-                if str(c.pk) in self.raffle.reversed_constraints_list:
-                    is_verified = not constraint.is_observed(
-                        **cdata, from_time=int(self.raffle.start_at.timestamp())
-                    )
-                else:
-                    is_verified = constraint.is_observed(
-                        **cdata,
-                        from_time=int(self.raffle.start_at.timestamp()),
-                        context={"request": self.request},
-                    )
-
-                if constraint.is_cachable:
-                    constraint_data = cache_constraint_result(
-                        cache_key, is_verified, constraint, info
-                    )
-                else:
-                    constraint_data = {"is_verified": is_verified, "info": info}
-
-            if not constraint_data.get("is_verified"):
-                error_messages[c.title] = constraint.response
-            result[c.pk] = constraint_data
-        if len(error_messages) and raise_exception:
-            raise PermissionDenied(error_messages)
-        return result
+        return self.check_constraints(raise_exception)
 
     def check_user_owns_wallet(self, user_wallet_address):
         if not self.user_profile.owns_wallet(user_wallet_address):
@@ -17,7 +17,7 @@ from core.models import Chain
 from core.paginations import StandardResultsSetPagination
 from core.serializers import ChainSerializer
 from core.swagger import ConstraintProviderSrializerInspector
-from core.views import AbstractConstraintsListView
+from core.views import AbstractBulkConstraintsView, AbstractConstraintsListView
 
 from .constants import CONTRACT_ADDRESSES
 from .models import Constraint, LineaRaffleEntries, Raffle, RaffleEntry
@@ -216,6 +216,16 @@ class GetRaffleConstraintsView(APIView):
         )
 
 
+class GetRafflesConstraintsView(AbstractBulkConstraintsView):
+    queryset = Raffle.objects.all()
+    constraint_serializer_class = ConstraintSerializer
+
+    def get_validator(self, obj, request):
+        return RaffleEnrollmentValidator(
+            user_profile=request.user.profile, raffle=obj, request=request
+        )
+
+
 class CreateRaffleView(CreateAPIView):
     parser_classes = (MultiPartParser, FormParser)
     permission_classes = [IsAuthenticated]
@@ -30,7 +30,9 @@ class GastapStatsHandler(BaseTelegramMessageHandler):
     message = "Stats of gastap"
 
     def handler(self, message: types.Message):
-        faucets = Faucet.objects.filter(is_active=True, show_in_gastap=True)
+        faucets = Faucet.objects.filter(
+            is_active=True, show_in_gastap=True
+        ).select_related("chain")
 
         # Prepare the template
         template = Template(gastap_text)
@@ -7,6 +7,7 @@ from tokenTap.views import (
     CreateTokenDistribution,
     ExtendTokenDistribution,
     GetTokenDistributionConstraintsView,
+    GetTokenDistributionsConstraintsView,
     SetDistributionTXView,
     TokenDistributionClaimListView,
     TokenDistributionClaimRetrieveView,
@@ -49,6 +50,11 @@ urlpatterns = [
         GetTokenDistributionConstraintsView.as_view(),
         name="get-token-distribution-constraints",
     ),
+    path(
+        "get-tokens-constraints/",
+        GetTokenDistributionsConstraintsView.as_view(),
+        name="get-token-distributions-constraints",
+    ),
     path(
         "get-constraints/",
         cache_page(60 * 2)(ConstraintsListView.as_view()),
@@ -1,12 +1,7 @@
-import json
-import logging
-
-from django.core.cache import cache
 from rest_framework.exceptions import PermissionDenied
 
 from authentication.models import UserProfile
-from core.constraints import ConstraintVerification, get_constraint
-from core.utils import cache_constraint_result
+from core.validators import AbstractConstraintsValidator
 
 from .helpers import has_credit_left
 from .models import ClaimReceipt, TokenDistribution
@@ -36,7 +31,7 @@ class SetDistributionTxValidator:
             raise PermissionDenied("Tx hash is not valid")
 
 
-class TokenDistributionValidator:
+class TokenDistributionValidator(AbstractConstraintsValidator):
     def __init__(
         self,
         td: TokenDistribution,
@@ -50,57 +45,18 @@ class TokenDistributionValidator:
         self.user_profile = user_profile
         self.request = kwargs.get("request")
 
+    @property
+    def constraint_obj(self):
+        return self.td
+
+    def get_check_data(self, c) -> dict:
+        return self.td_data.get(str(c.pk), dict())
+
+    def get_check_kwargs(self) -> dict:
+        return {"token_distribution": self.td}
+
     def check_user_permissions(self, raise_exception=True):
-        try:
-            param_values = json.loads(self.td.constraint_params or "{}")
-        except Exception as e:
-            logging.error("Error parsing constraint params", e)
-            param_values = {}
-        error_messages = dict()
-        result = dict()
-        for c in self.td.constraints.all():
-            constraint: ConstraintVerification = get_constraint(c.name)(
-                self.user_profile, obj=self.td
-            )
-            constraint.response = c.response
-            try:
-                constraint.param_values = param_values[c.name]
-            except KeyError:
-                pass
-
-            cdata = self.td_data.get(str(c.pk), dict())
-            cache_key = f"tokentap-{self.user_profile.pk}-{self.td.pk}-{c.pk}"
-            constraint_data = cache.get(cache_key)
-            if constraint_data is None:
-                info = constraint.get_info(
-                    **cdata,
-                    token_distribution=self.td,
-                )
-                if str(c.pk) in self.td.reversed_constraints_list:
-                    is_verified = not constraint.is_observed(
-                        **cdata,
-                        token_distribution=self.td,
-                    )
-                else:
-                    is_verified = constraint.is_observed(
-                        **cdata,
-                        token_distribution=self.td,
-                        context={"request": self.request},
-                    )
-
-                if constraint.is_cachable:
-                    constraint_data = cache_constraint_result(
-                        cache_key, is_verified, constraint, info
-                    )
-                else:
-                    constraint_data = {"is_verified": is_verified, "info": info}
-
-            if not constraint_data.get("is_verified"):
-                error_messages[c.title] = constraint.response
-            result[c.pk] = constraint_data
-        if len(error_messages) and raise_exception:
-            raise PermissionDenied(error_messages)
-        return result
+        return self.check_constraints(raise_exception)
 
     def cache_constraint(self):
         pass
@@ -120,7 +76,12 @@ class TokenDistributionValidator:
         if not self.td.is_claimable:
             raise PermissionDenied("This token is not claimable")
 
-    def is_valid(self):
-        self.check_user_permissions()
+    def check_claim(self):
+        """the checks of the claim rows, repeated once the distribution is
+        locked"""
         self.check_token_distribution_is_claimable()
         self.check_user_credit()
+
+    def is_valid(self):
+        self.check_user_permissions()
+        self.check_claim()
@@ -16,7 +16,7 @@ from authentication.models import UserProfile
 from core.models import Chain, NetworkTypes
 from core.serializers import ChainSerializer
 from core.swagger import ConstraintProviderSrializerInspector
-from core.views import AbstractConstraintsListView
+from core.views import AbstractBulkConstraintsView, AbstractConstraintsListView
 from faucet.models import ClaimReceipt
 from tokenTap.models import Constraint, TokenDistribution, TokenDistributionClaim
 from tokenTap.serializers import (
@@ -100,45 +100,59 @@ class TokenDistributionClaimView(CreateAPIView):
             ),
         },
     )
+    def get_pending_claim_response(self, user_profile, token_distribution):
+        try:
+            tdc = TokenDistributionClaim.objects.get(
+                user_profile=user_profile,
+                token_distribution=token_distribution,
+                status=ClaimReceipt.PENDING,
+            )
+        except TokenDistributionClaim.DoesNotExist:
+            return None
+        return Response(
+            {
+                "detail": "Signature Was Already Created",
+                "signature": TokenDistributionClaimSerializer(tdc).data,
+            },
+            status=200,
+        )
+
     def post(self, request, *args, **kwargs):
-        with transaction.atomic():
-            user_profile = request.user.profile
-            token_distribution = TokenDistribution.objects.select_for_update().get(
-                pk=self.kwargs["pk"]
+        user_profile = request.user.profile
+        token_distribution = TokenDistribution.objects.get(pk=self.kwargs["pk"])
+        td_data = request.query_params.get("td_data", dict())
+        user_wallet_address = request.data.get("user_wallet_address", None)
+        if user_wallet_address is None:
+            raise rest_framework.exceptions.ParseError(
+                "user_wallet_address is a required field"
             )
-            td_data = request.query_params.get("td_data", dict())
-            user_wallet_address = request.data.get("user_wallet_address", None)
-            if user_wallet_address is None:
-                raise rest_framework.exceptions.ParseError(
-                    "user_wallet_address is a required field"
-                )
 
-            self.wallet_is_valid(user_profile, user_wallet_address, token_distribution)
+        self.wallet_is_valid(user_profile, user_wallet_address, token_distribution)
 
-            try:
-                tdc = TokenDistributionClaim.objects.get(
-                    user_profile=user_profile,
-                    token_distribution=token_distribution,
-                    status=ClaimReceipt.PENDING,
-                )
-                return Response(
-                    {
-                        "detail": "Signature Was Already Created",
-                        "signature": TokenDistributionClaimSerializer(tdc).data,
-                    },
-                    status=200,
-                )
+        response = self.get_pending_claim_response(user_profile, token_distribution)
+        if response is not None:
+            return response
 
-            except TokenDistributionClaim.DoesNotExist:
-                pass
+        # the constraints call third parties, they are checked concurrently
+        # before the distribution is locked
+        TokenDistributionValidator(
+            token_distribution,
+            user_profile,
+            td_data,
+            request=request,
+        ).is_valid()
 
-            validator = TokenDistributionValidator(
-                token_distribution,
-                user_profile,
-                td_data,
-                request=request,
+        with transaction.atomic():
+            token_distribution = TokenDistribution.objects.select_for_update().get(
+                pk=token_distribution.pk
             )
-            validator.is_valid()
+            response = self.get_pending_claim_response(user_profile, token_distribution)
+            if response is not None:
+                return response
+
+            TokenDistributionValidator(
+                token_distribution, user_profile, td_data, request=request
+            ).check_claim()
 
             is_unitap_pass_user, user_unitap_pass_list = self.check_unitap_pass_share(
                 token_distribution, user_profile
@@ -205,6 +219,16 @@ class GetTokenDistributionConstraintsView(APIView):
         )
 
 
+class GetTokenDistributionsConstraintsView(AbstractBulkConstraintsView):
+    queryset = TokenDistribution.objects.all()
+    constraint_serializer_class = ConstraintSerializer
+
+    def get_validator(self, obj, request):
+        return TokenDistributionValidator(
+            obj, request.user.profile, {}, request=request
+        )
+
+
 class TokenDistributionClaimStatusUpdateView(CreateAPIView):
     permission_classes = [IsAuthenticated]
 